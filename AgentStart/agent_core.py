@@ -6,52 +6,191 @@ Defines the base Agent class and common interface.
 import threading
 import queue
 import time
+from concurrent.futures import Future
+
+class _Envelope:
+    """A queued task together with the future its result is delivered to"""
+    __slots__ = ("task", "future")
+
+    def __init__(self, task, future):
+        self.task = task
+        self.future = future
+
+class TaskFailure:
+    """Marks a task that raised in the results returned by Agent._process_batch"""
+    __slots__ = ("exception",)
+    
+    def __init__(self, exception):
+        self.exception = exception
 
 class Agent:
-    def __init__(self, name=None):
+    def __init__(self, name=None, queue_results=True, scheduler=None, batch_size=1, batch_linger=0.0):
+        """
+        Create an agent.
+        
+        Args:
+            name: Optional name (generated if not provided)
+            queue_results: Also put every result on result_queue for ask/wait;
+                turn off when results are only collected through tell's futures
+            scheduler: Optional scheduler.ActorScheduler to run on, sharing its
+                worker threads instead of starting a thread of its own
+            batch_size: Most queued tasks handed to _process_batch at once
+            batch_linger: Seconds to wait for more tasks to fill a batch once
+                the queue is empty (not used on a scheduler)
+        """
         self.name = name or f"Agent_{id(self)}"
         self.task_queue = queue.Queue()
         self.result_queue = queue.Queue()
+        self.queue_results = queue_results
+        self.batch_size = max(1, batch_size)
+        self.batch_linger = batch_linger
         self.state = "ready"  # ready, busy, done, failed
         self._thread = None
-        
+        self.scheduler = scheduler
+        self._actor_slot = None  # Owned by the scheduler
+    
     def start(self):
-        """Start the agent in a new thread"""
+        """Start the agent in a new thread (or on its scheduler)"""
+        if self.scheduler is not None:
+            return self.scheduler.attach(self)
         if self._thread and self._thread.is_alive():
             return False
-            
+        
         self._thread = threading.Thread(target=self._run)
         self._thread.daemon = True
         self._thread.start()
         return True
-        
+    
     def _run(self):
         """Main agent loop - processes tasks from queue"""
-        while True:
+        while self._handle_batch(self._collect([self.task_queue.get()], self.batch_size, self.batch_linger)):
+            pass
+    
+    def _collect(self, items, limit, linger=0.0):
+        """
+        Add queued items to items until it holds limit items or a TERMINATE.
+        
+        Args:
+            items: Items already taken from task_queue
+            limit: Largest number of items to return
+            linger: Seconds to wait for more items once the queue is empty
+        """
+        if items and items[-1] == "TERMINATE":
+            return items
+        deadline = None
+        while len(items) < limit:
             try:
-                task = self.task_queue.get()
-                if task == "TERMINATE":
-                    self.state = "done"
+                item = self.task_queue.get_nowait()
+            except queue.Empty:
+                if linger <= 0:
                     break
-                    
-                self.state = "busy"
-                result = self._process_task(task)
-                self.result_queue.put(result)
+                if deadline is None:
+                    deadline = time.monotonic() + linger
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.task_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            items.append(item)
+            if item == "TERMINATE":
+                break
+        return items
+    
+    def _handle(self, item):
+        """Process one item from task_queue; returns False once the agent should stop"""
+        return self._handle_batch([item])
+    
+    def _handle_batch(self, items):
+        """Process items taken from task_queue; returns False once the agent should stop"""
+        tasks = []
+        futures = []
+        stop = False
+        for item in items:
+            if item == "TERMINATE":
+                stop = True
+                break
+            # Tasks put on task_queue directly (not through tell) have no future
+            task, future = (item.task, item.future) if isinstance(item, _Envelope) else (item, None)
+            if future is not None and not future.set_running_or_notify_cancel():
+                continue  # Cancelled by the caller before it started
+            tasks.append(task)
+            futures.append(future)
+        
+        if tasks:
+            self._run_batch(tasks, futures)
+        if stop:
+            self.state = "done"
+            return False
+        return True
+    
+    def _run_batch(self, tasks, futures):
+        try:
+            self.state = "busy"
+            results = self._execute_batch(tasks)
+            if len(results) != len(tasks):
+                raise RuntimeError(f"{len(results)} results for a batch of {len(tasks)} tasks")
+        except Exception as e:
+            results = [TaskFailure(e)] * len(tasks)
+        
+        for result, future in zip(results, futures):
+            if isinstance(result, TaskFailure):
+                self.state = "failed"
+                self._deliver({"error": str(result.exception)}, future, exception=result.exception)
+            else:
                 self.state = "ready"
-                
+                self._deliver(result, future)
+    
+    def _deliver(self, result, future, exception=None):
+        """Publish a task's outcome to its future and to result_queue"""
+        if self.queue_results:
+            self.result_queue.put(result)
+        if future is not None:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+    
+    def _execute_batch(self, tasks):
+        """Run a batch of tasks; process_agent.ProcessAgent runs it in a child process instead"""
+        return self._process_batch(tasks)
+    
+    def _process_batch(self, tasks):
+        """
+        Process several queued tasks at once.
+        
+        Override this to share work across a burst of tasks. Returns one
+        result per task, in order, with TaskFailure(exception) for a task
+        that failed; the default runs _process_task on each task.
+        """
+        results = []
+        for task in tasks:
+            try:
+                results.append(self._process_task(task))
             except Exception as e:
-                self.state = "failed"
-                self.result_queue.put({"error": str(e)})
+                results.append(TaskFailure(e))
+        return results
     
     def _process_task(self, task):
         """Override this in subclasses to implement specific behaviors"""
         return {"status": "completed", "result": f"Processed: {task}"}
     
     def tell(self, instruction):
-        """Send an instruction to this agent"""
-        self.task_queue.put(instruction)
-        if not self._thread or not self._thread.is_alive():
+        """
+        Send an instruction to this agent.
+        
+        Returns:
+            A concurrent.futures.Future resolving to this instruction's result,
+            or raising the exception its processing raised
+        """
+        future = Future()
+        self.task_queue.put(_Envelope(instruction, future))
+        if self.scheduler is not None:
+            self.scheduler.submit(self)
+        elif not self._thread or not self._thread.is_alive():
             self.start()
+        return future
     
     def ask(self):
         """Get the latest result from the agent"""
@@ -69,8 +208,10 @@ class Agent:
     
     def free(self):
         """Terminate the agent"""
+        if self.scheduler is not None:
+            return self.scheduler.detach(self)
         if self._thread and self._thread.is_alive():
             self.task_queue.put("TERMINATE")
             self._thread.join(timeout=1.0)
             return True
-        return False 
\ No newline at end of file
+        return False
@@ -3,7 +3,7 @@ Predefined agent types with specific capabilities.
 All agents maintain the common interface.
 """
 
-from agent_core import Agent
+from agent_core import Agent, TaskFailure
 import os
 import sqlite3
 import json
@@ -45,12 +45,70 @@ class FileAgent(Agent):
                 return {"status": "error", "message": str(e)}
         
         return {"status": "error", "message": "Unknown action"}
+    
+    def _process_batch(self, tasks):
+        """Process a burst of tasks, writing each file once per run of consecutive writes"""
+        results = [None] * len(tasks)
+        writes = []
+        for index, task in enumerate(tasks):
+            if isinstance(task, dict) and task.get("action") == "write":
+                writes.append(index)
+                continue
+            self._write_group(tasks, writes, results)
+            writes = []
+            results[index] = super()._process_batch([task])[0]
+        self._write_group(tasks, writes, results)
+        return results
+    
+    def _write_group(self, tasks, writes, results):
+        """Run consecutive write tasks, skipping writes a later one in the group overwrites"""
+        by_path = {}
+        for index in writes:
+            path = tasks[index].get("path")
+            by_path.setdefault(path if isinstance(path, str) else index, []).append(index)
+        
+        for indexes in sorted(by_path.values(), key=lambda indexes: indexes[-1]):
+            result = self._process_task(tasks[indexes[-1]])
+            if result.get("status") == "success":
+                for index in indexes:
+                    results[index] = dict(result)
+            else:
+                # Repeat the whole sequence so every write reports its own outcome
+                for index in indexes:
+                    results[index] = self._process_task(tasks[index])
+
+# Statements that cannot run inside the transaction DatabaseAgent wraps a batch in
+_NO_TRANSACTION = ("BEGIN", "COMMIT", "END", "ROLLBACK", "SAVEPOINT", "RELEASE",
+                   "VACUUM", "ATTACH", "DETACH", "PRAGMA")
+
+def _sql_statement(task):
+    """Return (sql, params, fetch) for a DatabaseAgent task, or None for an unknown action"""
+    if isinstance(task, str):
+        # Assume direct SQL if string
+        return task, (), task.strip().upper().startswith(("SELECT", "PRAGMA"))
+    
+    # Structured command
+    if task.get("action", "") == "query":
+        return task.get("sql", ""), task.get("params", []), task.get("fetch", True)
+    return None
+
+def _run_statement(cursor, sql, params, fetch):
+    cursor.execute(sql, params)
+    if fetch:
+        results = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        return {
+            "status": "success", 
+            "columns": columns,
+            "rows": results
+        }
+    return {"status": "success", "rows_affected": cursor.rowcount}
 
 class DatabaseAgent(Agent):
     """Agent specialized in SQLite database operations"""
     
-    def __init__(self, name=None, db_path=":memory:"):
-        super().__init__(name)
+    def __init__(self, name=None, db_path=":memory:", **kwargs):
+        super().__init__(name, **kwargs)
         self.db_path = db_path
         self.conn = None
         
@@ -60,51 +118,66 @@ class DatabaseAgent(Agent):
         return self.conn
     
     def _process_task(self, task):
-        if isinstance(task, str):
-            # Assume direct SQL if string
-            try:
-                conn = self._connect()
-                cursor = conn.cursor()
-                cursor.execute(task)
-                
-                if task.strip().upper().startswith(("SELECT", "PRAGMA")):
-                    results = cursor.fetchall()
-                    columns = [desc[0] for desc in cursor.description]
-                    conn.commit()
-                    return {
-                        "status": "success", 
-                        "columns": columns,
-                        "rows": results
-                    }
-                else:
-                    conn.commit()
-                    return {"status": "success", "rows_affected": cursor.rowcount}
-                    
-            except Exception as e:
-                return {"status": "error", "message": str(e)}
+        statement = _sql_statement(task)
+        if statement is None:
+            return {"status": "error", "message": "Unknown action"}
         
-        # Structured command
-        action = task.get("action", "")
+        try:
+            conn = self._connect()
+            result = _run_statement(conn.cursor(), *statement)
+            conn.commit()
+            return result
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+    
+    def _process_batch(self, tasks):
+        """
+        Run a burst of statements in one transaction.
         
-        if action == "query":
+        Each statement runs in its own savepoint, so a failing one is rolled
+        back alone and reports its error like it would outside a batch.
+        """
+        results = []
+        pending = []  # Indexes of results that depend on the open transaction
+        for task in tasks:
             try:
-                conn = self._connect()
-                cursor = conn.cursor()
-                cursor.execute(task.get("sql", ""), task.get("params", []))
-                
-                if task.get("fetch", True):
-                    results = cursor.fetchall()
-                    columns = [desc[0] for desc in cursor.description]
-                    conn.commit()
-                    return {
-                        "status": "success", 
-                        "columns": columns,
-                        "rows": results
-                    }
-                else:
-                    conn.commit()
-                    return {"status": "success", "rows_affected": cursor.rowcount}
+                statement = _sql_statement(task)
             except Exception as e:
-                return {"status": "error", "message": str(e)}
-        
-        return {"status": "error", "message": "Unknown action"} 
\ No newline at end of file
+                results.append(TaskFailure(e))
+                continue
+            if statement is None or statement[0].lstrip().upper().startswith(_NO_TRANSACTION):
+                self._commit_batch(results, pending)
+                results.append(self._process_task(task))
+                continue
+            
+            try:
+                cursor = self._connect().cursor()
+                if not self.conn.in_transaction:
+                    cursor.execute("BEGIN")
+                cursor.execute("SAVEPOINT agent_task")
+            except Exception as e:
+                results.append({"status": "error", "message": str(e)})
+                continue
+            try:
+                result = _run_statement(cursor, *statement)
+                pending.append(len(results))
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT agent_task")
+                result = {"status": "error", "message": str(e)}
+            cursor.execute("RELEASE SAVEPOINT agent_task")
+            results.append(result)
+        self._commit_batch(results, pending)
+        return results
+    
+    def _commit_batch(self, results, pending):
+        """Commit the open transaction; its statements report the error if that fails"""
+        if self.conn is None or not self.conn.in_transaction:
+            pending.clear()
+            return
+        try:
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            for index in pending:
+                results[index] = {"status": "error", "message": str(e)}
+        pending.clear()
@@ -0,0 +1,168 @@
+"""
+Asyncio-native agents for the AgentStart language.
+AsyncAgent mirrors the Agent interface with awaitable methods, so thousands
+of I/O-bound agents can run as tasks on one event loop instead of one
+thread each. Blocking work (file and database calls) is offloaded to
+executors so it never stalls the loop.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_types import FileAgent, DatabaseAgent
+
+class AsyncAgent:
+    def __init__(self, name=None, queue_results=True):
+        """
+        Create an agent; its queues and task are created on the running loop by start().
+
+        Args:
+            name: Optional name (generated if not provided)
+            queue_results: Also put every result on result_queue for ask/wait;
+                turn off when results are only collected through tell's futures
+        """
+        self.name = name or f"AsyncAgent_{id(self)}"
+        self.task_queue = None
+        self.result_queue = None
+        self.queue_results = queue_results
+        self.state = "ready"  # ready, busy, done, failed
+        self._task = None
+
+    async def start(self):
+        """Start the agent as a task on the running event loop"""
+        if self._task and not self._task.done():
+            return False
+
+        # Created here rather than in __init__, so they belong to the running loop
+        if self.task_queue is None:
+            self.task_queue = asyncio.Queue()
+        if self.result_queue is None:
+            self.result_queue = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._run())
+        return True
+
+    async def _run(self):
+        """Main agent loop - processes tasks from queue"""
+        while True:
+            task, future = await self.task_queue.get()
+            if task == "TERMINATE":
+                self.state = "done"
+                break
+            if future is not None and future.cancelled():
+                continue
+
+            self.state = "busy"
+            result, error = await self._attempt(task)
+            if error is not None:
+                self.state = "failed"
+                self._deliver({"error": str(error)}, future, exception=error)
+                continue
+
+            self.state = "ready"
+            self._deliver(result, future)
+
+    async def _attempt(self, task):
+        """
+        Run one task and return (result, exception).
+
+        The exception is caught here rather than in _run, so its traceback never
+        holds the suspended loop frame that code clearing frames would close.
+        """
+        try:
+            return await self._process_task(task), None
+        except Exception as e:
+            return None, e
+
+    def _deliver(self, result, future, exception=None):
+        """Publish a task's outcome to its future and to result_queue"""
+        if self.queue_results:
+            self.result_queue.put_nowait(result)
+        if future is not None and not future.done():
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+    async def _process_task(self, task):
+        """Override this in subclasses to implement specific behaviors"""
+        return {"status": "completed", "result": f"Processed: {task}"}
+
+    async def _offload(self, func, *args, executor=None):
+        """Run a blocking call in an executor (the loop's default one unless given)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+    async def tell(self, instruction):
+        """
+        Send an instruction to this agent.
+
+        Returns:
+            An asyncio.Future resolving to this instruction's result,
+            or raising the exception its processing raised
+        """
+        if not self._task or self._task.done():
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self.task_queue.put_nowait((instruction, future))
+        return future
+
+    async def ask(self):
+        """Get the latest result from the agent"""
+        if self.result_queue is None or self.result_queue.empty():
+            return {"status": "no_result_available"}
+        return self.result_queue.get_nowait()
+
+    async def wait(self, timeout=None):
+        """Wait for agent to finish current task"""
+        if self.result_queue is None:
+            self.result_queue = asyncio.Queue()
+        try:
+            return await asyncio.wait_for(self.result_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return {"status": "timeout"}
+
+    async def free(self):
+        """Terminate the agent"""
+        if self._task and not self._task.done():
+            self.task_queue.put_nowait(("TERMINATE", None))
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            return True
+        return False
+
+class AsyncFileAgent(AsyncAgent):
+    """FileAgent counterpart whose file operations run in the loop's default executor"""
+
+    async def _process_task(self, task):
+        return await self._offload(FileAgent._process_task, self, task)
+
+class AsyncDatabaseAgent(AsyncAgent):
+    """DatabaseAgent counterpart; its SQLite calls run on one dedicated thread"""
+
+    def __init__(self, name=None, db_path=":memory:", queue_results=True):
+        super().__init__(name, queue_results)
+        self.db_path = db_path
+        self.conn = None
+        self._executor = None
+
+    _connect = DatabaseAgent._connect
+
+    async def _process_task(self, task):
+        if self._executor is None:
+            # sqlite3 connections may only be used from the thread that created them
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-db")
+        return await self._offload(DatabaseAgent._process_task, self, task, executor=self._executor)
+
+    async def free(self):
+        """Terminate the agent, closing its database connection and thread"""
+        freed = await super().free()
+        if self._executor is not None:
+            if self.conn is not None:
+                await self._offload(self.conn.close, executor=self._executor)
+                self.conn = None
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return freed
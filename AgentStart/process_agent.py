@@ -0,0 +1,192 @@
+"""
+Process-backed agents for the AgentStart language.
+A ProcessAgent keeps the usual Agent interface in the caller's process but
+runs _process_task in a child process, so CPU-bound agents are not serialized
+on the GIL. Tasks and results travel over a pipe; payloads larger than a
+threshold are placed in shared memory and only their name is sent.
+"""
+
+import multiprocessing
+import os
+import pickle
+from multiprocessing import resource_tracker, shared_memory
+
+from agent_core import Agent
+
+class _SharedPayload:
+    """Reference to a pickled payload placed in a shared memory block"""
+    __slots__ = ("name", "size")
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+def _send(conn, obj, shm_threshold):
+    data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+    if shm_threshold is None or len(data) < shm_threshold:
+        conn.send_bytes(data)
+        return
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        block.buf[:len(data)] = data
+        conn.send_bytes(pickle.dumps(_SharedPayload(block.name, len(data))))
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    # The receiver unlinks the block once it has read it
+    block.close()
+
+def _receive(conn):
+    obj = pickle.loads(conn.recv_bytes())
+    if not isinstance(obj, _SharedPayload):
+        return obj
+    block = shared_memory.SharedMemory(name=obj.name)
+    try:
+        with block.buf[:obj.size] as view:
+            return pickle.loads(view)
+    finally:
+        block.close()
+        block.unlink()
+
+def _serve(conn, worker, shm_threshold):
+    """Child process loop: run batches of tasks until the parent sends an empty message"""
+    while True:
+        try:
+            tasks = _receive(conn)
+        except (EOFError, OSError):
+            break
+        try:
+            reply = (True, worker._process_batch(tasks))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            _send(conn, reply, shm_threshold)
+        except (EOFError, OSError):
+            break
+        except Exception as e:
+            # The result or exception could not be pickled
+            _send(conn, (False, RuntimeError(f"Unpicklable reply from {worker.name}: {e}")), shm_threshold)
+
+class ProcessAgent(Agent):
+    """Agent whose _process_task (and _process_batch) runs in a child process"""
+
+    # Attributes that only make sense in the parent process
+    _runtime_attributes = ("task_queue", "result_queue", "_thread", "scheduler", "_actor_slot",
+                           "_process", "_conn", "_context")
+    # Class whose _process_batch runs in the child (None for type(self))
+    _child_class = None
+
+    def __init__(self, *args, shm_threshold=1 << 16, start_method=None, **kwargs):
+        """
+        Create an agent whose tasks run in a child process.
+
+        Args:
+            shm_threshold: Pickled tasks and results of at least this many bytes
+                go through shared memory instead of the pipe (None disables it)
+            start_method: multiprocessing start method of the child ("fork",
+                "spawn", ...; the platform default if not provided)
+
+        Other arguments are passed on to the agent class, e.g. name.
+        """
+        super().__init__(*args, **kwargs)
+        self.shm_threshold = shm_threshold
+        self.start_method = start_method
+        self._context = multiprocessing.get_context(start_method)
+        self._process = None
+        self._conn = None
+
+    def __getstate__(self):
+        """Pickle the agent without its queues, threads, pipe and child process"""
+        state = self.__dict__.copy()
+        for attribute in self._runtime_attributes:
+            state.pop(attribute, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._context = multiprocessing.get_context(self.start_method)
+        self._process = None
+        self._conn = None
+
+    def _worker(self):
+        """The object the child process calls _process_batch on"""
+        cls = self._child_class or type(self)
+        worker = cls.__new__(cls)
+        worker.__dict__.update(self.__getstate__())
+        return worker
+
+    def _ensure_process(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        self._stop_process()
+        if os.name == "posix":
+            # Share the parent's tracker with the child, so shared memory blocks the
+            # child creates and the parent unlinks are not reported as leaked
+            resource_tracker.ensure_running()
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(target=_serve, name=f"{self.name}-process",
+                                              args=(child_conn, self._worker(), self.shm_threshold))
+        self._process.daemon = True
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def _stop_process(self, timeout=1.0):
+        if self._conn is not None:
+            try:
+                # An empty message ends the child's loop; closing the pipe alone is not
+                # enough when a forked child inherited the parent's end as well
+                self._conn.send_bytes(b"")
+            except OSError:
+                pass
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._process = None
+
+    def _execute_batch(self, tasks):
+        """Run a batch of tasks in the child process, starting it if needed"""
+        self._ensure_process()
+        try:
+            _send(self._conn, tasks, self.shm_threshold)
+            ok, value = _receive(self._conn)
+        except (EOFError, OSError) as e:
+            self._stop_process()
+            raise RuntimeError(f"Process of agent {self.name} exited: {e}")
+        if not ok:
+            raise value
+        return value
+
+    def is_process_alive(self):
+        """Check whether the agent's child process is running"""
+        return self._process is not None and self._process.is_alive()
+
+    def free(self):
+        """Terminate the agent and its child process"""
+        freed = super().free()
+        self._stop_process()
+        return freed
+
+_process_backed_classes = {}
+
+def process_backed(agent_class):
+    """
+    Return a ProcessAgent variant of an existing Agent subclass.
+
+    The returned class takes the same arguments as agent_class (plus
+    ProcessAgent's keyword arguments), and runs agent_class._process_task in
+    a child process, e.g. process_backed(DatabaseAgent)("db", db_path=path).
+    """
+    if issubclass(agent_class, ProcessAgent):
+        return agent_class
+    cls = _process_backed_classes.get(agent_class)
+    if cls is None:
+        cls = type(f"Process{agent_class.__name__}", (ProcessAgent, agent_class),
+                   {"_child_class": agent_class, "__module__": __name__})
+        _process_backed_classes[agent_class] = cls
+    return cls
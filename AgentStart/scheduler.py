@@ -0,0 +1,149 @@
+"""
+Actor scheduler for AgentStart agents.
+Runs any number of agents on a fixed pool of worker threads instead of
+one thread per agent. An agent only occupies a worker while it has queued
+tasks, and each agent's tasks are still processed one at a time, in order.
+"""
+
+import queue
+import threading
+import logging
+
+class _ActorSlot:
+    """Scheduling state the scheduler keeps on each attached agent"""
+    __slots__ = ("lock", "running", "scheduled", "stopped")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = False    # Attached and not yet terminated
+        self.scheduled = False  # In the ready queue or being drained by a worker
+        self.stopped = threading.Event()
+
+class ActorScheduler:
+    def __init__(self, workers=8, throughput=64, name="AgentScheduler"):
+        """
+        Start the worker threads.
+
+        Args:
+            workers: Number of worker threads shared by all agents
+            throughput: Tasks a worker processes for one agent before moving
+                on to the next ready agent, so busy agents cannot starve others
+            name: Prefix of the worker thread names
+        """
+        self.workers = workers
+        self.throughput = throughput
+        self.logger = logging.getLogger("ActorScheduler")
+        self._ready = queue.Queue()
+        self._threads = []
+        self._closed = False
+        self._lock = threading.Lock()
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"{name}-{i}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _slot(self, agent):
+        if agent._actor_slot is None:
+            with self._lock:
+                if agent._actor_slot is None:
+                    agent._actor_slot = _ActorSlot()
+        return agent._actor_slot
+
+    def attach(self, agent):
+        """Start running an agent on this scheduler; returns False if it already runs"""
+        if self._closed:
+            raise RuntimeError("Scheduler is shut down")
+        slot = self._slot(agent)
+        with slot.lock:
+            if slot.running:
+                return False
+            slot.running = True
+            slot.stopped.clear()
+        if not agent.task_queue.empty():
+            self._schedule(agent)
+        return True
+
+    def submit(self, agent):
+        """Make sure an agent that was just sent a task gets a worker"""
+        slot = self._slot(agent)
+        if not slot.running:
+            self.attach(agent)
+        else:
+            self._schedule(agent)
+
+    def detach(self, agent, timeout=1.0):
+        """Terminate an agent after its queued tasks; returns False if it was not running"""
+        slot = self._slot(agent)
+        if not slot.running:
+            return False
+        agent.task_queue.put("TERMINATE")
+        self._schedule(agent)
+        slot.stopped.wait(timeout)
+        return True
+
+    def is_running(self, agent):
+        """Check whether an agent is attached and not terminated"""
+        return agent._actor_slot is not None and agent._actor_slot.running
+
+    def _schedule(self, agent):
+        slot = agent._actor_slot
+        with slot.lock:
+            if slot.scheduled:
+                return
+            slot.scheduled = True
+        self._ready.put(agent)
+
+    def _work(self):
+        while True:
+            agent = self._ready.get()
+            if agent is None:
+                break
+            try:
+                self._drain(agent)
+            except Exception as e:
+                # Keep the worker alive and give the agent's remaining tasks another turn
+                self.logger.error("Error running agent %s: %s", agent.name, e)
+                with agent._actor_slot.lock:
+                    agent._actor_slot.scheduled = False
+                if not agent.task_queue.empty():
+                    self._schedule(agent)
+
+    def _drain(self, agent):
+        """Process up to throughput tasks of one agent, in batches of its batch_size"""
+        slot = agent._actor_slot
+        budget = self.throughput
+        while budget > 0:
+            items = agent._collect([], min(agent.batch_size, budget))
+            if not items:
+                with slot.lock:
+                    # A task put after the queue looked empty is seen here, or schedules the agent again
+                    if agent.task_queue.empty():
+                        slot.scheduled = False
+                        return
+                budget -= 1
+                continue
+            budget -= len(items)
+            if not agent._handle_batch(items):
+                with slot.lock:
+                    slot.running = False
+                    slot.scheduled = False
+                slot.stopped.set()
+                return
+        # Still busy: go to the back of the ready queue
+        self._ready.put(agent)
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads (agents with queued tasks are not drained)"""
+        self._closed = True
+        for _ in self._threads:
+            self._ready.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
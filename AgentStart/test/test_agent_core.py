@@ -5,7 +5,8 @@ Tests for the core Agent functionality
 import unittest
 import time
 import queue
-from AgentStart.agent_core import Agent
+from concurrent.futures import Future
+from AgentStart.agent_core import Agent, TaskFailure, _Envelope
 
 class TestAgent(unittest.TestCase):
     def setUp(self):
@@ -94,5 +95,138 @@ class TestAgent(unittest.TestCase):
         self.assertEqual(error_agent.state, "failed")
         self.assertTrue("error" in result)
 
+    def test_tell_returns_future(self):
+        """Test that pipelined tasks resolve their own futures"""
+        futures = [self.agent.tell(f"Task {i}") for i in range(20)]
+        for i, future in reversed(list(enumerate(futures))):
+            self.assertEqual(future.result(timeout=5)["result"], f"Processed: Task {i}")
+        
+        # Results still reach ask/wait in order
+        self.assertEqual(self.agent.wait(timeout=1)["result"], "Processed: Task 0")
+    
+    def test_future_exception(self):
+        """Test that a failing task raises from its future"""
+        class ErrorAgent(Agent):
+            def _process_task(self, task):
+                if task == "bad":
+                    raise ValueError("Test error")
+                return task
+        
+        error_agent = ErrorAgent(queue_results=False)
+        bad = error_agent.tell("bad")
+        good = error_agent.tell("good")
+        with self.assertRaises(ValueError):
+            bad.result(timeout=5)
+        self.assertEqual(good.result(timeout=5), "good")
+        self.assertEqual(error_agent.ask()["status"], "no_result_available")
+    
+    def test_cancelled_future_skips_task(self):
+        """Test that a task cancelled before it starts is never processed"""
+        processed = []
+        
+        class RecordingAgent(Agent):
+            def _process_task(self, task):
+                processed.append(task)
+                return task
+        
+        agent = RecordingAgent()
+        future = Future()
+        agent.task_queue.put(_Envelope("skipped", future))
+        self.assertTrue(future.cancel())
+        agent.tell("kept").result(timeout=5)
+        self.assertEqual(processed, ["kept"])
+        self.assertEqual(agent.wait(timeout=1), "kept")
+        self.assertEqual(agent.ask()["status"], "no_result_available")
+    
+    def test_batch_draining(self):
+        """Test that queued tasks reach _process_batch in batches of batch_size"""
+        batches = []
+        
+        class BatchAgent(Agent):
+            def _process_batch(self, tasks):
+                batches.append(list(tasks))
+                return [task * 2 for task in tasks]
+        
+        agent = BatchAgent(batch_size=4)
+        futures = []
+        for i in range(10):
+            future = Future()
+            futures.append(future)
+            agent.task_queue.put(_Envelope(i, future))
+        agent.start()
+        
+        self.assertEqual([future.result(timeout=5) for future in futures], [i * 2 for i in range(10)])
+        self.assertEqual(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        # Results still reach ask/wait one per task, in order
+        self.assertEqual([agent.wait(timeout=1) for _ in range(10)], [i * 2 for i in range(10)])
+        self.assertEqual(agent.state, "ready")
+        agent.free()
+    
+    def test_batch_linger(self):
+        """Test that a batch waits up to batch_linger for more tasks"""
+        batches = []
+        
+        class BatchAgent(Agent):
+            def _process_batch(self, tasks):
+                batches.append(list(tasks))
+                return super()._process_batch(tasks)
+        
+        agent = BatchAgent(queue_results=False, batch_size=10, batch_linger=0.5)
+        first = agent.tell("a")
+        time.sleep(0.05)
+        second = agent.tell("b")
+        self.assertEqual(first.result(timeout=5)["result"], "Processed: a")
+        self.assertEqual(second.result(timeout=5)["result"], "Processed: b")
+        self.assertEqual(batches, [["a", "b"]])
+        agent.free()
+    
+    def test_batch_failures(self):
+        """Test that a failing task in a batch fails only its own future"""
+        class ErrorAgent(Agent):
+            def _process_task(self, task):
+                if task == "bad":
+                    raise ValueError("Test error")
+                return task
+        
+        agent = ErrorAgent(batch_size=8)
+        futures = {}
+        for task in ("good", "bad", "last"):
+            futures[task] = Future()
+            agent.task_queue.put(_Envelope(task, futures[task]))
+        agent.start()
+        
+        self.assertEqual(futures["good"].result(timeout=5), "good")
+        with self.assertRaises(ValueError):
+            futures["bad"].result(timeout=5)
+        self.assertEqual(futures["last"].result(timeout=5), "last")
+        self.assertEqual([agent.wait(timeout=1) for _ in range(3)], ["good", {"error": "Test error"}, "last"])
+        self.assertEqual(agent.state, "ready")
+        agent.free()
+        
+        # A result list of the wrong length fails the whole batch
+        class ShortAgent(Agent):
+            def _process_batch(self, tasks):
+                return [TaskFailure(KeyError("unused"))][:len(tasks) - 1]
+        
+        agent = ShortAgent(queue_results=False)
+        with self.assertRaises(RuntimeError):
+            agent.tell("task").result(timeout=5)
+        self.assertEqual(agent.state, "failed")
+        agent.free()
+    
+    def test_terminate_ends_batch(self):
+        """Test that draining stops at TERMINATE and later tasks stay queued"""
+        agent = Agent(batch_size=8)
+        for task in ("one", "two", "TERMINATE", "three"):
+            agent.task_queue.put(task)
+        agent.start()
+        agent._thread.join(timeout=5)
+        
+        self.assertEqual(agent.state, "done")
+        self.assertEqual(agent.wait(timeout=1)["result"], "Processed: one")
+        self.assertEqual(agent.wait(timeout=1)["result"], "Processed: two")
+        self.assertEqual(agent.ask()["status"], "no_result_available")
+        self.assertEqual(agent.task_queue.get_nowait(), "three")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
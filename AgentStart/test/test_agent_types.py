@@ -123,7 +123,34 @@ class TestFileAgent(unittest.TestCase):
         
         self.assertEqual(result["status"], "error")
         self.assertEqual(result["message"], "Invalid task format")
-
+    
+    def test_batch_groups_writes(self):
+        """Test that a burst of writes to one file writes it once, then reads see the last write"""
+        tasks = [{"action": "write", "path": self.test_file, "content": f"Version {i}"} for i in range(5)]
+        tasks.append({"action": "read", "path": self.test_file})
+        
+        written = []
+        original = self.agent._process_task
+        self.agent._process_task = lambda task: written.append(task.get("content")) or original(task)
+        results = self.agent._process_batch(tasks)
+        
+        self.assertEqual(written, ["Version 4", None])
+        self.assertEqual([result["status"] for result in results], ["success"] * 6)
+        self.assertEqual(results[-1]["content"], "Version 4")
+    
+    def test_batch_failed_write(self):
+        """Test that a failing write in a batch reports its own error"""
+        bad_path = os.path.join(self.test_dir, "missing", "file.txt")
+        results = self.agent._process_batch([
+            {"action": "write", "path": bad_path, "content": "Lost"},
+            {"action": "write", "path": self.test_file, "content": "Kept"},
+            {"action": "write", "path": bad_path, "content": "Lost again"},
+            "not json",
+        ])
+        
+        self.assertEqual([result["status"] for result in results], ["error", "success", "error", "error"])
+        with open(self.test_file) as f:
+            self.assertEqual(f.read(), "Kept")
 
 class TestDatabaseAgent(unittest.TestCase):
     def setUp(self):
@@ -220,6 +247,43 @@ class TestDatabaseAgent(unittest.TestCase):
         
         self.assertEqual(result["status"], "error")
         self.assertEqual(result["message"], "Unknown action")
+    
+    def test_batch_transaction(self):
+        """Test that a batch runs in one transaction and a failing statement is rolled back alone"""
+        self.agent._process_task("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        insert = "INSERT INTO items (name) VALUES (?)"
+        results = self.agent._process_batch([
+            {"action": "query", "sql": insert, "params": ["one"], "fetch": False},
+            {"action": "query", "sql": insert, "params": ["one"], "fetch": False},
+            {"action": "query", "sql": insert, "params": ["two"], "fetch": False},
+            {"action": "unknown"},
+            "SELECT name FROM items ORDER BY id",
+        ])
+        
+        self.assertEqual([result["status"] for result in results], ["success", "error", "success", "error", "success"])
+        self.assertIn("UNIQUE", results[1]["message"])
+        self.assertEqual(results[4]["rows"], [("one",), ("two",)])
+        self.assertFalse(self.agent.conn.in_transaction)
+    
+    def test_batch_commits_before_transaction_control(self):
+        """Test that statements which cannot run in a transaction run on their own"""
+        with tempfile.TemporaryDirectory() as test_dir:
+            db_path = os.path.join(test_dir, "test.db")
+            agent = DatabaseAgent("BatchDatabaseAgent", db_path, batch_size=16)
+            futures = [
+                agent.tell("CREATE TABLE items (name TEXT)"),
+                agent.tell({"action": "query", "sql": "INSERT INTO items VALUES (?)", "params": ["a"], "fetch": False}),
+                agent.tell("VACUUM"),
+                agent.tell("SELECT COUNT(*) FROM items"),
+            ]
+            results = [future.result(timeout=5) for future in futures]
+            agent.free()
+            
+            self.assertEqual([result["status"] for result in results], ["success"] * 4)
+            self.assertEqual(results[3]["rows"], [(1,)])
+            conn = sqlite3.connect(db_path)
+            self.assertEqual(conn.execute("SELECT name FROM items").fetchall(), [("a",)])
+            conn.close()
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
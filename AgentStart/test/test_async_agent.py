@@ -0,0 +1,88 @@
+"""
+Tests for the asyncio-native agents
+"""
+
+import unittest
+import asyncio
+import os
+import tempfile
+from AgentStart.async_agent import AsyncAgent, AsyncFileAgent, AsyncDatabaseAgent
+
+class TestAsyncAgent(unittest.IsolatedAsyncioTestCase):
+    async def test_interface(self):
+        """Test start/tell/ask/wait/free and state values"""
+        agent = AsyncAgent("TestAsyncAgent")
+        self.assertEqual(agent.state, "ready")
+        self.assertEqual((await agent.wait(timeout=0.05))["status"], "timeout")
+        self.assertTrue(await agent.start())
+        self.assertFalse(await agent.start())
+        
+        await agent.tell("Task 1")
+        result = await agent.wait(timeout=5)
+        self.assertEqual(result["result"], "Processed: Task 1")
+        self.assertEqual(agent.state, "ready")
+        self.assertEqual((await agent.ask())["status"], "no_result_available")
+        
+        self.assertTrue(await agent.free())
+        self.assertEqual(agent.state, "done")
+        self.assertFalse(await agent.free())
+    
+    async def test_tell_futures(self):
+        """Test that pipelined tasks resolve their own futures, errors included"""
+        class ErrorAgent(AsyncAgent):
+            async def _process_task(self, task):
+                if task == "bad":
+                    raise ValueError("Test error")
+                await asyncio.sleep(0)
+                return task
+        
+        agent = ErrorAgent(queue_results=False)
+        futures = [await agent.tell(task) for task in ("a", "bad", "b")]
+        self.assertEqual(await futures[2], "b")
+        self.assertEqual(await futures[0], "a")
+        with self.assertRaises(ValueError):
+            await futures[1]
+        await agent.free()
+    
+    async def test_thousands_of_agents(self):
+        """Test many I/O-bound agents sharing one event loop"""
+        class SleepyAgent(AsyncAgent):
+            async def _process_task(self, task):
+                await asyncio.sleep(0.05)
+                return task * 2
+        
+        agents = [SleepyAgent(queue_results=False) for _ in range(2000)]
+        futures = [await agent.tell(i) for i, agent in enumerate(agents)]
+        # All sleep concurrently, so this takes about one sleep, not 2000
+        results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+        self.assertEqual(results, [i * 2 for i in range(2000)])
+        await asyncio.gather(*(agent.free() for agent in agents))
+
+class TestAsyncAgentTypes(unittest.IsolatedAsyncioTestCase):
+    async def test_file_agent(self):
+        """Test file writes and reads through the executor"""
+        with tempfile.TemporaryDirectory() as test_dir:
+            path = os.path.join(test_dir, "test_file.txt")
+            agent = AsyncFileAgent()
+            write = await agent.tell({"action": "write", "path": path, "content": "Async content"})
+            self.assertEqual((await write)["status"], "success")
+            read = await agent.tell({"action": "read", "path": path})
+            self.assertEqual((await read)["content"], "Async content")
+            listing = await agent.tell({"action": "list", "path": test_dir})
+            self.assertEqual((await listing)["files"], ["test_file.txt"])
+            await agent.free()
+    
+    async def test_database_agent(self):
+        """Test that statements share one connection on the agent's own thread"""
+        agent = AsyncDatabaseAgent()
+        await agent.tell("CREATE TABLE items (name TEXT)")
+        await agent.tell({"action": "query", "sql": "INSERT INTO items VALUES (?)", "params": ["x"], "fetch": False})
+        rows = await (await agent.tell("SELECT name FROM items"))
+        self.assertEqual(rows["rows"], [("x",)])
+        error = await (await agent.tell("SELECT * FROM missing"))
+        self.assertEqual(error["status"], "error")
+        await agent.free()
+        self.assertIsNone(agent.conn)
+
+if __name__ == '__main__':
+    unittest.main()
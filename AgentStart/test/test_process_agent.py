@@ -0,0 +1,169 @@
+"""
+Tests for agents whose tasks run in a child process
+"""
+
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from AgentStart.agent_types import FileAgent, DatabaseAgent
+from AgentStart.process_agent import ProcessAgent, process_backed
+from AgentStart.scheduler import ActorScheduler
+
+class PidAgent(ProcessAgent):
+    """Reports the process its tasks run in"""
+
+    def _process_task(self, task):
+        if task == "fail":
+            raise ValueError("Task failed")
+        if task == "sleep":
+            time.sleep(30)
+        if task == "pause":
+            time.sleep(0.5)
+        if isinstance(task, bytes):
+            return task[::-1]
+        return {"status": "completed", "pid": os.getpid(), "task": task}
+
+class TestProcessAgent(unittest.TestCase):
+    def setUp(self):
+        self.agent = PidAgent("TestProcessAgent")
+
+    def tearDown(self):
+        self.agent.free()
+
+    def test_interface(self):
+        """Test that tell/ask/wait/free and state work as for a thread-backed agent"""
+        self.assertEqual(self.agent.state, "ready")
+        self.assertTrue(self.agent.start())
+
+        self.agent.tell("Task 1")
+        result = self.agent.wait(timeout=10)
+        self.assertEqual(result["task"], "Task 1")
+        self.assertNotEqual(result["pid"], os.getpid())
+        self.assertEqual(self.agent.state, "ready")
+        self.assertEqual(self.agent.ask()["status"], "no_result_available")
+        self.assertTrue(self.agent.is_process_alive())
+
+        self.assertTrue(self.agent.free())
+        self.assertEqual(self.agent.state, "done")
+        self.assertFalse(self.agent.is_process_alive())
+        self.assertFalse(self.agent.free())
+
+    def test_tasks_share_one_process(self):
+        """Test that tasks run in order in the same child process"""
+        futures = [self.agent.tell(i) for i in range(20)]
+        results = [future.result(timeout=10) for future in futures]
+        self.assertEqual([result["task"] for result in results], list(range(20)))
+        self.assertEqual(len({result["pid"] for result in results}), 1)
+
+    def test_exception_reaches_future(self):
+        """Test that an exception raised in the child fails the task's future"""
+        future = self.agent.tell("fail")
+        with self.assertRaises(ValueError):
+            future.result(timeout=10)
+        self.assertEqual(self.agent.wait(timeout=1), {"error": "Task failed"})
+        self.assertEqual(self.agent.state, "failed")
+        # The agent keeps processing tasks
+        self.assertEqual(self.agent.tell("next").result(timeout=10)["task"], "next")
+
+    def test_large_payload_uses_shared_memory(self):
+        """Test that payloads above the threshold round-trip through shared memory"""
+        agent = PidAgent("SharedMemoryAgent", queue_results=False, shm_threshold=1024)
+        try:
+            payload = os.urandom(1 << 20)
+            self.assertEqual(agent.tell(payload).result(timeout=10), payload[::-1])
+            self.assertEqual(agent.tell(b"small").result(timeout=10), b"llams")
+        finally:
+            agent.free()
+
+    def test_child_exit_fails_task_and_restarts(self):
+        """Test that a dead child fails the running task and is replaced on the next one"""
+        first = self.agent.tell("first").result(timeout=10)["pid"]
+        future = self.agent.tell("sleep")
+        time.sleep(0.5)
+        self.agent._process.kill()
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=10)
+        self.assertEqual(self.agent.state, "failed")
+        second = self.agent.tell("again").result(timeout=10)["pid"]
+        self.assertNotEqual(first, second)
+
+    def test_batch_is_one_round_trip(self):
+        """Test that a batch of tasks is sent to the child in one message"""
+        agent = PidAgent("BatchProcessAgent", queue_results=False, batch_size=8)
+        sent = []
+        original = agent._execute_batch
+        agent._execute_batch = lambda tasks: sent.append(len(tasks)) or original(tasks)
+        try:
+            # Tasks told while the child works on "pause" are queued up as one batch
+            paused = agent.tell("pause")
+            futures = [agent.tell(i) for i in range(7)]
+            failing = agent.tell("fail")
+            self.assertEqual(paused.result(timeout=10)["task"], "pause")
+            self.assertEqual([future.result(timeout=10)["task"] for future in futures], list(range(7)))
+            with self.assertRaises(ValueError):
+                failing.result(timeout=10)
+            self.assertEqual(sent, [1, 8])
+        finally:
+            agent.free()
+
+    def test_getstate_drops_runtime_attributes(self):
+        """Test that pickling leaves out queues, threads and the child process"""
+        self.agent.tell("Task").result(timeout=10)
+        copy = pickle.loads(pickle.dumps(self.agent))
+        self.assertEqual(copy.name, self.agent.name)
+        self.assertIsNone(copy._process)
+        self.assertNotIn("task_queue", copy.__dict__)
+        self.assertNotIn("_thread", self.agent.__getstate__())
+
+    def test_scheduler(self):
+        """Test that a process-backed agent can run on the shared scheduler"""
+        with ActorScheduler(workers=2) as scheduler:
+            agent = PidAgent("Scheduled", scheduler=scheduler)
+            try:
+                self.assertEqual(agent.tell("Task").result(timeout=10)["task"], "Task")
+            finally:
+                agent.free()
+            self.assertFalse(agent.is_process_alive())
+
+class TestProcessBacked(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_file_agent(self):
+        """Test a process-backed FileAgent, started with spawn"""
+        ProcessFileAgent = process_backed(FileAgent)
+        self.assertIs(process_backed(FileAgent), ProcessFileAgent)
+        self.assertTrue(issubclass(ProcessFileAgent, FileAgent))
+
+        agent = ProcessFileAgent("Files", start_method="spawn")
+        try:
+            path = os.path.join(self.test_dir, "test.txt")
+            agent.tell({"action": "write", "path": path, "content": "Hello"})
+            self.assertEqual(agent.wait(timeout=30)["status"], "success")
+            agent.tell({"action": "read", "path": path})
+            self.assertEqual(agent.wait(timeout=10)["content"], "Hello")
+        finally:
+            agent.free()
+
+    def test_database_agent(self):
+        """Test that a process-backed DatabaseAgent keeps its connection in the child"""
+        db_path = os.path.join(self.test_dir, "test.db")
+        agent = process_backed(DatabaseAgent)("Database", db_path=db_path)
+        try:
+            agent.tell("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+            agent.tell({"action": "query", "sql": "INSERT INTO items (name) VALUES (?)",
+                        "params": ["one"], "fetch": False})
+            future = agent.tell("SELECT name FROM items")
+            self.assertEqual(future.result(timeout=10)["rows"], [("one",)])
+            self.assertIsNone(agent.conn)
+        finally:
+            agent.free()
+
+if __name__ == "__main__":
+    unittest.main()
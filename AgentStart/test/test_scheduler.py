@@ -0,0 +1,108 @@
+"""
+Tests for running agents on the shared actor scheduler
+"""
+
+import unittest
+import threading
+import time
+from AgentStart.agent_core import Agent
+from AgentStart.scheduler import ActorScheduler
+
+class TestActorScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ActorScheduler(workers=4)
+    
+    def tearDown(self):
+        self.scheduler.shutdown()
+    
+    def test_interface(self):
+        """Test that start/tell/ask/wait/free work on a scheduled agent"""
+        agent = Agent("Scheduled", scheduler=self.scheduler)
+        self.assertTrue(agent.start())
+        self.assertFalse(agent.start())
+        self.assertIsNone(agent._thread)
+        
+        agent.tell("Task 1")
+        result = agent.wait(timeout=5)
+        self.assertEqual(result["result"], "Processed: Task 1")
+        self.assertEqual(agent.state, "ready")
+        self.assertEqual(agent.ask()["status"], "no_result_available")
+        
+        self.assertTrue(agent.free())
+        self.assertEqual(agent.state, "done")
+        self.assertFalse(agent.free())
+        
+        # Telling a freed agent starts it again, like a thread-backed agent
+        self.assertEqual(agent.tell("Task 2").result(timeout=5)["result"], "Processed: Task 2")
+    
+    def test_many_agents_share_workers(self):
+        """Test that thousands of agents run without a thread each"""
+        threads_before = threading.active_count()
+        agents = [Agent(f"Agent {i}", queue_results=False, scheduler=self.scheduler) for i in range(2000)]
+        futures = [agent.tell(i) for i, agent in enumerate(agents)]
+        for i, future in enumerate(futures):
+            self.assertEqual(future.result(timeout=10)["result"], f"Processed: {i}")
+        self.assertLessEqual(threading.active_count(), threads_before)
+    
+    def test_per_agent_ordering(self):
+        """Test that one agent's tasks run in order and never concurrently"""
+        class OrderedAgent(Agent):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.seen = []
+                self.active = 0
+                self.overlapped = False
+            
+            def _process_task(self, task):
+                self.active += 1
+                self.overlapped = self.overlapped or self.active > 1
+                time.sleep(0.0005)
+                self.seen.append(task)
+                self.active -= 1
+                return task
+        
+        agents = [OrderedAgent(queue_results=False, scheduler=self.scheduler) for _ in range(8)]
+        
+        def send(agent):
+            return [agent.tell(i) for i in range(200)]
+        
+        futures = [send(agent) for agent in agents]
+        for agent, agent_futures in zip(agents, futures):
+            agent_futures[-1].result(timeout=10)
+            self.assertEqual(agent.seen, list(range(200)))
+            self.assertFalse(agent.overlapped)
+    
+    def test_failed_state(self):
+        """Test that errors are reported like on a thread-backed agent"""
+        class ErrorAgent(Agent):
+            def _process_task(self, task):
+                raise ValueError("Test error")
+        
+        agent = ErrorAgent(scheduler=self.scheduler)
+        future = agent.tell("Trigger error")
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+        self.assertEqual(agent.state, "failed")
+        self.assertTrue("error" in agent.wait(timeout=1))
+    
+    def test_batches(self):
+        """Test that a scheduled agent drains its queue in batches of batch_size"""
+        batches = []
+        
+        class BatchAgent(Agent):
+            def _process_batch(self, tasks):
+                batches.append(len(tasks))
+                return list(tasks)
+        
+        agent = BatchAgent(queue_results=False, scheduler=self.scheduler, batch_size=16)
+        for i in range(40):
+            agent.task_queue.put(i)
+        future = agent.tell(40)
+        self.assertEqual(future.result(timeout=5), 40)
+        self.assertEqual(sum(batches), 41)
+        self.assertTrue(all(size <= 16 for size in batches))
+        self.assertLess(len(batches), 41)
+        agent.free()
+
+if __name__ == '__main__':
+    unittest.main()
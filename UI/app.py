@@ -1,7 +1,6 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 import sys
 import os
-import time
 import importlib
 import config as config_module
 import atexit
@@ -31,6 +30,11 @@ if not hasattr(agent_manager, 'cleanup_timer') or agent_manager.cleanup_timer is
 # Register a function to be called when the application exits
 @atexit.register
 def cleanup_on_exit():
+    if agent_manager.registry_store:
+        # Agents are persisted; leave them for the next start to resume
+        print("Application exiting, saving agent registry...")
+        agent_manager.close()
+        return
     print("Application exiting, cleaning up agents...")
     if hasattr(agent_manager, 'cleanup_timer') and agent_manager.cleanup_timer:
         agent_manager.cleanup_timer.cancel()
@@ -56,14 +60,16 @@ def create_agent():
         # Generate code from instructions
         dependencies = data.get('dependencies', '').split(',') if data.get('dependencies') else []
         dependencies = [d.strip() for d in dependencies if d.strip()]
-        agent_code = agent_manager.generate_agent_code(instructions, dependencies)
+        try:
+            agent_code = agent_manager.generate_agent_code(instructions, dependencies)
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
     
-    # Create the agent
-    agent_id = agent_manager.create_agent(agent_code, agent_name)
-    
-    # Make sure the last_active timestamp is set to now
-    if agent_id in agent_manager.active_agents:
-        agent_manager.active_agents[agent_id]['last_active'] = time.time()
+    # Create the agent (pure agents have their results cached by arguments)
+    try:
+        agent_id = agent_manager.create_agent(agent_code, agent_name, pure=bool(data.get('pure', False)))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     
     return jsonify({
         'status': 'success',
@@ -71,6 +77,20 @@ def create_agent():
         'message': f'Agent {agent_id} created successfully'
     })
 
+@app.route('/api/agent-profile/<agent_id>', methods=['GET'])
+def agent_profile(agent_id):
+    """Return the latest profile of an agent (top functions and allocation sites)."""
+    profile = agent_manager.get_agent_profile(agent_id)
+    if profile is None:
+        return jsonify({'status': 'error', 'message': f'No profile for agent {agent_id}'}), 404
+    return jsonify({'status': 'success', 'agent_id': agent_id, 'profile': profile})
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Expose agent manager metrics in the Prometheus text format."""
+    return Response(agent_manager.metrics.render_prometheus(),
+                    mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     # Use the port from the config, explicitly reload the config to ensure latest value
     importlib.reload(config_module)  # Force reload the config module
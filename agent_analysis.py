@@ -0,0 +1,133 @@
+"""
+Static analysis of agent source.
+
+Agent code is parsed once with ast when the agent is created, so syntax
+errors are caught before any run, and the record can describe the agent's
+main function and the modules it imports without executing it.
+"""
+import ast
+import importlib.util
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _format_arguments(arguments: ast.arguments) -> str:
+    """Render a function's parameter list, with defaults shown as '=...'."""
+    parts = []
+    posonly = list(getattr(arguments, "posonlyargs", []))
+    positional = posonly + list(arguments.args)
+    first_default = len(positional) - len(arguments.defaults)
+    for index, arg in enumerate(positional):
+        parts.append(arg.arg + ("=..." if index >= first_default else ""))
+        if posonly and index == len(posonly) - 1:
+            parts.append("/")
+    if arguments.vararg:
+        parts.append("*" + arguments.vararg.arg)
+    elif arguments.kwonlyargs:
+        parts.append("*")
+    for arg, default in zip(arguments.kwonlyargs, arguments.kw_defaults):
+        parts.append(arg.arg + ("=..." if default is not None else ""))
+    if arguments.kwarg:
+        parts.append("**" + arguments.kwarg.arg)
+    return "(" + ", ".join(parts) + ")"
+
+
+def _imported_modules(tree: ast.AST) -> List[str]:
+    """Return the sorted top-level names of all absolute imports in a module."""
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.add(node.module.split(".")[0])
+    return sorted(modules)
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    """Check for `if __name__ == "__main__":`."""
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    test = node.test
+    names = [test.left] + list(test.comparators)
+    return (len(test.ops) == 1 and isinstance(test.ops[0], ast.Eq)
+            and any(isinstance(n, ast.Name) and n.id == "__name__" for n in names)
+            and any(isinstance(n, ast.Constant) and n.value == "__main__" for n in names))
+
+
+def analyze_agent_source(source: str, filename: str = "<agent>") -> Dict[str, Any]:
+    """
+    Analyse agent source without executing it.
+
+    Args:
+        source: The agent source code
+        filename: Filename used in syntax error messages
+
+    Returns:
+        A dictionary with:
+            valid: Whether the source parses
+            syntax_error: The error message if it does not
+            has_main: Whether the module binds a top-level name "main"
+            main_signature: The parameter list of a `def main`, e.g. "(*args, **kwargs)"
+            main_is_async: Whether main is an `async def`
+            has_main_guard: Whether it has an `if __name__ == "__main__":` block
+            imports: Sorted top-level names of the modules it imports
+    """
+    analysis = {
+        "valid": True,
+        "syntax_error": None,
+        "has_main": False,
+        "main_signature": None,
+        "main_is_async": False,
+        "has_main_guard": False,
+        "imports": [],
+    }
+    try:
+        tree = ast.parse(source, filename)
+    except (SyntaxError, ValueError) as e:
+        analysis["valid"] = False
+        analysis["syntax_error"] = f"{type(e).__name__}: {e}"
+        return analysis
+
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "main":
+            analysis["has_main"] = True
+            analysis["main_signature"] = _format_arguments(node.args)
+            analysis["main_is_async"] = isinstance(node, ast.AsyncFunctionDef)
+        elif isinstance(node, ast.Assign) and any(
+                isinstance(target, ast.Name) and target.id == "main" for target in node.targets):
+            analysis["has_main"] = True
+        elif isinstance(node, (ast.Import, ast.ImportFrom)) and any(
+                (alias.asname or alias.name) == "main" for alias in node.names):
+            analysis["has_main"] = True
+        elif _is_main_guard(node):
+            analysis["has_main_guard"] = True
+    analysis["imports"] = _imported_modules(tree)
+    return analysis
+
+
+def prewarmable_modules(modules: Iterable[str], exclude: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Filter imports down to modules worth importing ahead of time in workers.
+
+    Built-in modules are always loaded already, and modules that cannot be
+    found here (typically the agent's own helper files) are left alone.
+
+    Args:
+        modules: Top-level module names
+        exclude: Names already warmed
+
+    Returns:
+        The names to warm
+    """
+    skip = set(sys.builtin_module_names) | set(exclude or ())
+    result = []
+    for name in modules:
+        if name in skip or name == "__future__":
+            continue
+        try:
+            if importlib.util.find_spec(name) is None:
+                continue
+        except (ImportError, ValueError):
+            continue
+        result.append(name)
+    return result
@@ -0,0 +1,180 @@
+"""
+On-disk layout of agent files.
+
+The flat layout keeps every agent file directly in agents_dir. The sharded
+layout gives each manager its own subdirectory and fans files out over
+hash-prefix shards inside it:
+
+    agents_dir/<manager_id>/<sha256(agent_id)[:2]>/<agent_id>.py
+
+so no directory grows past a few hundred entries per thousand agents, and
+managers sharing agents_dir never touch each other's files. Bulk removal
+scans with os.scandir and unlinks files from a thread pool, since unlink
+releases the GIL and is dominated by filesystem latency.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def remove_files(paths: Iterable[str], workers: int = 8) -> int:
+    """
+    Delete files in parallel, ignoring ones that are already gone.
+
+    Args:
+        paths: The files to delete
+        workers: Number of threads issuing unlink calls (1 deletes serially)
+
+    Returns:
+        Number of files deleted
+    """
+    paths = list(paths)
+    if workers <= 1 or len(paths) < 64:
+        return sum(_unlink(path) for path in paths)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AgentUnlink") as executor:
+        return sum(executor.map(_unlink, paths, chunksize=256))
+
+
+def scan_files(root: str, suffix: str = ".py", recursive: bool = True) -> Iterator[str]:
+    """
+    Yield the files under a directory with os.scandir.
+
+    Args:
+        root: Directory to scan (a missing directory yields nothing)
+        suffix: Only yield files with this suffix
+        recursive: Descend into subdirectories
+
+    Yields:
+        File paths
+    """
+    pending = [root]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    yield entry.path
+
+
+def remove_tree(root: str, workers: int = 8) -> int:
+    """
+    Delete a directory tree, unlinking its files in parallel.
+
+    Args:
+        root: Directory to delete
+        workers: Number of threads issuing unlink calls
+
+    Returns:
+        Number of files deleted
+    """
+    count = remove_files(scan_files(root, suffix=""), workers)
+    # Remove directories deepest first
+    directories = [dirpath for dirpath, _, _ in os.walk(root)]
+    for dirpath in reversed(directories):
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
+    return count
+
+
+class AgentLayout:
+    """Maps agent ids to file paths in the flat or the sharded layout."""
+
+    def __init__(self, agents_dir: str, sharded: bool = False, manager_id: Optional[str] = None,
+                 fanout: int = 2):
+        """
+        Initialize the layout.
+
+        Args:
+            agents_dir: Base directory for agent files
+            sharded: Use a per-manager subdirectory with hash-prefix shards
+            manager_id: Name of this manager's subdirectory (sharded layout only)
+            fanout: Hex digits of the agent id hash used as the shard name
+        """
+        self.agents_dir = agents_dir
+        self.sharded = sharded
+        self.manager_id = manager_id
+        self.fanout = fanout
+        self.root = os.path.join(agents_dir, manager_id) if sharded else agents_dir
+        self._created = set()
+        self._lock = threading.Lock()
+
+    def shard_of(self, agent_id: str) -> str:
+        """Return the shard directory of an agent (the root in the flat layout)."""
+        if not self.sharded:
+            return self.root
+        prefix = hashlib.sha256(agent_id.encode("utf-8")).hexdigest()[:self.fanout]
+        return os.path.join(self.root, prefix)
+
+    def path_for(self, agent_id: str) -> str:
+        """
+        Return the file path of an agent, creating its shard directory if needed.
+
+        Args:
+            agent_id: The ID of the agent
+
+        Returns:
+            Path of the agent's .py file
+        """
+        shard = self.shard_of(agent_id)
+        if shard not in self._created:
+            os.makedirs(shard, exist_ok=True)
+            with self._lock:
+                self._created.add(shard)
+        return os.path.join(shard, f"{agent_id}.py")
+
+    @property
+    def objects_dir(self) -> str:
+        """Directory of this manager's shared code objects."""
+        return os.path.join(self.root, "objects")
+
+    def agent_files(self) -> Iterator[str]:
+        """Yield the agent files in this manager's part of the layout (not code objects)."""
+        if not self.sharded:
+            yield from scan_files(self.root, recursive=False)
+            return
+        try:
+            shards = [entry.path for entry in os.scandir(self.root)
+                      if entry.is_dir(follow_symlinks=False) and entry.name != "objects"]
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            yield from scan_files(shard, recursive=False)
+
+    def drop(self, workers: int = 8) -> int:
+        """
+        Delete everything in this manager's part of the layout.
+
+        The sharded layout removes the manager's whole subdirectory. The flat
+        layout only removes agent files: its code objects directory is shared
+        by every manager using agents_dir, and objects still referenced there
+        are released through the code store instead.
+
+        Args:
+            workers: Number of threads issuing unlink calls
+
+        Returns:
+            Number of files deleted
+        """
+        with self._lock:
+            self._created.clear()
+        if self.sharded:
+            return remove_tree(self.root, workers)
+        return remove_files(self.agent_files(), workers)
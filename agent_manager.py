@@ -1,13 +1,81 @@
 import os
 import uuid
+import hashlib
+import json
 import subprocess
-import importlib.util
+import tempfile
 import logging
 import threading
 import time
-from typing import Dict, Any, Optional, Callable
+import types
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Any, Optional, Iterable, Iterator, NamedTuple
 # Import the config
 from config import TEMP_AGENTS_DIR
+from code_cache import CodeCache
+from result_cache import MISSING, ResultCache, result_key
+from resident import ResidentModules
+from code_store import CodeStore, code_digest
+from agent_layout import AgentLayout
+from agent_templates import AgentCodeGenerator
+from agent_analysis import analyze_agent_source, prewarmable_modules
+from metrics import MetricsRegistry
+from registry_store import RegistryStore
+from profiling import PROFILER_SCRIPT, ProfileCapture, should_profile, validate_modes
+from worker_pool import InterpreterPool
+from fork_server import ForkServer
+from expiry_scheduler import ExpiryScheduler
+from agent_registry import AgentRegistry
+from output_stream import StreamingRun
+from resource_limits import (AgentTimeoutError, resolve_limits, make_preexec_fn,
+                             classify_failure, call_with_timeout)
+
+# Statuses of agents that are not running and finished their last run
+FINISHED_STATUSES = ('completed', 'error', 'timeout', 'oom')
+
+# Per-process code cache used by run_many's process executor
+_process_code_cache = CodeCache()
+
+
+def _run_agent_in_process(agent_id: str, file_path: Optional[str], args: tuple, kwargs: dict,
+                          source: Optional[str] = None, code_hash: Optional[str] = None) -> Any:
+    """
+    Execute an agent's main function inside a process pool worker.
+    
+    Args:
+        agent_id: The ID of the agent to run
+        file_path: Path to the agent file (None for in-memory agents)
+        args, kwargs: Arguments to pass to the agent
+        source: Agent source for in-memory agents
+        code_hash: Content hash of source
+        
+    Returns:
+        The result from the agent execution (must be picklable)
+    """
+    module = types.ModuleType(agent_id)
+    if source is not None:
+        code = _process_code_cache.load_source(agent_id, source, code_hash, f"<agent {agent_id}>")
+    else:
+        code = _process_code_cache.load(agent_id, file_path)
+        module.__file__ = file_path
+    exec(code, module.__dict__)
+    if not hasattr(module, "main"):
+        raise AttributeError(f"Agent {agent_id} does not have a main function")
+    return module.main(*args, **kwargs)
+
+
+class SubprocessRun(NamedTuple):
+    """A subprocess run of an agent, prepared by AgentManager.prepare_subprocess_run."""
+    agent_id: str
+    command: list                 # Full command line, including the profiler bootstrap if profiled
+    file_path: str                # The agent file
+    args: list                    # Command-line arguments for the agent
+    backend: str                  # 'spawn', 'pool' or 'forkserver', as this run will actually use
+    limits: dict                  # Resolved limits, with any timeout override applied
+    report_path: Optional[str]    # Where a profiled run writes its report
+    started: float                # time.perf_counter() when the run was requested
+
 
 class AgentManager:
     """
@@ -23,14 +91,13 @@ class AgentManager:
             config: Configuration for the agent manager
         """
         self.agents_dir = agents_dir
-        self.active_agents = {}
         
         # Create the agents directory if it doesn't exist
         os.makedirs(self.agents_dir, exist_ok=True)
         
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger("AgentManager")
-        self.logger.info(f"Agent Manager initialized with agents directory: {self.agents_dir}")
+        self.logger.info("Agent Manager initialized with agents directory: %s", self.agents_dir)
         
         # Ensure config is properly initialized
         self.config = config if config is not None else {}
@@ -38,62 +105,407 @@ class AgentManager:
         if 'inactive_timeout' not in self.config:
             self.config['inactive_timeout'] = 300  # Default 5 minutes
         
-        self.logger.info(f"Agent Manager configured with inactive_timeout: {self.config['inactive_timeout']} seconds")
+        self.logger.info("Agent Manager configured with inactive_timeout: %s seconds", self.config['inactive_timeout'])
+        
+        self._init_metrics()
+        
+        # Where agent files live: flat in agents_dir, or in this manager's own sharded subdirectory
+        self.manager_id = self._resolve_manager_id()
+        self.layout = AgentLayout(self.agents_dir, sharded=self.config.get('sharded_agents_dir', False),
+                                  manager_id=self.manager_id)
+        
+        # Optional persistent mirror of the registry, so a restarted manager can resume
+        self.registry_store = None
+        if self.config.get('registry_path'):
+            self.registry_store = RegistryStore(self.config['registry_path'])
+        
+        # Lock-striped registry, shared safely by request threads and the reaper thread
+        self.active_agents = AgentRegistry(
+            stripes=self.config.get('registry_stripes', 16),
+            listener=self.registry_store.record_changed if self.registry_store else None
+        )
+        
+        # Cache of compiled agent code, so repeated runs skip re-reading and re-compiling
+        self.code_cache = CodeCache(
+            max_entries=self.config.get('code_cache_size', 256),
+            max_bytes=self.config.get('code_cache_max_bytes', 64 * 1024 * 1024)
+        )
+        
+        # Results of agents created with pure=True, keyed by code hash and arguments
+        self.result_cache = None
+        if self.config.get('result_cache_size', 1024) > 0:
+            self.result_cache = ResultCache(
+                max_entries=self.config.get('result_cache_size', 1024),
+                max_bytes=self.config.get('result_cache_max_bytes', 16 * 1024 * 1024),
+                ttl=self.config.get('result_cache_ttl', 300)
+            )
+        
+        # Modules of agents created with resident=True, loaded once and kept between runs
+        self.resident_modules = ResidentModules(
+            max_bytes=self.config.get('resident_max_bytes', 256 * 1024 * 1024),
+            on_evict=self._on_resident_evicted
+        )
+        
+        # Memoizing template engine behind generate_agent_code
+        self.code_generator = AgentCodeGenerator(cache_size=self.config.get('generated_code_cache_size', 128))
+        
+        # Content-addressed store shared by agents with identical code (opt-in)
+        self.code_store = None
+        if self.config.get('dedupe_agent_code', False):
+            self.code_store = self._new_code_store()
         
-        # Set up the cleanup timer
+        # Warm interpreter pool for run_agent_subprocess, started only for the 'pool' backend
+        self.subprocess_pool = None
+        self._subprocess_pool_lock = threading.Lock()
+        if self.config.get('subprocess_backend', 'spawn') == 'pool':
+            self._get_subprocess_pool()
+        
+        # Fork server for the 'forkserver' backend: runs fork from a process with modules preloaded
+        self.fork_server = None
+        self._fork_server_lock = threading.Lock()
+        if self.config.get('subprocess_backend', 'spawn') == 'forkserver':
+            self._get_fork_server()
+        
+        # Modules already considered for pre-warming in the pool or fork server
+        self._prewarmed = set()
+        self._prewarm_lock = threading.Lock()
+        
+        # Set up the cleanup timer: one reaper thread that sleeps until the next deadline
+        self.expiry_scheduler = ExpiryScheduler(self._on_agent_deadline)
+        # The inactive_timeout the armed deadlines were computed with, to notice direct config edits
+        self._armed_inactive_timeout = self.config['inactive_timeout']
+        if self.registry_store:
+            self._recover_agents()
         self.cleanup_timer = None
         self._start_cleanup_timer()
     
+    def _recover_agents(self) -> int:
+        """
+        Restore agents recorded by a previous manager from the persistent registry.
+        
+        Records are loaded in bulk and their inactivity deadlines re-armed in one
+        heap rebuild. Runs interrupted by the restart are marked as errors.
+        
+        Returns:
+            Number of agents recovered
+        """
+        records = self.registry_store.load()
+        if not records:
+            return 0
+        
+        refcounts = {}
+        interrupted = []
+        for agent_id, record in records.items():
+            if record["code_ref"] is not None:
+                refcounts[record["code_ref"]] = refcounts.get(record["code_ref"], 0) + 1
+            if record["status"] == "running":
+                interrupted.append(agent_id)
+        if refcounts:
+            # Shared code objects keep being reference-counted even if dedupe was turned off since
+            if self.code_store is None:
+                self.code_store = self._new_code_store()
+            self.code_store.restore(refcounts)
+        
+        self.active_agents.bulk_load(records)
+        for agent_id in interrupted:
+            self.active_agents.transition(agent_id, "error", error="Interrupted by a manager restart")
+        timeout = self.config['inactive_timeout']
+        self.expiry_scheduler.schedule_many(
+            (agent_id, record["last_active"] + timeout) for agent_id, record in records.items()
+        )
+        self.logger.info("Recovered %s agents from %s", len(records), self.registry_store.path)
+        return len(records)
+    
+    def _resolve_manager_id(self) -> str:
+        """
+        Name this manager's subdirectory in the sharded layout.
+        
+        A manager with a persistent registry keeps the same id across restarts,
+        so it finds its recovered agents' files in its own directory.
+        """
+        if self.config.get('manager_id'):
+            return str(self.config['manager_id'])
+        if self.config.get('registry_path'):
+            registry_path = os.path.abspath(self.config['registry_path'])
+            return "m" + hashlib.sha256(registry_path.encode("utf-8")).hexdigest()[:12]
+        return f"m{uuid.uuid4().hex[:12]}"
+    
+    def _new_code_store(self) -> CodeStore:
+        """Create the shared code store in this manager's part of the layout."""
+        return CodeStore(self.layout.objects_dir, fanout=self.layout.fanout if self.layout.sharded else 0)
+    
+    def _init_metrics(self):
+        """Create the counters and latency histograms recorded on the hot paths."""
+        self.metrics = MetricsRegistry(enabled=self.config.get('metrics_enabled', True))
+        self._m_creates = self.metrics.counter(
+            "agent_creates_total", "Agents created", ("storage",))
+        self._m_create_seconds = self.metrics.histogram(
+            "agent_create_seconds", "Time spent in create_agent")
+        self._m_runs = self.metrics.counter(
+            "agent_runs_total", "Agent runs by execution mode and outcome", ("mode", "status"))
+        self._m_run_seconds = self.metrics.histogram(
+            "agent_run_seconds", "Agent run latency by execution mode", ("mode",))
+        self._m_cleanups = self.metrics.counter(
+            "agent_cleanups_total", "Agents cleaned up, by reason", ("reason",))
+        self._m_sweep_seconds = self.metrics.histogram(
+            "agent_cleanup_sweep_seconds", "Time spent in full inactivity sweeps")
+        self._m_status_lookups = self.metrics.counter(
+            "agent_status_lookups_total", "get_agent_status calls")
+        self._m_status_seconds = self.metrics.histogram(
+            "agent_status_seconds", "Time spent in get_agent_status")
+        self.metrics.gauge("agents_active", "Agents currently registered",
+                           lambda: len(self.active_agents))
+        self.metrics.gauge("agent_code_cache_hits", "Compiled code cache hits",
+                           lambda: self.code_cache.hits)
+        self.metrics.gauge("agent_code_cache_misses", "Compiled code cache misses",
+                           lambda: self.code_cache.misses)
+        self.metrics.gauge("agent_resident_bytes", "Estimated memory of resident agent modules",
+                           lambda: self.resident_modules.stats()["bytes"])
+        self.metrics.gauge("agent_result_cache_hits", "Pure agent result cache hits",
+                           lambda: self.result_cache.hits if self.result_cache else 0)
+        self.metrics.gauge("agent_result_cache_misses", "Pure agent result cache misses",
+                           lambda: self.result_cache.misses if self.result_cache else 0)
+    
+    def _observe_run(self, mode: str, status: str, started: float):
+        """Record the outcome and latency of one agent run."""
+        self._m_runs.inc(mode, status)
+        self._m_run_seconds.observe(time.perf_counter() - started, mode)
+    
     def _start_cleanup_timer(self):
-        """Start a timer to periodically check for inactive agents."""
-        # Check every 2 seconds instead of 10 for inactive agents
+        """Start the reaper thread that expires inactive agents and runs delayed cleanups."""
         if self.cleanup_timer and self.cleanup_timer.is_alive():
             self.logger.warning("Cleanup timer already running, not starting a new one")
             return
         
-        self.logger.debug("Starting cleanup timer to check for inactive agents every 2 seconds")
-        self.cleanup_timer = threading.Timer(2, self._cleanup_timer_callback)  # Changed from 10 to 2
-        self.cleanup_timer.daemon = True
-        self.cleanup_timer.start()
+        self.logger.debug("Starting expiry scheduler for inactive agents")
+        self.expiry_scheduler.start()
+        self.cleanup_timer = self.expiry_scheduler
     
-    def _cleanup_timer_callback(self):
-        """Callback for the cleanup timer."""
-        self.logger.debug("Cleanup timer triggered, checking for inactive agents")
-        self._cleanup_inactive_agents()
-        # Restart the timer
-        self._start_cleanup_timer()
+    def _touch_agent(self, agent_id: str):
+        """
+        Mark an agent as active now and re-arm its inactivity deadline.
+        
+        Args:
+            agent_id: The ID of the agent to touch
+        """
+        if self.config['inactive_timeout'] != self._armed_inactive_timeout:
+            self.set_inactive_timeout(self.config['inactive_timeout'])
+        now = time.time()
+        if self.active_agents.update_record(agent_id, last_active=now):
+            self.expiry_scheduler.schedule(agent_id, now + self.config['inactive_timeout'])
     
-    def create_agent(self, agent_code: str, agent_name: Optional[str] = None) -> str:
+    def set_inactive_timeout(self, timeout: float):
+        """
+        Change the inactivity timeout and re-arm every agent's deadline with it.
+        
+        A lowered timeout takes effect immediately. Editing config['inactive_timeout']
+        directly is picked up the next time any agent is touched.
+        
+        Args:
+            timeout: Seconds of inactivity before an agent is cleaned up
+        """
+        self.config['inactive_timeout'] = timeout
+        self._armed_inactive_timeout = timeout
+        self.expiry_scheduler.schedule_many(
+            (agent_id, record['last_active'] + timeout) for agent_id, record in self.active_agents.items()
+        )
+        self.logger.info("Inactive timeout set to %s seconds", timeout)
+    
+    def _is_inactive(self, agent_data: dict, now: float) -> bool:
+        """
+        Check whether an agent record is due for inactivity cleanup.
+        
+        Args:
+            agent_data: The agent's registry record
+            now: The current time
+            
+        Returns:
+            True if the agent should be cleaned up
+        """
+        if agent_data['status'] == 'running':
+            return False
+        timeout = self.config['inactive_timeout']
+        # Special handling for 0-second timeout - clean up any inactive agent immediately
+        if timeout == 0 and agent_data['status'] in FINISHED_STATUSES:
+            return True
+        return now - agent_data['last_active'] > timeout
+    
+    def _on_agent_deadline(self, agent_id: str, kind: str):
+        """
+        Callback for the expiry scheduler.
+        
+        Args:
+            agent_id: The ID of the agent whose deadline passed
+            kind: "expire" for the inactivity deadline, "cleanup" for a delayed cleanup
+        """
+        if kind == "cleanup":
+            self._do_cleanup_agent(agent_id)
+            return
+        
+        # The timeout may have changed (or last_active been bumped) since the deadline was armed,
+        # so re-check under the registry lock before removing anything
+        now = time.time()
+        removed = self.active_agents.remove_if(agent_id, lambda record: self._is_inactive(record, now))
+        if removed is not None:
+            self.logger.debug("Agent %s inactive past its deadline - cleaning up", agent_id)
+            self._m_cleanups.inc("inactive")
+            self._release_agent(agent_id, removed)
+            return
+        
+        agent_data = self.active_agents.get(agent_id)
+        if agent_data is None:
+            return
+        timeout = self.config['inactive_timeout']
+        if agent_data['status'] == 'running':
+            self.expiry_scheduler.schedule(agent_id, now + timeout)
+        else:
+            self.expiry_scheduler.schedule(agent_id, max(now, agent_data['last_active'] + timeout))
+    
+    def create_agent(self, agent_code: str, agent_name: Optional[str] = None,
+                     storage: Optional[str] = None, limits: Optional[dict] = None,
+                     profile: Optional[bool] = None, pure: bool = False,
+                     resident: bool = False) -> str:
         """
         Create a new agent with the provided code.
         
         Args:
             agent_code: The Python code for the agent
             agent_name: Optional name for the agent (will be generated if not provided)
+            storage: "disk" writes the code to agents_dir, "memory" keeps it in memory
+                and only spills it to a file when a subprocess run needs one
+                (defaults to the 'agent_storage' config setting)
+            limits: Optional per-agent overrides of the configured execution limits,
+                keyed by timeout, cpu_seconds and memory_bytes
+            profile: True to profile every run, False to never profile it
+                (None samples runs at the 'profile_sample_rate' config setting)
+            pure: True if main is a deterministic function of its arguments, so
+                run_agent may return a cached result instead of running it again
+            resident: True to execute the module once and keep it, so later
+                run_agent calls only call main (see reload_agent)
             
         Returns:
             agent_id: A unique identifier for the created agent
+            
+        Raises:
+            ValueError: If the storage or limits are unknown, or the code fails validation
         """
+        started = time.perf_counter()
+        storage = storage or self.config.get('agent_storage', 'disk')
+        if storage not in ("disk", "memory"):
+            raise ValueError(f"Unknown agent storage: {storage}")
+        # Validate limit names up front rather than at the first run
+        resolve_limits(self.config, limits)
+        
         # Generate a unique ID for this agent
         agent_id = agent_name or f"agent_{uuid.uuid4().hex[:8]}"
         
-        # Create the file path
-        file_path = os.path.join(self.agents_dir, f"{agent_id}.py")
-        self.logger.info(f"Creating agent {agent_id} at {file_path}")
+        # Parse once now, so broken code is rejected before it costs a run
+        analysis = analyze_agent_source(agent_code, f"<agent {agent_id}>")
+        if not analysis["valid"] and self.config.get('validate_agents', True):
+            raise ValueError(f"Agent {agent_id} has invalid code: {analysis['syntax_error']}")
+        if (self.config.get('require_agent_main', False) and analysis["valid"]
+                and not (analysis["has_main"] or analysis["has_main_guard"])):
+            raise ValueError(f"Agent {agent_id} defines neither main() nor an if __name__ == \"__main__\" block")
+        code_hash = code_digest(agent_code)
+        
+        # Re-creating an agent under an existing name replaces it: release the old
+        # record's resident module, caches and code first (its file may be rewritten below)
+        previous = self.active_agents.pop(agent_id, None)
+        if previous is not None:
+            self.logger.debug("Replacing existing agent %s", agent_id)
+            self._release_agent(agent_id, previous)
         
-        # Write the agent code to the file
-        with open(file_path, "w") as f:
-            f.write(agent_code)
+        if storage == "memory":
+            self.logger.debug("Creating in-memory agent %s", agent_id)
+            agent_info = {"file_path": None, "source": agent_code}
+        elif self.code_store is not None:
+            # Identical code is written once and shared by reference
+            _, file_path = self.code_store.acquire(agent_code, code_hash)
+            self.logger.debug("Creating agent %s backed by shared code %s", agent_id, code_hash[:12])
+            agent_info = {"file_path": file_path, "code_ref": code_hash}
+        else:
+            # Create the file path
+            file_path = self.layout.path_for(agent_id)
+            self.logger.debug("Creating agent %s at %s", agent_id, file_path)
+            
+            # Write the agent code to the file
+            with open(file_path, "w") as f:
+                f.write(agent_code)
+            agent_info = {"file_path": file_path}
         
-        self.active_agents[agent_id] = {
-            "file_path": file_path,
+        agent_info.update({
+            "storage": storage,
+            "limits": dict(limits) if limits else None,
+            "profile": profile,
+            "pure": bool(pure),
+            "resident": bool(resident),
+            "code_hash": code_hash,
+            "analysis": analysis,
             "status": "created",
             "last_active": time.time()  # Add timestamp
-        }
+        })
+        self.active_agents[agent_id] = agent_info
+        self._prime_code_cache(agent_id, agent_info)
+        self._touch_agent(agent_id)
+        self._prewarm_imports(analysis["imports"])
         
-        self.logger.info(f"Created agent: {agent_id}")
+        self._m_creates.inc(storage)
+        self._m_create_seconds.observe(time.perf_counter() - started)
+        self.logger.debug("Created agent: %s", agent_id)
         return agent_id
     
+    def _prime_code_cache(self, agent_id: str, agent_info: dict):
+        """
+        Seed the code cache with the compiled code of a generated agent, if any.
+        
+        Args:
+            agent_id: The ID of the new agent
+            agent_info: The agent's registry record
+        """
+        # Compile under the name the agent would otherwise be compiled under, so tracebacks point at it
+        if agent_info.get("storage") == "memory":
+            filename = f"<agent {agent_id}>"
+        else:
+            filename = agent_info["file_path"]
+        code = self.code_generator.compiled(agent_info["code_hash"], filename)
+        if code is None:
+            return
+        if agent_info.get("storage") == "memory":
+            self.code_cache.store(agent_id, agent_info["code_hash"], code, len(agent_info["source"]))
+        else:
+            stat = os.stat(agent_info["file_path"])
+            self.code_cache.store(agent_info.get("code_ref") or agent_id,
+                                  (stat.st_mtime_ns, stat.st_size), code, stat.st_size)
+    
+    def _prewarm_imports(self, modules: Iterable[str]):
+        """
+        Import an agent's modules in the pool workers or fork server ahead of its runs.
+        
+        Does nothing for the 'spawn' backend, where every run starts a fresh
+        interpreter anyway, or when 'prewarm_imports' is disabled.
+        
+        Args:
+            modules: Top-level module names the agent imports
+        """
+        backend = self.config.get('subprocess_backend', 'spawn')
+        if backend not in ("pool", "forkserver") or not self.config.get('prewarm_imports', True):
+            return
+        with self._prewarm_lock:
+            modules = [name for name in modules if name not in self._prewarmed]
+            self._prewarmed.update(modules)
+        modules = prewarmable_modules(modules)
+        if not modules:
+            return
+        self.logger.debug("Pre-warming %s in the %s backend", modules, backend)
+        if backend == "forkserver":
+            self._get_fork_server().warm(modules)
+        else:
+            # Warming waits on worker replies, so keep it off the caller's thread
+            thread = threading.Thread(target=self._get_subprocess_pool().warm, args=(modules,),
+                                      name="PoolPrewarm")
+            thread.daemon = True
+            thread.start()
+    
     def run_agent(self, agent_id: str, *args, **kwargs) -> Any:
         """
         Run the specified agent.
@@ -103,53 +515,361 @@ class AgentManager:
             *args, **kwargs: Arguments to pass to the agent
             
         Returns:
-            The result from the agent execution
+            The result from the agent execution (a cached copy for pure agents
+            already run with the same arguments)
         """
-        if agent_id not in self.active_agents:
-            self.logger.error(f"Agent {agent_id} not found")
-            raise ValueError(f"Agent {agent_id} not found")
+        started = time.perf_counter()
+        agent_info = self.active_agents.get(agent_id)
+        cache_key = self._result_cache_key(agent_info, args, kwargs)
+        if cache_key is not None:
+            result = self.result_cache.lookup(agent_id, agent_info["code_hash"], cache_key)
+            if result is not MISSING:
+                self._touch_agent(agent_id)
+                self._observe_run("inprocess", "cached", started)
+                self.logger.debug("Agent %s result served from cache", agent_id)
+                return result
         
-        agent_info = self.active_agents[agent_id]
-        file_path = agent_info["file_path"]
+        if agent_info is None or not self.active_agents.start_run(agent_id):
+            self.logger.error("Agent %s not found", agent_id)
+            raise ValueError(f"Agent {agent_id} not found")
         
-        self.logger.info(f"Running agent: {agent_id}")
+        self.logger.debug("Running agent: %s", agent_id)
         
-        # Method 1: Import and run the module directly
+        # Method 1: Execute the (cached) compiled module directly, under a watchdog if a timeout is set.
+        # A timed-out run cannot be killed, so the agent stays "running" until its thread has exited
+        timeout = self._agent_limits(agent_info)["timeout"]
+        capture = self._profile_capture(agent_info)
+        on_late_exit = functools.partial(self._record_timeout, agent_id, timeout)
         try:
-            # Import the module dynamically
-            self.logger.info(f"Importing agent module: {agent_id}")
-            spec = importlib.util.spec_from_file_location(agent_id, file_path)
-            if spec is None or spec.loader is None:
-                self.logger.error(f"Failed to load agent module: {agent_id}")
-                raise ImportError(f"Could not load agent module: {agent_id}")
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # Execute the main function if it exists
-            if hasattr(module, "main"):
-                self.logger.info(f"Executing main function for agent: {agent_id}")
-                result = module.main(*args, **kwargs)
-                agent_info["status"] = "completed"
-                self.logger.info(f"Agent {agent_id} completed successfully")
-                # Update last active timestamp
-                self.active_agents[agent_id]["last_active"] = time.time()
-                
-                # Force cleanup check immediately if timeout is 0
-                if self.config['inactive_timeout'] == 0:
-                    self._cleanup_inactive_agents()
-                
-                return result
+            if capture is None:
+                result = call_with_timeout(self._execute_agent, timeout, agent_id, agent_info, args, kwargs,
+                                           on_late_exit=on_late_exit)
             else:
-                agent_info["status"] = "error"
-                self.logger.error(f"Agent {agent_id} does not have a main function")
-                raise AttributeError(f"Agent {agent_id} does not have a main function")
-        
+                result = call_with_timeout(self._execute_agent_profiled, timeout,
+                                           agent_id, agent_info, args, kwargs, capture,
+                                           on_late_exit=on_late_exit)
+        except AgentTimeoutError:
+            self._observe_run("inprocess", "timeout", started)
+            self.logger.error("Agent %s exceeded its %s second timeout; still waiting for it to return",
+                              agent_id, timeout)
+            raise
+        except MemoryError as e:
+            self.active_agents.finish_run(agent_id, "oom", error=f"MemoryError: {e}")
+            self._touch_agent(agent_id)
+            self._observe_run("inprocess", "oom", started)
+            self.logger.error("Agent %s ran out of memory", agent_id)
+            raise
         except Exception as e:
-            agent_info["status"] = "error"
-            agent_info["error"] = str(e)
-            self.logger.error(f"Error running agent {agent_id}: {e}")
+            self.active_agents.finish_run(agent_id, "error", error=str(e))
+            self._touch_agent(agent_id)
+            self._observe_run("inprocess", "error", started)
+            self.logger.error("Error running agent %s: %s", agent_id, e)
             raise
+        finally:
+            if capture is not None and capture.report is not None:
+                self._store_profile(agent_id, "inprocess", capture.report)
+        
+        self.active_agents.finish_run(agent_id, "completed")
+        self._observe_run("inprocess", "completed", started)
+        self.logger.debug("Agent %s completed successfully", agent_id)
+        if cache_key is not None:
+            self.result_cache.store(agent_info["code_hash"], cache_key, result)
+        # Update last active timestamp
+        self._touch_agent(agent_id)
+        
+        # Force cleanup check immediately if timeout is 0
+        if self.config['inactive_timeout'] == 0:
+            self._cleanup_inactive_agents()
+        
+        return result
+    
+    def _result_cache_key(self, agent_info: Optional[dict], args: tuple, kwargs: dict) -> Optional[bytes]:
+        """Return the result cache key of a run, or None if the run is not cacheable."""
+        if agent_info is None or not agent_info.get("pure") or self.result_cache is None:
+            return None
+        return result_key(args, kwargs)
+    
+    def _execute_agent(self, agent_id: str, agent_info: dict, args: tuple, kwargs: dict) -> Any:
+        """
+        Load an agent module and call its main function.
+        
+        Args:
+            agent_id: The ID of the agent
+            agent_info: The agent's registry record
+            args, kwargs: Arguments to pass to main
+            
+        Returns:
+            The return value of main
+        """
+        if agent_info.get("resident"):
+            module = self.resident_modules.get_or_load(
+                agent_id, lambda: self._load_agent_module(agent_id, agent_info))
+        else:
+            self.logger.debug("Loading agent module: %s", agent_id)
+            module = self._load_agent_module(agent_id, agent_info)
+        
+        # Execute the main function if it exists
+        if not hasattr(module, "main"):
+            self.logger.error("Agent %s does not have a main function", agent_id)
+            raise AttributeError(f"Agent {agent_id} does not have a main function")
+        
+        self.logger.debug("Executing main function for agent: %s", agent_id)
+        return module.main(*args, **kwargs)
+    
+    def _execute_agent_profiled(self, agent_id: str, agent_info: dict, args: tuple, kwargs: dict,
+                                capture: ProfileCapture) -> Any:
+        """Run _execute_agent inside a profile capture, on the calling thread."""
+        with capture:
+            return self._execute_agent(agent_id, agent_info, args, kwargs)
+    
+    def _profile_capture(self, agent_info: dict) -> Optional[ProfileCapture]:
+        """
+        Decide whether to profile a run of an agent.
+        
+        Args:
+            agent_info: The agent's registry record
+            
+        Returns:
+            A ProfileCapture for the run, or None if it is not profiled
+        """
+        if not should_profile(agent_info.get("profile"), self.config.get('profile_sample_rate', 0.0)):
+            return None
+        return ProfileCapture(self.config.get('profile_modes', ("cpu",)),
+                              self.config.get('profile_top_n', 20))
+    
+    def _store_profile(self, agent_id: str, mode: str, report: dict):
+        """Keep the profile of an agent's latest profiled run with its record."""
+        report = dict(report, mode=mode)
+        self.active_agents.update_record(agent_id, profile_report=report)
+        self.logger.debug("Stored %s profile for agent %s", mode, agent_id)
+    
+    def set_agent_profiling(self, agent_id: str, enabled: Optional[bool]) -> bool:
+        """
+        Turn profiling on or off for an agent.
+        
+        Args:
+            agent_id: The ID of the agent
+            enabled: True to profile every run, False to never profile it,
+                None to sample runs at the 'profile_sample_rate' config setting
+            
+        Returns:
+            True if the agent exists, False otherwise
+        """
+        return self.active_agents.update_record(agent_id, profile=enabled)
+    
+    def get_agent_profile(self, agent_id: str) -> Optional[dict]:
+        """
+        Get the profile of an agent's latest profiled run.
+        
+        Args:
+            agent_id: The ID of the agent
+            
+        Returns:
+            A report with the top functions by cumulative time ("functions") and the
+            top allocation sites ("allocations"), or None if the agent has no profile
+        """
+        agent_info = self.active_agents.snapshot(agent_id)
+        if agent_info is None:
+            return None
+        return agent_info.get("profile_report")
+    
+    def _agent_limits(self, agent_info: dict) -> dict:
+        """Resolve an agent's execution limits against the configured defaults."""
+        return resolve_limits(self.config, agent_info.get("limits"))
+    
+    def _record_timeout(self, agent_id: str, timeout: Optional[float]):
+        """
+        Mark an agent whose run was killed for exceeding its wall-clock timeout.
+        
+        Args:
+            agent_id: The ID of the agent
+            timeout: The timeout that was exceeded
+        """
+        self.active_agents.finish_run(agent_id, "timeout", error=f"Timed out after {timeout} seconds")
+        self._touch_agent(agent_id)
+        self.logger.error("Agent %s timed out after %s seconds", agent_id, timeout)
+    
+    def _record_launch_error(self, agent_id: str, error: Exception):
+        """
+        Mark an agent whose subprocess could not be started or waited for.
+        
+        Args:
+            agent_id: The ID of the agent
+            error: The exception raised by the launch
+        """
+        message = str(error) or type(error).__name__
+        self.active_agents.finish_run(agent_id, "error", error=message)
+        self._touch_agent(agent_id)
+        self.logger.error("Error running agent %s as subprocess: %s", agent_id, message)
+    
+    def _load_agent_module(self, agent_id: str, agent_info: dict) -> types.ModuleType:
+        """
+        Execute an agent's (cached) code in a fresh module namespace.
+        
+        Args:
+            agent_id: The ID of the agent
+            agent_info: The agent's registry record
+            
+        Returns:
+            The executed module
+        """
+        module = types.ModuleType(agent_id)
+        if agent_info.get("storage") == "memory":
+            # In-memory agents compile straight from the string, never from a spill file
+            code = self.code_cache.load_source(
+                agent_id, agent_info["source"], agent_info["code_hash"], f"<agent {agent_id}>"
+            )
+        else:
+            # Agents sharing a code object also share its compiled code
+            cache_key = agent_info.get("code_ref") or agent_id
+            code = self.code_cache.load(cache_key, agent_info["file_path"])
+            module.__file__ = agent_info["file_path"]
+        exec(code, module.__dict__)
+        return module
+    
+    def _on_resident_evicted(self, agent_id: str):
+        """Log a resident module unloaded to keep resident memory under budget."""
+        self.logger.debug("Unloaded resident module of agent %s (over resident_max_bytes)", agent_id)
+    
+    def reload_agent(self, agent_id: str, agent_code: Optional[str] = None) -> bool:
+        """
+        Re-execute an agent's module, optionally replacing its code first.
+        
+        Resident agents keep their module until reloaded, so this is how they
+        pick up code changes; the module is loaded again right away so errors
+        in the new code surface here rather than at the next run.
+        
+        Args:
+            agent_id: The ID of the agent to reload
+            agent_code: New code for the agent (None keeps the current code)
+            
+        Returns:
+            True if the agent was reloaded
+            
+        Raises:
+            ValueError: If the agent does not exist or the new code fails validation
+        """
+        agent_info = self.active_agents.get(agent_id)
+        if agent_info is None:
+            raise ValueError(f"Agent {agent_id} not found")
+        if agent_code is not None:
+            agent_info = self._replace_agent_code(agent_id, agent_info, agent_code)
+        
+        self.resident_modules.unload(agent_id)
+        if agent_info.get("resident"):
+            self.resident_modules.get_or_load(
+                agent_id, lambda: self._load_agent_module(agent_id, agent_info))
+        self._touch_agent(agent_id)
+        self.logger.debug("Reloaded agent %s", agent_id)
+        return True
+    
+    def _replace_agent_code(self, agent_id: str, agent_info: dict, agent_code: str) -> dict:
+        """
+        Swap in new code for an agent, in whichever storage it uses.
+        
+        Args:
+            agent_id: The ID of the agent
+            agent_info: The agent's current registry record
+            agent_code: The new code
+            
+        Returns:
+            The updated registry record
+        """
+        analysis = analyze_agent_source(agent_code, f"<agent {agent_id}>")
+        if not analysis["valid"] and self.config.get('validate_agents', True):
+            raise ValueError(f"Agent {agent_id} has invalid code: {analysis['syntax_error']}")
+        code_hash = code_digest(agent_code)
+        fields = {"code_hash": code_hash, "analysis": analysis}
+        old_ref = agent_info.get("code_ref")
+        old_hash = agent_info.get("code_hash")
+        
+        if agent_info.get("storage") == "memory":
+            fields["source"] = agent_code
+            # A stale spill file is written again by the next subprocess run
+            fields["file_path"] = None
+            fields["code_ref"] = None
+            if old_ref is None and agent_info["file_path"] is not None:
+                try:
+                    os.remove(agent_info["file_path"])
+                except FileNotFoundError:
+                    pass
+        elif old_ref is not None:
+            _, fields["file_path"] = self.code_store.acquire(agent_code, code_hash)
+            fields["code_ref"] = code_hash
+        else:
+            # Write then rename, so a concurrent run never sees a half-written file
+            file_path = agent_info["file_path"]
+            temp_path = f"{file_path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(temp_path, "w") as f:
+                f.write(agent_code)
+            os.replace(temp_path, file_path)
+        
+        self.active_agents.update_record(agent_id, **fields)
+        self.code_cache.invalidate(agent_id)
+        old_released = old_ref is not None and self.code_store.release(old_ref)
+        if old_released:
+            self.code_cache.invalidate(old_ref)
+        # Results of the old code can no longer be looked up through this agent;
+        # shared code keeps them while other agents still use it
+        if (self.result_cache is not None and old_hash is not None and old_hash != code_hash
+                and (old_ref is None or old_released)):
+            self.result_cache.invalidate_code(old_hash)
+        self._prewarm_imports(analysis["imports"])
+        return self.active_agents.get(agent_id)
+    
+    def _materialize_agent(self, agent_id: str) -> str:
+        """
+        Return a file path for an agent, spilling in-memory source to disk if needed.
+        
+        Args:
+            agent_id: The ID of the agent
+            
+        Returns:
+            Path to a file containing the agent code
+        """
+        agent_info = self.active_agents[agent_id]
+        file_path = agent_info["file_path"]
+        if agent_info.get("storage") != "memory" or (file_path is not None and os.path.exists(file_path)):
+            return file_path
+        
+        if self.code_store is not None:
+            return self._materialize_shared(agent_id, agent_info)
+        
+        spill_dir = self.config.get('spill_dir')
+        if spill_dir:
+            # spill_dir may be shared by several managers, so each one spills into its own subdirectory
+            spill_dir = os.path.join(spill_dir, self.manager_id)
+            os.makedirs(spill_dir, exist_ok=True)
+            file_path = os.path.join(spill_dir, f"{agent_id}.py")
+        else:
+            file_path = self.layout.path_for(agent_id)
+        self.logger.debug("Spilling in-memory agent %s to %s", agent_id, file_path)
+        # Write then rename, so a concurrent run never sees a half-written file
+        temp_path = f"{file_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(agent_info["source"])
+        os.replace(temp_path, file_path)
+        self.active_agents.update_record(agent_id, file_path=file_path)
+        return file_path
+    
+    def _materialize_shared(self, agent_id: str, agent_info: dict) -> str:
+        """
+        Spill an in-memory agent by taking a reference on its shared code object.
+        
+        Args:
+            agent_id: The ID of the agent
+            agent_info: The agent's registry record
+            
+        Returns:
+            Path to the shared code object
+        """
+        _, file_path = self.code_store.acquire(agent_info["source"], agent_info["code_hash"])
+        if self.active_agents.update_if(agent_id, lambda record: record.get("code_ref") is None,
+                                        file_path=file_path, code_ref=agent_info["code_hash"]):
+            return file_path
+        # Another run spilled it first (or the agent is gone): drop the extra reference
+        self.code_store.release(agent_info["code_hash"])
+        return file_path
     
     def run_agent_subprocess(self, agent_id: str, *args) -> subprocess.CompletedProcess:
         """
@@ -162,39 +882,414 @@ class AgentManager:
         Returns:
             The completed process object
         """
-        if agent_id not in self.active_agents:
-            self.logger.error(f"Agent {agent_id} not found for subprocess execution")
+        return self.execute_subprocess_run(self.prepare_subprocess_run(agent_id, args))
+    
+    def prepare_subprocess_run(self, agent_id: str, args=(), timeout: Optional[float] = None) -> SubprocessRun:
+        """
+        Mark an agent as running and work out how to run it as a separate process.
+        
+        This is the first half of run_agent_subprocess, for front ends that start
+        the process themselves (e.g. AsyncAgentManager). Every prepared run must
+        be passed to execute_subprocess_run or finish_subprocess_run.
+        
+        Args:
+            agent_id: The ID of the agent to run
+            args: Command-line arguments to pass to the agent
+            timeout: Wall-clock seconds overriding the agent's configured timeout
+            
+        Returns:
+            The prepared run
+        """
+        started = time.perf_counter()
+        command = self._build_subprocess_command(agent_id, args)
+        try:
+            agent_info = self.active_agents[agent_id]
+            limits = self._agent_limits(agent_info)
+            if timeout is not None:
+                limits["timeout"] = timeout
+            
+            # Profiled runs start under the profiler bootstrap, which writes its report to a file
+            report_path = None
+            profiled_command = command
+            if should_profile(agent_info.get("profile"), self.config.get('profile_sample_rate', 0.0)):
+                fd, report_path = tempfile.mkstemp(prefix=f"{agent_id}_", suffix=".profile.json")
+                os.close(fd)
+                profiled_command = [command[0], PROFILER_SCRIPT, "--report", report_path,
+                                    "--modes", ",".join(validate_modes(self.config.get('profile_modes', ("cpu",)))),
+                                    "--top", str(self.config.get('profile_top_n', 20))] + command[1:]
+        except Exception as e:
+            self._record_launch_error(agent_id, e)
+            raise
+        
+        # rlimits have to be set in a fresh process, so limited (and profiled) runs bypass the pool;
+        # forked children are fresh processes and apply the limits themselves
+        backend = self.config.get('subprocess_backend', 'spawn')
+        if backend == 'pool' and (make_preexec_fn(limits) is not None or report_path is not None):
+            backend = 'spawn'
+        elif backend == 'forkserver' and report_path is not None:
+            backend = 'spawn'
+        elif backend not in ('pool', 'forkserver'):
+            backend = 'spawn'
+        return SubprocessRun(agent_id, profiled_command, command[1], command[2:], backend, limits,
+                             report_path, started)
+    
+    def execute_subprocess_run(self, run: SubprocessRun) -> subprocess.CompletedProcess:
+        """
+        Start a prepared run on its backend, wait for it and record the outcome.
+        
+        Args:
+            run: A run returned by prepare_subprocess_run
+            
+        Returns:
+            The completed process object
+        """
+        timeout = run.limits["timeout"]
+        try:
+            if run.backend == 'pool':
+                result = self._get_subprocess_pool().run(run.file_path, run.args, timeout=timeout)
+            elif run.backend == 'forkserver':
+                result = self._get_fork_server().run(run.file_path, run.args, timeout=timeout, limits=run.limits)
+            else:
+                result = subprocess.run(
+                    run.command,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                    preexec_fn=make_preexec_fn(run.limits)
+                )
+        except Exception as e:
+            self.finish_subprocess_run(run, error=e)
+            raise
+        
+        self.finish_subprocess_run(run, result)
+        return result
+    
+    def finish_subprocess_run(self, run: SubprocessRun, result: Optional[subprocess.CompletedProcess] = None,
+                              error: Optional[BaseException] = None) -> Optional[str]:
+        """
+        Record the outcome of a prepared run: status, metrics and profile.
+        
+        Args:
+            run: A run returned by prepare_subprocess_run
+            result: The completed process, if the process ran to completion
+            error: Otherwise the exception that ended the run; subprocess.TimeoutExpired
+                counts as a timeout, anything else as a failure to launch or wait
+            
+        Returns:
+            The agent's new status, or None if the agent no longer exists
+        """
+        if run.report_path is not None:
+            self._load_subprocess_profile(run.agent_id, run.report_path)
+        if result is not None:
+            status = self._record_subprocess_result(run.agent_id, result)
+        elif isinstance(error, subprocess.TimeoutExpired):
+            self._record_timeout(run.agent_id, run.limits["timeout"])
+            status = "timeout"
+        else:
+            self._record_launch_error(run.agent_id, error)
+            status = "error"
+        self._observe_run("subprocess", status or "error", run.started)
+        return status
+    
+    def _load_subprocess_profile(self, agent_id: str, report_path: str):
+        """Store the report written by a profiled subprocess run and remove the file."""
+        try:
+            with open(report_path) as f:
+                report = json.load(f)
+            if report:
+                self._store_profile(agent_id, "subprocess", report)
+        except (OSError, ValueError):
+            # Killed before the report was written
+            self.logger.debug("No profile written for agent %s", agent_id)
+        finally:
+            try:
+                os.remove(report_path)
+            except OSError:
+                pass
+    
+    def run_agent_subprocess_stream(self, agent_id: str, *args, tail_bytes: Optional[int] = None,
+                                    spool_path: Optional[str] = None) -> StreamingRun:
+        """
+        Run the agent as a separate process and stream its output as it arrives.
+        
+        Iterate over the returned object to receive ("stdout" | "stderr", text)
+        chunks. Only the last tail_bytes of each stream are kept in memory; the
+        stderr tail becomes the agent's error message if the run fails.
+        
+        Args:
+            agent_id: The ID of the agent to run
+            *args: Command-line arguments to pass to the agent
+            tail_bytes: Bytes of each stream to keep (defaults to the 'stream_tail_bytes' config)
+            spool_path: Optional file that receives the full output
+            
+        Returns:
+            A StreamingRun; its returncode is set once iteration finishes or
+            stops early, which kills the process
+        """
+        command = self._build_subprocess_command(agent_id, args)
+        limits = self._agent_limits(self.active_agents[agent_id])
+        if tail_bytes is None:
+            tail_bytes = self.config.get('stream_tail_bytes', 64 * 1024)
+        
+        started = time.perf_counter()
+        
+        def on_exit(run):
+            if run.timed_out:
+                self._record_timeout(agent_id, limits["timeout"])
+                self._observe_run("stream", "timeout", started)
+            else:
+                status = self._record_subprocess_result(agent_id, run.to_completed_process())
+                self._observe_run("stream", status or "error", started)
+        
+        try:
+            return StreamingRun(
+                command,
+                tail_bytes=tail_bytes,
+                spool_path=spool_path,
+                timeout=limits["timeout"],
+                preexec_fn=make_preexec_fn(limits),
+                on_exit=on_exit
+            )
+        except Exception as e:
+            self._record_launch_error(agent_id, e)
+            self._observe_run("stream", "error", started)
+            raise
+    
+    def _build_subprocess_command(self, agent_id: str, args) -> list:
+        """
+        Build the command line used to run an agent as a separate process.
+        
+        Args:
+            agent_id: The ID of the agent to run
+            args: Command-line arguments to pass to the agent
+            
+        Returns:
+            The command as a list of strings
+        """
+        if not self.active_agents.start_run(agent_id):
+            self.logger.error("Agent %s not found for subprocess execution", agent_id)
             raise ValueError(f"Agent {agent_id} not found")
         
-        agent_info = self.active_agents[agent_id]
-        file_path = agent_info["file_path"]
+        try:
+            file_path = self._materialize_agent(agent_id)
+        except Exception as e:
+            self._record_launch_error(agent_id, e)
+            raise
         
-        self.logger.info(f"Running agent as subprocess: {agent_id}")
+        self.logger.debug("Running agent as subprocess: %s", agent_id)
         
         # Convert all args to strings
         string_args = [str(arg) for arg in args]
         command = ["python", file_path] + string_args
-        self.logger.info(f"Executing command: {' '.join(command)}")
+        self.logger.debug("Executing command: %s", command)
+        return command
+    
+    def _record_subprocess_result(self, agent_id: str, result: subprocess.CompletedProcess) -> Optional[str]:
+        """
+        Update an agent's status after a subprocess run.
         
-        # Run the agent as a separate process
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True
-        )
+        Args:
+            agent_id: The ID of the agent that was run
+            result: The completed process
+            
+        Returns:
+            The agent's new status, or None if the agent no longer exists
+        """
+        agent_info = self.active_agents.get(agent_id)
+        if agent_info is None:
+            return None
         
         if result.returncode == 0:
-            agent_info["status"] = "completed"
-            self.logger.info(f"Subprocess agent {agent_id} completed successfully")
+            status = "completed"
+            self.active_agents.finish_run(agent_id, status)
+            self.logger.debug("Subprocess agent %s completed successfully", agent_id)
         else:
-            agent_info["status"] = "error"
-            agent_info["error"] = result.stderr
-            self.logger.error(f"Error running agent {agent_id}: {result.stderr}")
+            # Tell runs killed by their CPU or memory limit apart from ordinary failures
+            status = classify_failure(result.returncode, result.stderr, self._agent_limits(agent_info))
+            self.active_agents.finish_run(agent_id, status, error=result.stderr)
+            self.logger.error("Error running agent %s (%s): %s", agent_id, status, result.stderr)
         
         # Update last active timestamp
-        self.active_agents[agent_id]["last_active"] = time.time()
+        self._touch_agent(agent_id)
+        return status
+    
+    def run_many(self, jobs: Iterable, executor: str = "thread",
+                 max_workers: Optional[int] = None) -> Iterator[dict]:
+        """
+        Run a batch of agent jobs concurrently, yielding results as they complete.
         
-        return result
+        Errors are reported per job and never abort the rest of the batch.
+        
+        Args:
+            jobs: Iterable of jobs; each job is an agent_id, an (agent_id, args)
+                or (agent_id, args, kwargs) tuple, or a dict with agent_id/args/kwargs keys
+            executor: "thread" runs agents in-process on a thread pool, "process" runs
+                them on a process pool (for CPU-bound agents), "subprocess" calls
+                run_agent_subprocess from a thread pool. Process pool workers are
+                shared and cannot be stopped per job, so the "process" executor
+                rejects jobs of agents with a timeout, CPU or memory limit or with
+                profiling turned on, and never samples runs for profiling; use
+                "subprocess" for those. Its runs are cached and counted like
+                run_agent's, under the "process" mode.
+            max_workers: Maximum number of concurrent jobs (executor default if None)
+            
+        Yields:
+            A dictionary per job with index, agent_id, status ("completed" or
+            "error"), result and error
+        """
+        if executor not in ("thread", "process", "subprocess"):
+            raise ValueError(f"Unknown executor: {executor}")
+        
+        jobs = [self._normalize_job(job) for job in jobs]
+        self.logger.info("Running batch of %s jobs on %s executor", len(jobs), executor)
+        
+        pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_class(max_workers=max_workers) as pool:
+            futures = {}
+            # Process runs are recorded here rather than by run_agent; the ones the
+            # caller never received (it stopped iterating early) are recorded on exit
+            process_runs = {}
+            for index, (agent_id, args, kwargs) in enumerate(jobs):
+                try:
+                    future = self._submit_job(pool, executor, agent_id, args, kwargs, process_runs)
+                except Exception as e:
+                    yield {"index": index, "agent_id": agent_id, "status": "error",
+                           "result": None, "error": str(e)}
+                    continue
+                futures[future] = (index, agent_id)
+            
+            try:
+                for future in as_completed(futures):
+                    index, agent_id = futures[future]
+                    run = process_runs.pop(future, None)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if run is not None:
+                            self._record_process_run(agent_id, run, error=e)
+                        yield {"index": index, "agent_id": agent_id, "status": "error",
+                               "result": None, "error": str(e)}
+                        continue
+                    
+                    if run is not None:
+                        self._record_process_run(agent_id, run, result=result)
+                    status = "completed"
+                    error = None
+                    if executor == "subprocess" and result.returncode != 0:
+                        status = "error"
+                        error = result.stderr
+                    yield {"index": index, "agent_id": agent_id, "status": status,
+                           "result": result, "error": error}
+            finally:
+                for future, run in process_runs.items():
+                    error = future.exception() if not future.cancelled() else RuntimeError("Run cancelled")
+                    self._record_process_run(futures[future][1], run, error=error)
+    
+    @staticmethod
+    def _normalize_job(job) -> tuple:
+        """Turn a run_many job into an (agent_id, args, kwargs) tuple."""
+        if isinstance(job, str):
+            return job, (), {}
+        if isinstance(job, dict):
+            return job["agent_id"], tuple(job.get("args", ())), dict(job.get("kwargs", {}))
+        agent_id, args, kwargs = (tuple(job) + ((), {}))[:3]
+        return agent_id, tuple(args), dict(kwargs)
+    
+    def _submit_job(self, pool, executor: str, agent_id: str, args: tuple, kwargs: dict, process_runs: dict):
+        """
+        Submit one run_many job to the pool.
+        
+        Process runs that were started are added to process_runs, keyed by their
+        future, for _record_process_run; cached results come back as finished futures.
+        """
+        if executor == "thread":
+            return pool.submit(self.run_agent, agent_id, *args, **kwargs)
+        if executor == "subprocess":
+            return pool.submit(self.run_agent_subprocess, agent_id, *args)
+        
+        started = time.perf_counter()
+        agent_info = self.active_agents.get(agent_id)
+        if agent_info is None:
+            raise ValueError(f"Agent {agent_id} not found")
+        limits = self._agent_limits(agent_info)
+        unenforceable = [name for name, value in limits.items() if value is not None]
+        if unenforceable:
+            raise ValueError(f"Agent {agent_id} has limits the process executor cannot enforce "
+                             f"({', '.join(unenforceable)}); use the subprocess executor")
+        if agent_info.get("profile"):
+            raise ValueError(f"Agent {agent_id} is profiled, which the process executor does not support; "
+                             f"use the thread or subprocess executor")
+        
+        cache_key = self._result_cache_key(agent_info, args, kwargs)
+        if cache_key is not None:
+            result = self.result_cache.lookup(agent_id, agent_info["code_hash"], cache_key)
+            if result is not MISSING:
+                self._touch_agent(agent_id)
+                self._observe_run("process", "cached", started)
+                future = Future()
+                future.set_result(result)
+                return future
+        
+        if not self.active_agents.start_run(agent_id):
+            raise ValueError(f"Agent {agent_id} not found")
+        if agent_info.get("storage") == "memory":
+            future = pool.submit(_run_agent_in_process, agent_id, None, args, kwargs,
+                                 agent_info["source"], agent_info["code_hash"])
+        else:
+            future = pool.submit(_run_agent_in_process, agent_id, agent_info["file_path"], args, kwargs)
+        process_runs[future] = (started, agent_info["code_hash"], cache_key)
+        return future
+    
+    def _record_process_run(self, agent_id: str, run: tuple, result: Any = None,
+                            error: Optional[BaseException] = None):
+        """
+        Update an agent's status, metrics and result cache after a process pool run.
+        
+        Args:
+            agent_id: The ID of the agent that was run
+            run: The (started, code_hash, cache_key) entry _submit_job made for the run
+            result: The result of the run, if it succeeded
+            error: The exception raised by the run, if any
+        """
+        started, code_hash, cache_key = run
+        if error is None:
+            status = "completed"
+            if cache_key is not None:
+                self.result_cache.store(code_hash, cache_key, result)
+        else:
+            status = "oom" if isinstance(error, MemoryError) else "error"
+            self.logger.error("Error running agent %s: %s", agent_id, error)
+        self._observe_run("process", status, started)
+        if agent_id not in self.active_agents:
+            return
+        if error is None:
+            self.active_agents.finish_run(agent_id, status)
+        else:
+            self.active_agents.finish_run(agent_id, status, error=str(error))
+        self._touch_agent(agent_id)
+    
+    def _get_subprocess_pool(self) -> InterpreterPool:
+        """Return the interpreter pool, starting it on first use."""
+        with self._subprocess_pool_lock:
+            if self.subprocess_pool is None:
+                self.subprocess_pool = InterpreterPool(
+                    size=self.config.get('subprocess_pool_size', 4),
+                    max_runs_per_worker=self.config.get('subprocess_pool_max_runs', 100),
+                    python="python"
+                )
+                self.logger.info("Started interpreter pool with %s workers", self.subprocess_pool.size)
+            return self.subprocess_pool
+    
+    def _get_fork_server(self) -> ForkServer:
+        """Return the fork server, starting it on first use."""
+        with self._fork_server_lock:
+            if self.fork_server is None:
+                self.fork_server = ForkServer(
+                    preload=self.config.get('forkserver_preload', []),
+                    python="python"
+                )
+                self.logger.info("Started fork server preloading %s", self.fork_server.preload)
+            return self.fork_server
     
     def cleanup_agent(self, agent_id: str, delay_seconds: float = 0) -> bool:
         """
@@ -208,19 +1303,17 @@ class AgentManager:
             True if cleanup was successful or scheduled, False otherwise
         """
         if agent_id not in self.active_agents:
-            self.logger.warning(f"Agent {agent_id} not found for cleanup")
+            self.logger.warning("Agent %s not found for cleanup", agent_id)
             return False
         
         if delay_seconds > 0:
-            self.logger.info(f"Scheduling cleanup of agent {agent_id} in {delay_seconds} seconds")
-            # Schedule the cleanup after the specified delay
-            timer = threading.Timer(delay_seconds, self._do_cleanup_agent, args=[agent_id])
-            timer.daemon = True  # Make sure the timer doesn't block program exit
-            timer.start()
+            self.logger.debug("Scheduling cleanup of agent %s in %s seconds", agent_id, delay_seconds)
+            # Schedule the cleanup after the specified delay on the reaper thread
+            self.expiry_scheduler.schedule(agent_id, time.time() + delay_seconds, kind="cleanup")
             return True
         else:
             # Do immediate cleanup
-            self.logger.info(f"Performing immediate cleanup for agent {agent_id}")
+            self.logger.debug("Performing immediate cleanup for agent %s", agent_id)
             return self._do_cleanup_agent(agent_id)
     
     def _do_cleanup_agent(self, agent_id: str) -> bool:
@@ -233,27 +1326,54 @@ class AgentManager:
         Returns:
             True if cleanup was successful, False otherwise
         """
-        if agent_id not in self.active_agents:
-            self.logger.warning(f"Agent {agent_id} not found for cleanup")
+        # Remove the agent from active agents first, so concurrent cleanups can't both proceed
+        agent_info = self.active_agents.pop(agent_id, None)
+        if agent_info is None:
+            self.logger.warning("Agent %s not found for cleanup", agent_id)
             return False
         
-        agent_info = self.active_agents[agent_id]
+        self._m_cleanups.inc("explicit")
+        return self._release_agent(agent_id, agent_info)
+    
+    def _release_agent(self, agent_id: str, agent_info: dict) -> bool:
+        """
+        Release the resources of an agent that was already removed from the registry.
+        
+        Args:
+            agent_id: The ID of the removed agent
+            agent_info: The agent's registry record
+            
+        Returns:
+            True if cleanup was successful, False otherwise
+        """
+        self.expiry_scheduler.unschedule(agent_id)
+        self.code_cache.invalidate(agent_id)
+        if self.result_cache is not None:
+            self.result_cache.forget_agent(agent_id)
+        self.resident_modules.unload(agent_id)
         file_path = agent_info["file_path"]
+        code_ref = agent_info.get("code_ref")
         
         try:
-            # Remove the agents file
-            if os.path.exists(file_path):
-                self.logger.info(f"Removing agent file: {file_path}")
+            if code_ref is not None:
+                # Shared code is only deleted once the last agent using it is gone
+                if self.code_store.release(code_ref):
+                    self.code_cache.invalidate(code_ref)
+                    self.logger.debug("Removed shared code object: %s", file_path)
+                self.logger.debug("Cleaned up agent: %s", agent_id)
+                return True
+            
+            # Remove the agents file (in-memory agents only have one if they were spilled)
+            if file_path is not None and os.path.exists(file_path):
+                self.logger.debug("Removing agent file: %s", file_path)
                 os.remove(file_path)
-                self.logger.info(f"Removed agent file: {file_path}")
+                self.logger.debug("Removed agent file: %s", file_path)
             
-            # Remove the agent from active agents
-            del self.active_agents[agent_id]
-            self.logger.info(f"Cleaned up agent: {agent_id}")
+            self.logger.debug("Cleaned up agent: %s", agent_id)
             return True
             
         except Exception as e:
-            self.logger.error(f"Error cleaning up agent {agent_id}: {e}")
+            self.logger.error("Error cleaning up agent %s: %s", agent_id, e)
             return False
     
     def cleanup_all_agents(self) -> int:
@@ -264,14 +1384,20 @@ class AgentManager:
             The number of agents that were cleaned up
         """
         agent_ids = list(self.active_agents.keys())
-        self.logger.info(f"Cleaning up all agents ({len(agent_ids)} total)")
-        count = 0
+        self.logger.info("Cleaning up all agents (%s total)", len(agent_ids))
         
-        for agent_id in agent_ids:
-            if self.cleanup_agent(agent_id):
-                count += 1
+        # Removing files is dominated by filesystem latency and releases the GIL, so large
+        # registries are cleaned up from a few threads
+        workers = self.config.get('cleanup_workers', 8)
+        if workers > 1 and len(agent_ids) >= 64:
+            chunks = [agent_ids[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="AgentCleanup") as executor:
+                count = sum(executor.map(
+                    lambda chunk: sum(1 for agent_id in chunk if self.cleanup_agent(agent_id)), chunks))
+        else:
+            count = sum(1 for agent_id in agent_ids if self.cleanup_agent(agent_id))
         
-        self.logger.info(f"Cleaned up {count} agents")
+        self.logger.info("Cleaned up %s agents", count)
         return count
     
     def generate_agent_code(self, task_description: str, dependencies: list = None) -> str:
@@ -280,70 +1406,24 @@ class AgentManager:
         This is a simple example - in a real system, you might use an LLM
         or other code generation techniques.
         
+        The generated code is validated and compiled once and memoized on
+        (task_description, dependencies); creating an agent from it reuses
+        the compiled code object.
+        
         Args:
             task_description: Description of what the agent should do
             dependencies: List of dependencies required by the agent
             
         Returns:
             The generated agent code as a string
+            
+        Raises:
+            ValueError: If a dependency is not a module name or the generated code is invalid
         """
-        self.logger.info(f"Generating agent code for task: {task_description}")
-        dependencies = dependencies or []
-        dependencies_imports = "\n".join([f"import {dep}" for dep in dependencies])
-        
-        # Create a simple agent template
-        agent_code = f"""
-# Generated Agent
-# Task: {task_description}
-
-{dependencies_imports}
-import logging
-import sys
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-def main(*args, **kwargs):
-    \"\"\"
-    Main function for the agent.
-    
-    Args:
-        *args, **kwargs: Arguments passed to the agent
-    
-    Returns:
-        The result of the agent's execution
-    \"\"\"
-    logger.info("Agent started with args: {{}}, kwargs: {{}}".format(args, kwargs))
-    
-    try:
-        # Task implementation:
-        logger.info("Executing task: {task_description}")
-        
-        # Special handling for greeting agents
-        if "greeting" in "{task_description}".lower():
-            greeting = "Hello! I am your greeting agent. Nice to meet you!"
-            print(greeting)
-            logger.info(f"Greeting message displayed: {{greeting}}")
-            return greeting
-        
-        # Add task-specific code here
-        result = "Task completed successfully"
-        
-        logger.info("Task completed")
-        return result
-    
-    except Exception as e:
-        logger.error(f"Error executing task: {{e}}")
-        raise
-
-if __name__ == "__main__":
-    # Handle command-line arguments
-    args = sys.argv[1:]
-    main(*args)
-"""
-        self.logger.info(f"Agent code generated successfully")
-        return agent_code
+        self.logger.debug("Generating agent code for task: %s", task_description)
+        generated = self.code_generator.generate(task_description, dependencies)
+        self.logger.debug("Agent code generated successfully")
+        return generated.source
     
     def get_agent_status(self, agent_id: str) -> dict:
         """
@@ -355,16 +1435,67 @@ if __name__ == "__main__":
         Returns:
             A dictionary with agent status information or None if agent not found
         """
-        if agent_id not in self.active_agents:
-            self.logger.warning(f"Agent {agent_id} not found for status check")
+        started = time.perf_counter()
+        self._m_status_lookups.inc()
+        agent_info = self.active_agents.snapshot(agent_id)
+        if agent_info is None:
+            self.logger.warning("Agent %s not found for status check", agent_id)
             return None
         
-        agent_info = self.active_agents[agent_id].copy()
-        agent_info['exists'] = os.path.exists(agent_info['file_path'])
+        # In-memory agents report their code as present; the source itself is left out
+        source = agent_info.pop('source', None)
+        agent_info['profiled'] = agent_info.pop('profile_report', None) is not None
+        file_path = agent_info['file_path']
+        agent_info['exists'] = source is not None or os.path.exists(file_path)
+        agent_info['spilled'] = agent_info.get('storage') == 'memory' and file_path is not None
+        if agent_info.get('code_ref') is not None:
+            agent_info['code_refs'] = self.code_store.refcount(agent_info['code_ref'])
+        if agent_info.get('resident'):
+            agent_info['resident_bytes'] = self.resident_modules.size_of(agent_id)
+        if agent_info.get('pure') and self.result_cache is not None:
+            agent_info['result_cache'] = self.result_cache.agent_stats(agent_id)
         
-        self.logger.info(f"Agent {agent_id} status: {agent_info['status']}, file exists: {agent_info['exists']}")
+        self.logger.debug("Agent %s status: %s, file exists: %s", agent_id, agent_info['status'], agent_info['exists'])
+        self._m_status_seconds.observe(time.perf_counter() - started)
         return agent_info
     
+    def get_metrics(self) -> dict:
+        """
+        Get a snapshot of the manager's metrics.
+        
+        Returns:
+            A dictionary mapping metric names to their values by label
+        """
+        return self.metrics.snapshot()
+    
+    def get_code_cache_stats(self) -> dict:
+        """
+        Get hit/miss counters for the compiled code cache.
+        
+        Returns:
+            A dictionary with hits, misses, evictions, entries and bytes
+        """
+        return self.code_cache.stats()
+    
+    def get_result_cache_stats(self) -> dict:
+        """
+        Get counters for the pure agent result cache.
+        
+        Returns:
+            A dictionary with hits, misses, evictions, expirations, entries and
+            bytes (empty if the cache is disabled)
+        """
+        return self.result_cache.stats() if self.result_cache else {}
+    
+    def get_resident_stats(self) -> dict:
+        """
+        Get usage numbers for resident agent modules.
+        
+        Returns:
+            A dictionary with the number of loaded modules, their estimated bytes, loads and evictions
+        """
+        return self.resident_modules.stats()
+    
     def ensure_cleanup(self) -> int:
         """
         Ensures that all agent files are cleaned up, including any that might
@@ -379,49 +1510,46 @@ if __name__ == "__main__":
         # First try the standard cleanup
         count += self.cleanup_all_agents()
         
-        # Then check if any files remain in the agent directory
-        if os.path.exists(self.agents_dir):
-            files = [f for f in os.listdir(self.agents_dir) if f.endswith('.py')]
-            if files:
-                self.logger.warning(f"Found {len(files)} agent files still remaining after cleanup")
-                for file in files:
-                    file_path = os.path.join(self.agents_dir, file)
-                    try:
-                        os.remove(file_path)
-                        count += 1
-                        self.logger.info(f"Forcibly removed agent file: {file_path}")
-                    except Exception as e:
-                        self.logger.error(f"Error removing agent file {file_path}: {e}")
+        # Then remove whatever agent files are left, e.g. from a previous process. The sharded
+        # layout drops this manager's whole subdirectory, code objects included; the flat layout
+        # leaves the code objects other managers sharing agents_dir may still reference
+        leftover = self.layout.drop(workers=self.config.get('cleanup_workers', 8))
+        if leftover:
+            self.logger.warning("Removed %s agent files still remaining after cleanup", leftover)
+        count += leftover
         
-        self.logger.info(f"Cleanup complete, removed {count} files in total")
+        self.logger.info("Cleanup complete, removed %s files in total", count)
         return count
     
     def _cleanup_inactive_agents(self):
-        """Clean up inactive agents based on the configured timeout."""
+        """
+        Clean up inactive agents based on the configured timeout.
+        
+        The expiry scheduler expires agents on its own as their deadlines pass;
+        this full scan is kept for explicit sweeps (and the 0-second timeout case).
+        """
+        started = time.perf_counter()
         current_time = time.time()
         agents_to_remove = []
         
-        self.logger.info(f"Checking for inactive agents - timeout setting: {self.config['inactive_timeout']} seconds")
+        self.logger.debug("Checking for inactive agents - timeout setting: %s seconds", self.config['inactive_timeout'])
         
+        # Iterate over a snapshot: other threads may add or remove agents meanwhile
         for agent_id, agent_data in self.active_agents.items():
-            # Using the timeout from self.config that was properly initialized in __init__
-            timeout = self.config['inactive_timeout']
-            idle_time = current_time - agent_data['last_active']
-            
-            self.logger.info(f"Agent {agent_id}: status={agent_data['status']}, idle_time={idle_time:.1f}s, timeout={timeout}s")
-            
-            # Special handling for 0-second timeout - clean up any inactive agent immediately
-            if timeout == 0 and agent_data['status'] in ['completed', 'error']:
-                self.logger.info(f"Agent {agent_id} is inactive with 0-second timeout - cleaning up immediately")
-                agents_to_remove.append(agent_id)
-            # Regular timeout-based cleanup
-            elif idle_time > timeout:
-                self.logger.info(f"Agent {agent_id} inactive for {idle_time:.1f}s (timeout: {timeout}s) - cleaning up")
+            if self._is_inactive(agent_data, current_time):
+                idle_time = current_time - agent_data['last_active']
+                self.logger.debug("Agent %s inactive for %.1fs - cleaning up", agent_id, idle_time)
                 agents_to_remove.append(agent_id)
         
         for agent_id in agents_to_remove:
-            self.logger.info(f"Removing agent {agent_id}")
-            self._remove_agent(agent_id)
+            # Re-check under the registry lock: the agent may have been run in the meantime
+            removed = self.active_agents.remove_if(
+                agent_id, lambda record: self._is_inactive(record, current_time)
+            )
+            if removed is not None:
+                self._m_cleanups.inc("inactive")
+                self._release_agent(agent_id, removed)
+        self._m_sweep_seconds.observe(time.perf_counter() - started)
     
     def _remove_agent(self, agent_id: str) -> bool:
         """
@@ -442,7 +1570,29 @@ if __name__ == "__main__":
         # Stop the cleanup timer before exiting
         if self.cleanup_timer:
             self.cleanup_timer.cancel()
+        if self.subprocess_pool:
+            self.subprocess_pool.close()
+        if self.fork_server:
+            self.fork_server.close()
         self.cleanup_all_agents()
+        if self.registry_store:
+            self.registry_store.close()
+    
+    def close(self):
+        """
+        Stop background work without cleaning up agents.
+        
+        With a persistent registry the agents, their files and their status are
+        kept, and the next manager using the same 'registry_path' resumes them.
+        """
+        if self.cleanup_timer:
+            self.cleanup_timer.cancel()
+        if self.subprocess_pool:
+            self.subprocess_pool.close()
+        if self.fork_server:
+            self.fork_server.close()
+        if self.registry_store:
+            self.registry_store.close()
     
     def get_active_agents(self) -> dict:
         """
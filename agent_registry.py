@@ -0,0 +1,292 @@
+"""
+Thread-safe registry of active agents.
+
+The registry is a lock-striped mapping of agent_id -> record dict. Each agent
+id hashes to one of N stripes, so threads working on different agents rarely
+contend for the same lock, and all multi-step changes to a record (status
+transitions, conditional removal) happen atomically under its stripe lock.
+"""
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+
+class AgentRegistry(MutableMapping):
+    """
+    A lock-striped, dict-compatible mapping of agent records.
+
+    Plain item access works like a dict. Iteration, keys(), values() and
+    items() work on a snapshot, so callers can iterate while other threads add
+    or remove agents without "dictionary changed size during iteration".
+    """
+
+    def __init__(self, stripes: int = 16,
+                 listener: Optional[Callable[[str, Optional[dict]], None]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            stripes: Number of independently locked shards
+            listener: Called under the stripe lock with (agent_id, record) after a
+                record is added or changed, and with (agent_id, None) after it is
+                removed; it must be cheap and must not call back into the registry
+        """
+        self._stripes: List[Tuple[dict, threading.Lock]] = [
+            ({}, threading.Lock()) for _ in range(max(1, stripes))
+        ]
+        self.listener = listener
+
+    def _changed(self, agent_id: str, record: Optional[dict]):
+        if self.listener is not None:
+            self.listener(agent_id, record)
+
+    def _stripe(self, agent_id: str) -> Tuple[dict, threading.Lock]:
+        return self._stripes[hash(agent_id) % len(self._stripes)]
+
+    def lock_for(self, agent_id: str) -> threading.Lock:
+        """Return the lock guarding an agent's record."""
+        return self._stripe(agent_id)[1]
+
+    def __getitem__(self, agent_id: str) -> dict:
+        records, _ = self._stripe(agent_id)
+        return records[agent_id]
+
+    def __setitem__(self, agent_id: str, record: dict):
+        records, lock = self._stripe(agent_id)
+        with lock:
+            records[agent_id] = record
+            self._changed(agent_id, record)
+
+    def __delitem__(self, agent_id: str):
+        records, lock = self._stripe(agent_id)
+        with lock:
+            del records[agent_id]
+            self._changed(agent_id, None)
+
+    def __contains__(self, agent_id) -> bool:
+        records, _ = self._stripe(agent_id)
+        return agent_id in records
+
+    def __len__(self) -> int:
+        return sum(len(records) for records, _ in self._stripes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, agent_id: str, default: Any = None) -> Any:
+        records, _ = self._stripe(agent_id)
+        return records.get(agent_id, default)
+
+    def keys(self) -> List[str]:
+        """Return a snapshot of the registered agent ids."""
+        result = []
+        for records, lock in self._stripes:
+            with lock:
+                result.extend(records.keys())
+        return result
+
+    def values(self) -> List[dict]:
+        """Return a snapshot of the registered agent records."""
+        return [record for _, record in self.items()]
+
+    def items(self) -> List[Tuple[str, dict]]:
+        """Return a snapshot of (agent_id, record) pairs."""
+        result = []
+        for records, lock in self._stripes:
+            with lock:
+                result.extend(records.items())
+        return result
+
+    def pop(self, agent_id: str, *default) -> Any:
+        records, lock = self._stripe(agent_id)
+        with lock:
+            if agent_id in records:
+                self._changed(agent_id, None)
+            return records.pop(agent_id, *default)
+
+    def clear(self):
+        for records, lock in self._stripes:
+            with lock:
+                for agent_id in records:
+                    self._changed(agent_id, None)
+                records.clear()
+
+    def bulk_load(self, records: dict):
+        """
+        Insert many records at once without notifying the listener.
+
+        Meant for restoring a registry from its persistent copy.
+
+        Args:
+            records: A dictionary of agent_id -> record
+        """
+        stripes = self._stripes
+        for _, lock in stripes:
+            lock.acquire()
+        try:
+            count = len(stripes)
+            for agent_id, record in records.items():
+                stripes[hash(agent_id) % count][0][agent_id] = record
+        finally:
+            for _, lock in self._stripes:
+                lock.release()
+
+    def add(self, agent_id: str, record: dict) -> bool:
+        """
+        Register an agent unless the id is already taken.
+
+        Args:
+            agent_id: The ID of the agent
+            record: The agent record
+
+        Returns:
+            True if the agent was added, False if the id already exists
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            if agent_id in records:
+                return False
+            records[agent_id] = record
+            self._changed(agent_id, record)
+            return True
+
+    def update_record(self, agent_id: str, **fields) -> bool:
+        """
+        Atomically update fields of an agent record.
+
+        Args:
+            agent_id: The ID of the agent
+            **fields: Fields to set on the record
+
+        Returns:
+            True if the agent exists and was updated, False otherwise
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None:
+                return False
+            record.update(fields)
+            self._changed(agent_id, record)
+            return True
+
+    def update_if(self, agent_id: str, predicate: Callable[[dict], bool], **fields) -> bool:
+        """
+        Atomically update fields of an agent record if it satisfies a predicate.
+
+        Args:
+            agent_id: The ID of the agent
+            predicate: Called with the record under the stripe lock
+            **fields: Fields to set on the record
+
+        Returns:
+            True if the agent exists, satisfied the predicate and was updated
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None or not predicate(record):
+                return False
+            record.update(fields)
+            self._changed(agent_id, record)
+            return True
+
+    def transition(self, agent_id: str, status: str,
+                   expected: Optional[Tuple[str, ...]] = None, **fields) -> bool:
+        """
+        Atomically move an agent to a new status.
+
+        Args:
+            agent_id: The ID of the agent
+            status: The new status
+            expected: Statuses the agent must currently be in (any status if None)
+            **fields: Additional fields to set together with the status
+
+        Returns:
+            True if the transition happened, False if the agent is missing or
+            was not in one of the expected statuses
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None or (expected is not None and record["status"] not in expected):
+                return False
+            record["status"] = status
+            record.update(fields)
+            self._changed(agent_id, record)
+            return True
+
+    def start_run(self, agent_id: str) -> bool:
+        """
+        Atomically mark an agent as running and count the run as in flight.
+
+        Args:
+            agent_id: The ID of the agent
+
+        Returns:
+            True if the agent exists and was marked, False if it is missing
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None:
+                return False
+            record["active_runs"] = record.get("active_runs", 0) + 1
+            record["status"] = "running"
+            self._changed(agent_id, record)
+            return True
+
+    def finish_run(self, agent_id: str, status: str, **fields) -> bool:
+        """
+        Atomically end one in-flight run of an agent.
+
+        While other runs of the agent are still in flight it stays "running";
+        the run that finishes last sets the final status.
+
+        Args:
+            agent_id: The ID of the agent
+            status: The outcome of this run
+            **fields: Additional fields to set together with the status
+
+        Returns:
+            True if the status was set, False if the agent is missing or other
+            runs are still in flight
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None:
+                return False
+            record["active_runs"] = max(record.get("active_runs", 0) - 1, 0)
+            if record["active_runs"]:
+                return False
+            record["status"] = status
+            record.update(fields)
+            self._changed(agent_id, record)
+            return True
+
+    def remove_if(self, agent_id: str, predicate: Callable[[dict], bool]) -> Optional[dict]:
+        """
+        Atomically remove an agent if its record satisfies a predicate.
+
+        Args:
+            agent_id: The ID of the agent
+            predicate: Called with the record under the stripe lock
+
+        Returns:
+            The removed record, or None if the agent is missing or was kept
+        """
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            if record is None or not predicate(record):
+                return None
+            self._changed(agent_id, None)
+            return records.pop(agent_id)
+
+    def snapshot(self, agent_id: str) -> Optional[dict]:
+        """Return a consistent copy of an agent record, or None if it is missing."""
+        records, lock = self._stripe(agent_id)
+        with lock:
+            record = records.get(agent_id)
+            return dict(record) if record is not None else None
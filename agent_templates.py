@@ -0,0 +1,230 @@
+"""
+Template engine for generated agent code.
+
+Templates are parsed once into literal and field segments. Rendered agents
+are validated with ast and compiled at generation time, and both the source
+and the code object are memoized, so generating the same agent again costs a
+dictionary lookup.
+"""
+import ast
+import hashlib
+import threading
+import types
+from collections import OrderedDict
+from string import Formatter
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Filename recorded in generated code objects for tracebacks
+GENERATED_FILENAME = "<generated agent>"
+
+DEFAULT_AGENT_TEMPLATE = '''
+# Generated Agent
+# Task: {task_description}
+
+{dependencies_imports}
+import logging
+import sys
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main(*args, **kwargs):
+    """
+    Main function for the agent.
+
+    Args:
+        *args, **kwargs: Arguments passed to the agent
+
+    Returns:
+        The result of the agent's execution
+    """
+    logger.info("Agent started with args: {{}}, kwargs: {{}}".format(args, kwargs))
+
+    try:
+        # Task implementation:
+        logger.info("Executing task: {task_description}")
+
+        # Special handling for greeting agents
+        if "greeting" in "{task_description}".lower():
+            greeting = "Hello! I am your greeting agent. Nice to meet you!"
+            print(greeting)
+            logger.info(f"Greeting message displayed: {{greeting}}")
+            return greeting
+
+        # Add task-specific code here
+        result = "Task completed successfully"
+
+        logger.info("Task completed")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error executing task: {{e}}")
+        raise
+
+if __name__ == "__main__":
+    # Handle command-line arguments
+    args = sys.argv[1:]
+    main(*args)
+'''
+
+
+class AgentTemplate:
+    """A str.format-style template parsed once into its segments."""
+
+    def __init__(self, text: str):
+        """
+        Parse a template.
+
+        Args:
+            text: Template text using {field} placeholders and {{ }} escapes
+        """
+        self.segments: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(text)
+        ]
+        self.fields = {field for _, field in self.segments if field}
+
+    def render(self, **values: str) -> str:
+        """
+        Fill in the template.
+
+        Args:
+            **values: A value for every field in the template
+
+        Returns:
+            The rendered text
+        """
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field:
+                parts.append(values[field])
+        return "".join(parts)
+
+
+class GeneratedAgent(NamedTuple):
+    """Generated agent source together with its compiled code."""
+    source: str
+    code_hash: str
+    code: Any
+
+
+def validate_dependencies(dependencies: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Check that every dependency is an importable module name.
+
+    Args:
+        dependencies: Module names, e.g. ["math", "os.path"]
+
+    Returns:
+        The dependencies as a tuple
+
+    Raises:
+        ValueError: If a dependency is not a dotted Python identifier
+    """
+    for dep in dependencies:
+        if not isinstance(dep, str) or not all(part.isidentifier() for part in dep.split(".")):
+            raise ValueError(f"Invalid dependency: {dep!r}")
+    return tuple(dependencies)
+
+
+def _with_filename(code, filename: str):
+    """Return a copy of a code object, and of the functions it defines, compiled as filename."""
+    consts = tuple(_with_filename(const, filename) if isinstance(const, types.CodeType) else const
+                   for const in code.co_consts)
+    return code.replace(co_filename=filename, co_consts=consts)
+
+
+class AgentCodeGenerator:
+    """Renders, validates and compiles agent code, memoizing the results."""
+
+    def __init__(self, template: str = DEFAULT_AGENT_TEMPLATE, cache_size: int = 128):
+        """
+        Initialize the generator.
+
+        Args:
+            template: The agent template
+            cache_size: Number of generated agents to memoize
+        """
+        self.template = AgentTemplate(template)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._memo: "OrderedDict[Hashable, GeneratedAgent]" = OrderedDict()
+        self._by_hash: Dict[str, GeneratedAgent] = {}
+        self._lock = threading.Lock()
+
+    def generate(self, task_description: str, dependencies: Optional[Sequence[str]] = None) -> GeneratedAgent:
+        """
+        Generate agent code for a task.
+
+        Args:
+            task_description: Description of what the agent should do
+            dependencies: Modules the agent imports
+
+        Returns:
+            The generated source, its SHA-256 and its compiled code object
+
+        Raises:
+            ValueError: If a dependency is invalid or the generated code is not valid Python
+        """
+        key = (task_description, tuple(dependencies or ()))
+        with self._lock:
+            generated = self._memo.get(key)
+            if generated is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return generated
+            self.misses += 1
+
+        deps = validate_dependencies(key[1])
+        source = self.template.render(
+            task_description=task_description,
+            dependencies_imports="\n".join(f"import {dep}" for dep in deps)
+        )
+        try:
+            tree = ast.parse(source, GENERATED_FILENAME)
+        except SyntaxError as e:
+            raise ValueError(f"Generated agent code is not valid Python: {e}") from e
+        code = compile(tree, GENERATED_FILENAME, "exec", dont_inherit=True)
+        generated = GeneratedAgent(source, hashlib.sha256(source.encode("utf-8")).hexdigest(), code)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._memo[key] = generated
+                self._by_hash[generated.code_hash] = generated
+                while len(self._memo) > self.cache_size:
+                    _, evicted = self._memo.popitem(last=False)
+                    if self._by_hash.get(evicted.code_hash) is evicted:
+                        del self._by_hash[evicted.code_hash]
+        return generated
+
+    def compiled(self, code_hash: str, filename: Optional[str] = None) -> Optional[Any]:
+        """
+        Return the code object of a memoized agent.
+
+        Args:
+            code_hash: SHA-256 of the generated source
+            filename: File name for tracebacks, e.g. the agent's file path
+                (defaults to GENERATED_FILENAME)
+
+        Returns:
+            The compiled code, or None if the source was not generated here
+        """
+        with self._lock:
+            generated = self._by_hash.get(code_hash)
+        if generated is None:
+            return None
+        if filename is None or filename == GENERATED_FILENAME:
+            return generated.code
+        return _with_filename(generated.code, filename)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get memoization statistics.
+
+        Returns:
+            A dictionary with hit, miss and entry counts
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memo)}
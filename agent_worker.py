@@ -0,0 +1,142 @@
+"""
+Worker process entry point for the interpreter pool.
+
+Reads one JSON job per line from stdin, runs the requested agent file as
+__main__ with stdout/stderr redirected to the job's spool files, and writes
+one JSON reply per line back to the original stdout.
+
+This module only uses the standard library so a worker starts quickly.
+"""
+import importlib
+import json
+import os
+import runpy
+import sys
+import traceback
+
+
+def _exit_code(code) -> int:
+    """Translate a SystemExit code the same way the interpreter does."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_agent_file(file_path: str, args: list, stdout_path: str, stderr_path: str) -> int:
+    """
+    Run an agent file as __main__ in the current process.
+
+    The agent sees its own argv, an empty stdin and file descriptors 1 and 2
+    pointing at the spool files, so output written by child processes is
+    captured as well.
+
+    Args:
+        file_path: Path to the agent file
+        args: Command-line arguments to pass to the agent
+        stdout_path: File that receives the agent's stdout
+        stderr_path: File that receives the agent's stderr
+
+    Returns:
+        The exit code the agent would have had as a separate interpreter
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = [os.dup(0), os.dup(1), os.dup(2)]
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+
+    stdin_fd = os.open(os.devnull, os.O_RDONLY)
+    stdout_fd = os.open(stdout_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    stderr_fd = os.open(stderr_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    for target, fd in enumerate((stdin_fd, stdout_fd, stderr_fd)):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    # Mirror `python file.py`: argv and the script directory on sys.path
+    sys.argv = [file_path] + list(args)
+    sys.path[0] = os.path.dirname(os.path.abspath(file_path))
+
+    returncode = 0
+    try:
+        runpy.run_path(file_path, run_name="__main__")
+    except SystemExit as e:
+        returncode = _exit_code(e.code)
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for target, fd in enumerate(saved_fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+
+    return returncode
+
+
+def warm_modules(names: list) -> list:
+    """
+    Import modules ahead of the agents that need them.
+
+    Anything the imports print is discarded, so it cannot end up in the
+    protocol pipe or in the next agent's output.
+
+    Args:
+        names: Module names to import
+
+    Returns:
+        The names that imported successfully
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = [os.dup(1), os.dup(2)]
+    null_fd = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null_fd, 1)
+    os.dup2(null_fd, 2)
+    os.close(null_fd)
+    warmed = []
+    try:
+        for name in names:
+            try:
+                importlib.import_module(name)
+                warmed.append(name)
+            except (Exception, SystemExit):
+                pass
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for target, fd in enumerate(saved_fds, start=1):
+            os.dup2(fd, target)
+            os.close(fd)
+    return warmed
+
+
+def serve():
+    """Serve jobs from stdin until the parent closes the pipe."""
+    # Keep private handles on the protocol pipes; fds 0-2 get redirected per job
+    requests = os.fdopen(os.dup(0), "r")
+    replies = os.fdopen(os.dup(1), "w")
+
+    for line in requests:
+        job = json.loads(line)
+        if "warm" in job:
+            replies.write(json.dumps({"warmed": warm_modules(job["warm"])}) + "\n")
+            replies.flush()
+            continue
+        returncode = run_agent_file(
+            job["file_path"], job.get("args", []),
+            job["stdout_path"], job["stderr_path"]
+        )
+        replies.write(json.dumps({"returncode": returncode}) + "\n")
+        replies.flush()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,210 @@
+"""
+asyncio front end for the AgentManager.
+
+Lets a single event loop drive many concurrent agent runs without pushing
+every blocking call through a thread pool.
+"""
+import asyncio
+import functools
+import logging
+import subprocess
+import weakref
+from typing import Any, Optional
+
+from agent_manager import AgentManager
+from resource_limits import make_preexec_fn
+
+
+class AsyncAgentManager:
+    """
+    An asyncio-native wrapper around AgentManager.
+
+    Subprocess runs are bounded by a per-loop concurrency semaphore and honour
+    the manager's subprocess_backend and profiling settings. Plain ('spawn')
+    runs use asyncio.create_subprocess_exec and kill the child when they time
+    out or are cancelled; pooled and fork server runs wait on the default
+    executor. Registry bookkeeping and metrics are shared with the wrapped
+    manager.
+    """
+
+    def __init__(self, manager: Optional[AgentManager] = None, max_concurrency: int = 100,
+                 default_timeout: Optional[float] = None, **manager_kwargs):
+        """
+        Initialize the async agent manager.
+
+        Args:
+            manager: An existing AgentManager to wrap (created if not provided)
+            max_concurrency: Maximum number of agent runs in flight at once
+            default_timeout: Default per-run timeout in seconds (None means no timeout)
+            **manager_kwargs: Arguments for the AgentManager when one is created
+        """
+        self.manager = manager if manager is not None else AgentManager(**manager_kwargs)
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.logger = logging.getLogger("AsyncAgentManager")
+        # asyncio primitives belong to one loop, so each loop that runs agents gets its own semaphore
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def active_agents(self) -> dict:
+        return self.manager.active_agents
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _in_executor(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    async def acreate_agent(self, agent_code: str, agent_name: Optional[str] = None, **options) -> str:
+        """
+        Create a new agent without blocking the event loop.
+
+        Args:
+            agent_code: The Python code for the agent
+            agent_name: Optional name for the agent (will be generated if not provided)
+            **options: Further create_agent options (storage, limits, ...)
+
+        Returns:
+            agent_id: A unique identifier for the created agent
+        """
+        return await self._in_executor(self.manager.create_agent, agent_code, agent_name, **options)
+
+    async def arun_agent(self, agent_id: str, *args, **kwargs) -> Any:
+        """
+        Run the specified agent in-process on the default executor.
+
+        In-process runs share the concurrency limit. The agent's timeout is
+        enforced by run_agent's watchdog, but only subprocess runs can be
+        killed outright.
+
+        Args:
+            agent_id: The ID of the agent to run
+            *args, **kwargs: Arguments to pass to the agent
+
+        Returns:
+            The result from the agent execution
+        """
+        async with self._get_semaphore():
+            return await self._in_executor(self.manager.run_agent, agent_id, *args, **kwargs)
+
+    async def arun_agent_subprocess(self, agent_id: str, *args,
+                                    timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run the agent as a separate process without blocking the event loop.
+
+        Cancelling a 'spawn' run kills the child. Pooled and fork server runs
+        cannot be interrupted from the loop: cancelling one stops the wait, but
+        the run finishes (or times out) in the executor and is recorded there.
+
+        Args:
+            agent_id: The ID of the agent to run
+            *args: Command-line arguments to pass to the agent
+            timeout: Seconds before the child is killed (defaults to default_timeout,
+                then to the agent's configured timeout)
+
+        Returns:
+            The completed process object
+
+        Raises:
+            subprocess.TimeoutExpired: If the run exceeded its timeout
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        async with self._get_semaphore():
+            # Only mark the agent running once it has a slot, so a run cancelled while waiting is not left running
+            run = await self._prepare(agent_id, args, timeout)
+            if run.backend != 'spawn':
+                return await self._in_executor(self.manager.execute_subprocess_run, run)
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *run.command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    preexec_fn=make_preexec_fn(run.limits)
+                )
+            except BaseException as e:
+                await self._finish(run, error=e)
+                raise
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), run.limits["timeout"])
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                error = subprocess.TimeoutExpired(run.command, run.limits["timeout"])
+                await self._finish(run, error=error)
+                raise error
+            except BaseException as e:
+                # Cancelled (or failed) while the child was running: don't leave it behind
+                await self._kill(process)
+                await self._finish(run, error=e)
+                raise
+
+        result = subprocess.CompletedProcess(
+            run.command,
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace")
+        )
+        await self._finish(run, result)
+        return result
+
+    async def _prepare(self, agent_id: str, args: tuple, timeout: Optional[float]):
+        # Materializing the agent touches the disk, so it runs on the executor. If we are cancelled
+        # meanwhile, the run is still prepared and must be finished rather than left running.
+        future = asyncio.ensure_future(
+            self._in_executor(self.manager.prepare_subprocess_run, agent_id, args, timeout))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(self._finish_cancelled_prepare)
+            raise
+
+    def _finish_cancelled_prepare(self, future):
+        if not future.cancelled() and future.exception() is None:
+            asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                self.manager.finish_subprocess_run, future.result(), error=asyncio.CancelledError()))
+
+    async def _finish(self, run, result: Optional[subprocess.CompletedProcess] = None,
+                      error: Optional[BaseException] = None):
+        # Recording loads any profile report from disk; shield it so a cancellation can't skip it
+        await asyncio.shield(self._in_executor(self.manager.finish_subprocess_run, run, result, error))
+
+    @staticmethod
+    async def _kill(process):
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    async def acleanup_agent(self, agent_id: str, delay_seconds: float = 0) -> bool:
+        """
+        Clean up an agent without blocking the event loop.
+
+        Args:
+            agent_id: The ID of the agent to clean up
+            delay_seconds: Delay in seconds before cleaning up (0 means immediate cleanup)
+
+        Returns:
+            True if cleanup was successful or scheduled, False otherwise
+        """
+        return await self._in_executor(self.manager.cleanup_agent, agent_id, delay_seconds)
+
+    def get_agent_status(self, agent_id: str) -> dict:
+        """Get the current status of an agent (see AgentManager.get_agent_status)."""
+        return self.manager.get_agent_status(agent_id)
+
+    async def aclose(self):
+        """Stop the wrapped manager's background work and clean up all agents."""
+        await self._in_executor(self.manager.__exit__, None, None, None)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
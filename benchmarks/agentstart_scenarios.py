@@ -0,0 +1,244 @@
+"""
+Benchmark scenarios for the AgentStart agent runtime and its built-in agents.
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict
+
+# AgentStart modules import each other by bare name
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AgentStart"))
+from agent_core import Agent
+from async_agent import AsyncAgent
+from process_agent import ProcessAgent
+from agent_types import DatabaseAgent, FileAgent
+from scheduler import ActorScheduler
+from benchmarks.harness import measure, measure_batch
+
+
+def _round_trip(agent: Agent, task) -> dict:
+    agent.tell(task)
+    return agent.wait(timeout=5)
+
+
+def agent_messaging(iterations: int = 2000) -> Dict[str, dict]:
+    """
+    Latency of a single tell -> wait round trip, and pipelined throughput.
+
+    Args:
+        iterations: Messages sent per measurement
+
+    Returns:
+        Results keyed by measurement
+    """
+    agent = Agent("bench")
+    agent.start()
+    try:
+        results = {"tell_wait_round_trip": measure(lambda i: _round_trip(agent, i), iterations, warmup=10)}
+
+        def pipelined():
+            for i in range(iterations):
+                agent.tell(i)
+            for _ in range(iterations):
+                agent.wait(timeout=5)
+            return iterations
+
+        results["tell_wait_pipelined"] = measure_batch(pipelined)
+    finally:
+        agent.free()
+
+    # Results collected only through tell's futures, in any order
+    agent = Agent("bench_futures", queue_results=False)
+    agent.start()
+    try:
+        def pipelined_futures():
+            futures = [agent.tell(i) for i in range(iterations)]
+            for future in futures:
+                future.result(timeout=5)
+            return iterations
+
+        results["tell_future_pipelined"] = measure_batch(pipelined_futures)
+    finally:
+        agent.free()
+    return results
+
+
+def agent_fan_out(agents: int = 2000) -> Dict[str, dict]:
+    """
+    One task each for many agents: a thread per agent, the shared scheduler,
+    and AsyncAgent tasks on one event loop.
+
+    Args:
+        agents: Number of agents started
+
+    Returns:
+        Results keyed by runtime; ops_per_sec counts agents started, run and freed per second
+    """
+    def run(scheduler=None):
+        pool = [Agent(f"fan_{i}", queue_results=False, scheduler=scheduler) for i in range(agents)]
+        futures = [agent.tell(i) for i, agent in enumerate(pool)]
+        for future in futures:
+            future.result(timeout=30)
+        for agent in pool:
+            agent.free()
+        return agents
+
+    results = {"fan_out_threads": measure_batch(run)}
+    with ActorScheduler(workers=8) as scheduler:
+        results["fan_out_scheduler"] = measure_batch(lambda: run(scheduler))
+
+    async def run_async():
+        pool = [AsyncAgent(f"fan_{i}", queue_results=False) for i in range(agents)]
+        futures = [await agent.tell(i) for i, agent in enumerate(pool)]
+        await asyncio.wait_for(asyncio.gather(*futures), 30)
+        for agent in pool:
+            await agent.free()
+        return agents
+
+    results["fan_out_asyncio"] = measure_batch(lambda: asyncio.run(run_async()))
+    return results
+
+
+def batched_agents(iterations: int = 2000, batch_size: int = 64) -> Dict[str, dict]:
+    """
+    Pipelined throughput with per-task processing versus batch draining.
+
+    Args:
+        iterations: Tasks sent per measurement
+        batch_size: batch_size of the batching agents
+
+    Returns:
+        Results keyed by agent and batch size
+    """
+    directory = tempfile.mkdtemp(prefix="batch_bench_")
+    results = {}
+    try:
+        for size in (1, batch_size):
+            agent = Agent(f"bench_batch_{size}", queue_results=False, batch_size=size)
+            try:
+                def pipelined():
+                    futures = [agent.tell(i) for i in range(iterations)]
+                    for future in futures:
+                        future.result(timeout=30)
+                    return iterations
+
+                results[f"agent_batch_{size}"] = measure_batch(pipelined)
+            finally:
+                agent.free()
+
+            # A database file, where every commit is a journal write
+            agent = DatabaseAgent(f"bench_db_batch_{size}", os.path.join(directory, f"batch_{size}.db"),
+                                  queue_results=False, batch_size=size)
+            try:
+                agent.tell("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)").result(timeout=30)
+
+                def inserts():
+                    futures = [agent.tell({"action": "query", "sql": "INSERT INTO items (name) VALUES (?)",
+                                           "params": [f"item {i}"], "fetch": False}) for i in range(iterations)]
+                    for future in futures:
+                        future.result(timeout=60)
+                    return iterations
+
+                results[f"database_agent_batch_{size}"] = measure_batch(inserts)
+            finally:
+                agent.free()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+class _SquaresAgent(Agent):
+    """Sums squares up to the task number; pure CPU work that holds the GIL"""
+
+    def _process_task(self, task):
+        return sum(i * i for i in range(task))
+
+
+class _ProcessSquaresAgent(ProcessAgent, _SquaresAgent):
+    pass
+
+
+def cpu_bound_agents(tasks: int = 200, agents: int = 4, size: int = 20000) -> Dict[str, dict]:
+    """
+    CPU-bound tasks spread over several agents: thread-backed versus process-backed.
+
+    Args:
+        tasks: Tasks sent in total
+        agents: Number of agents sharing the tasks
+        size: Work per task (numbers squared and summed)
+
+    Returns:
+        Results keyed by runtime; child processes are started before timing
+    """
+    results = {}
+    for label, cls in (("cpu_agents_threads", _SquaresAgent), ("cpu_agents_processes", _ProcessSquaresAgent)):
+        pool = [cls(f"cpu_{i}", queue_results=False) for i in range(agents)]
+        try:
+            for agent in pool:
+                agent.tell(1).result(timeout=30)
+
+            def run():
+                futures = [pool[i % agents].tell(size) for i in range(tasks)]
+                for future in futures:
+                    future.result(timeout=60)
+                return tasks
+
+            results[label] = measure_batch(run)
+        finally:
+            for agent in pool:
+                agent.free()
+    return results
+
+
+def file_agent(iterations: int = 500) -> Dict[str, dict]:
+    """
+    FileAgent write and read round trips on small files.
+
+    Args:
+        iterations: Writes and reads measured
+
+    Returns:
+        Results keyed by action
+    """
+    directory = tempfile.mkdtemp(prefix="file_agent_bench_")
+    agent = FileAgent("bench_files")
+    agent.start()
+    try:
+        paths = [os.path.join(directory, f"file_{i}.txt") for i in range(iterations)]
+        return {
+            "file_agent_write": measure(lambda i: _round_trip(
+                agent, {"action": "write", "path": paths[i], "content": "x" * 256}), iterations),
+            "file_agent_read": measure(lambda i: _round_trip(
+                agent, {"action": "read", "path": paths[i]}), iterations),
+        }
+    finally:
+        agent.free()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def database_agent(iterations: int = 1000) -> Dict[str, dict]:
+    """
+    DatabaseAgent single-row inserts and primary-key selects on an in-memory database.
+
+    Args:
+        iterations: Inserts and selects measured
+
+    Returns:
+        Results keyed by statement
+    """
+    agent = DatabaseAgent("bench_db")
+    agent.start()
+    try:
+        _round_trip(agent, "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        return {
+            "database_agent_insert": measure(lambda i: _round_trip(agent, {
+                "action": "query", "sql": "INSERT INTO items (id, name) VALUES (?, ?)",
+                "params": [i, f"item {i}"], "fetch": False}), iterations),
+            "database_agent_select": measure(lambda i: _round_trip(agent, {
+                "action": "query", "sql": "SELECT name FROM items WHERE id = ?",
+                "params": [i]}), iterations),
+        }
+    finally:
+        agent.free()
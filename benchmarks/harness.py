@@ -0,0 +1,122 @@
+"""
+Measurement and comparison helpers shared by the benchmark scenarios.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+
+def measure(func: Callable[[int], None], iterations: int, warmup: int = 0) -> Dict[str, float]:
+    """
+    Time repeated calls of func and summarize throughput and latency.
+
+    Args:
+        func: Called with the iteration index
+        iterations: Number of timed calls
+        warmup: Untimed calls made first
+
+    Returns:
+        A dictionary with iterations, total_seconds, ops_per_sec and
+        mean/p50/p95/max latency in milliseconds
+    """
+    for i in range(warmup):
+        func(i)
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for i in range(iterations):
+        call_start = clock()
+        func(i)
+        latencies.append(clock() - call_start)
+    total = clock() - start
+    return summarize(latencies, total)
+
+
+def measure_batch(func: Callable[[], int]) -> Dict[str, float]:
+    """
+    Time one call that performs many operations and reports how many.
+
+    Args:
+        func: Performs the operations and returns their count
+
+    Returns:
+        A dictionary with iterations, total_seconds and ops_per_sec
+    """
+    start = time.perf_counter()
+    count = func()
+    total = time.perf_counter() - start
+    return {"iterations": count, "total_seconds": total, "ops_per_sec": count / total if total else 0.0}
+
+
+def summarize(latencies: List[float], total: float) -> Dict[str, float]:
+    """Reduce per-call latencies (in seconds) to a result dictionary."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    if not count:
+        return {"iterations": 0, "total_seconds": total, "ops_per_sec": 0.0}
+    return {
+        "iterations": count,
+        "total_seconds": total,
+        "ops_per_sec": count / total if total else 0.0,
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": ordered[count // 2] * 1000,
+        "p95_ms": ordered[min(count - 1, int(count * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and interpreter the results were taken on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float = 0.2,
+            metric: str = "ops_per_sec") -> List[Dict[str, float]]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        current: Results keyed by benchmark name
+        baseline: Baseline results keyed by benchmark name
+        threshold: Relative slowdown treated as a regression (0.2 = 20% fewer ops/s)
+        metric: The higher-is-better field to compare
+
+    Returns:
+        One row per benchmark present in both, with name, baseline, current,
+        change (relative) and regression (bool)
+    """
+    rows = []
+    for name in sorted(set(current) & set(baseline)):
+        old = baseline[name].get(metric)
+        new = current[name].get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        rows.append({
+            "name": name,
+            "baseline": old,
+            "current": new,
+            "change": change,
+            "regression": change < -threshold,
+        })
+    return rows
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    """Load the results section of a saved benchmark run."""
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_results(path: str, results: Dict[str, dict], meta: Optional[dict] = None):
+    """Write benchmark results, with environment details, as JSON."""
+    with open(path, "w") as f:
+        json.dump({"meta": meta or environment(), "results": results}, f, indent=2, sort_keys=True)
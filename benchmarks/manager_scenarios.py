@@ -0,0 +1,195 @@
+"""
+Benchmark scenarios for the AgentManager.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, Sequence
+
+# Add the parent directory to the path so we can import the manager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_manager import AgentManager
+from config import DEFAULT_CONFIG
+from registry_store import RegistryStore
+from benchmarks.harness import measure, measure_batch
+
+AGENT_CODE = """
+import sys
+
+def main(*args, **kwargs):
+    return sum(range(100))
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+
+class _TempManager:
+    """An AgentManager in a throwaway directory, torn down on exit."""
+
+    def __init__(self, **config):
+        self.agents_dir = tempfile.mkdtemp(prefix="agent_bench_")
+        settings = DEFAULT_CONFIG.copy()
+        settings['inactive_timeout'] = 3600  # Nothing expires during a run
+        settings.update(config)
+        self.manager = AgentManager(agents_dir=self.agents_dir, config=settings)
+
+    def __enter__(self) -> AgentManager:
+        return self.manager
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.manager.__exit__(exc_type, exc_val, exc_tb)
+        shutil.rmtree(self.agents_dir, ignore_errors=True)
+
+
+def lifecycle(iterations: int = 500, subprocess_iterations: int = 20) -> Dict[str, dict]:
+    """
+    Throughput of create_agent, run_agent, run_agent_subprocess and cleanup_agent.
+
+    Args:
+        iterations: Agents created, run and cleaned up
+        subprocess_iterations: Subprocess runs (each starts an interpreter)
+
+    Returns:
+        Results keyed by operation
+    """
+    results = {}
+    with _TempManager() as manager:
+        agent_ids = []
+        results["create_agent"] = measure(lambda i: agent_ids.append(manager.create_agent(AGENT_CODE)),
+                                          iterations)
+        results["run_agent"] = measure(lambda i: manager.run_agent(agent_ids[i]), iterations)
+        results["run_agent_subprocess"] = measure(
+            lambda i: manager.run_agent_subprocess(agent_ids[i]), subprocess_iterations, warmup=1)
+        results["get_agent_status"] = measure(lambda i: manager.get_agent_status(agent_ids[i]), iterations)
+        results["cleanup_agent"] = measure(lambda i: manager.cleanup_agent(agent_ids[i]), iterations)
+    with _TempManager(agent_storage="memory") as manager:
+        agent_ids = []
+        results["create_agent_memory"] = measure(
+            lambda i: agent_ids.append(manager.create_agent(AGENT_CODE)), iterations)
+        results["run_agent_memory"] = measure(lambda i: manager.run_agent(agent_ids[i]), iterations)
+    return results
+
+
+def cleanup_scan(sizes: Sequence[int] = (10, 1000, 100000), repeats: int = 5) -> Dict[str, dict]:
+    """
+    Cost of a full inactivity sweep over registries of different sizes.
+
+    The registry is filled with in-memory agent records directly, so large
+    sizes do not spend minutes writing files, and nothing is due for
+    cleanup, so every sweep scans the whole registry.
+
+    Args:
+        sizes: Registry sizes to scan
+        repeats: Sweeps timed per size
+
+    Returns:
+        Results keyed by size; ops_per_sec counts agents scanned per second
+    """
+    results = {}
+    for size in sizes:
+        with _TempManager() as manager:
+            now = time.time()
+            for i in range(size):
+                manager.active_agents[f"agent_{i}"] = {
+                    "file_path": None, "source": AGENT_CODE, "storage": "memory",
+                    "limits": None, "code_hash": "", "status": "completed", "last_active": now,
+                }
+            timing = measure(lambda i: manager._cleanup_inactive_agents(), repeats, warmup=1)
+            # Report agents scanned per second rather than sweeps per second
+            timing["ops_per_sec"] *= size
+            results[f"cleanup_scan_{size}"] = timing
+            manager.active_agents.clear()
+    return results
+
+
+def batch_run(jobs: int = 200) -> Dict[str, dict]:
+    """
+    Throughput of run_many on the thread executor.
+
+    Args:
+        jobs: Number of agent runs in the batch
+
+    Returns:
+        Results keyed by executor
+    """
+    with _TempManager() as manager:
+        agent_ids = [manager.create_agent(AGENT_CODE) for _ in range(jobs)]
+        return {"run_many_thread": measure_batch(lambda: sum(1 for _ in manager.run_many(agent_ids)))}
+
+
+def registry_recovery(size: int = 100000) -> Dict[str, dict]:
+    """
+    Time for a restarted manager to resume agents from the persistent registry.
+
+    Args:
+        size: Number of persisted agents
+
+    Returns:
+        Results keyed by size; ops_per_sec counts agents recovered per second
+    """
+    agents_dir = tempfile.mkdtemp(prefix="agent_bench_")
+    registry_path = os.path.join(agents_dir, "registry.db")
+    try:
+        store = RegistryStore(registry_path)
+        now = time.time()
+        for i in range(size):
+            store.record_changed(f"agent_{i}", {
+                "file_path": None, "source": AGENT_CODE, "storage": "memory",
+                "code_hash": "", "status": "completed", "last_active": now,
+            })
+        store.close()
+
+        settings = DEFAULT_CONFIG.copy()
+        settings['inactive_timeout'] = 3600
+        settings['registry_path'] = registry_path
+
+        def recover():
+            manager = AgentManager(agents_dir=agents_dir, config=settings)
+            recovered = len(manager.active_agents)
+            manager.close()
+            return recovered
+
+        return {f"registry_recovery_{size}": measure_batch(recover)}
+    finally:
+        shutil.rmtree(agents_dir, ignore_errors=True)
+
+
+def bulk_cleanup(size: int = 20000) -> Dict[str, dict]:
+    """
+    Time for ensure_cleanup to remove every agent file, flat and sharded.
+
+    Args:
+        size: Number of disk agents created before the cleanup
+
+    Returns:
+        Results keyed by layout and size; ops_per_sec counts files removed per second
+    """
+    results = {}
+    for layout, sharded in (("flat", False), ("sharded", True)):
+        with _TempManager(sharded_agents_dir=sharded) as manager:
+            for i in range(size):
+                manager.create_agent(AGENT_CODE)
+            results[f"bulk_cleanup_{layout}_{size}"] = measure_batch(manager.ensure_cleanup)
+    return results
+
+
+def subprocess_backends(iterations: int = 20) -> Dict[str, dict]:
+    """
+    run_agent_subprocess latency on each subprocess backend.
+
+    Args:
+        iterations: Runs measured per backend
+
+    Returns:
+        Results keyed by backend
+    """
+    results = {}
+    for backend in ("spawn", "pool", "forkserver"):
+        with _TempManager(subprocess_backend=backend) as manager:
+            agent_id = manager.create_agent(AGENT_CODE)
+            results[f"run_agent_subprocess_{backend}"] = measure(
+                lambda i: manager.run_agent_subprocess(agent_id), iterations, warmup=1)
+    return results
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for the agent registry.
+
+Each thread repeatedly touches, transitions and re-registers its own set of
+agents, the way request threads and the reaper share a manager. Throughput
+is reported for the lock-striped AgentRegistry and for a plain dict behind a
+single global lock, at increasing thread counts.
+
+Usage: python -m benchmarks.registry_contention [--threads 1,2,4,8,16] [--ops 20000] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path so we can import the registry
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_registry import AgentRegistry
+
+
+class GlobalLockRegistry:
+    """Baseline: a dict where every operation takes the same lock."""
+
+    def __init__(self):
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def add(self, agent_id, record):
+        with self._lock:
+            self._records[agent_id] = record
+            return True
+
+    def update_record(self, agent_id, **fields):
+        with self._lock:
+            self._records[agent_id].update(fields)
+            return True
+
+    def transition(self, agent_id, status, expected=None, **fields):
+        with self._lock:
+            record = self._records[agent_id]
+            if expected is not None and record["status"] not in expected:
+                return False
+            record["status"] = status
+            return True
+
+    def pop(self, agent_id, default=None):
+        with self._lock:
+            return self._records.pop(agent_id, default)
+
+
+def _worker(registry, thread_index: int, ops: int, agents_per_thread: int = 64):
+    agent_ids = [f"agent_{thread_index}_{i}" for i in range(agents_per_thread)]
+    for agent_id in agent_ids:
+        registry.add(agent_id, {"status": "created", "last_active": 0.0})
+
+    for op in range(ops):
+        agent_id = agent_ids[op % agents_per_thread]
+        registry.transition(agent_id, "running")
+        registry.update_record(agent_id, last_active=time.time())
+        registry.transition(agent_id, "completed", expected=("running",))
+        if op % 16 == 0:
+            registry.pop(agent_id, None)
+            registry.add(agent_id, {"status": "created", "last_active": 0.0})
+
+
+def measure(registry_factory, threads: int, ops: int) -> float:
+    """
+    Run the workload and return operations per second.
+
+    Args:
+        registry_factory: Callable returning a fresh registry
+        threads: Number of concurrent threads
+        ops: Operations per thread
+
+    Returns:
+        Registry operations per second across all threads
+    """
+    registry = registry_factory()
+    workers = [threading.Thread(target=_worker, args=(registry, i, ops)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    # Three registry operations per loop iteration
+    return threads * ops * 3 / elapsed
+
+
+def run(thread_counts, ops: int) -> list:
+    """Measure both registries at each thread count."""
+    results = []
+    for threads in thread_counts:
+        results.append({
+            "threads": threads,
+            "striped_ops_per_sec": measure(AgentRegistry, threads, ops),
+            "global_lock_ops_per_sec": measure(GlobalLockRegistry, threads, ops),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent registry contention benchmark")
+    parser.add_argument("--threads", default="1,2,4,8,16", help="Comma-separated thread counts")
+    parser.add_argument("--ops", type=int, default=20000, help="Operations per thread")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run([int(t) for t in args.threads.split(",")], args.ops)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'threads':>8} {'striped ops/s':>16} {'global lock ops/s':>18}")
+    for row in results:
+        print(f"{row['threads']:>8} {row['striped_ops_per_sec']:>16,.0f} {row['global_lock_ops_per_sec']:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
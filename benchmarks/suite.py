@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the agent manager, the AgentStart runtime and its built-in agents.
+
+Runs every scenario (or a selection), prints a table and optionally writes
+machine-readable JSON. With --compare, results are checked against a stored
+baseline and the exit status is 1 if any benchmark got slower than the
+threshold allows.
+
+Usage:
+    python -m benchmarks.suite [--only lifecycle,cleanup_scan] [--quick]
+                               [--output results.json] [--compare baseline.json] [--threshold 0.2]
+"""
+import argparse
+import sys
+
+from benchmarks import agentstart_scenarios, manager_scenarios, registry_contention
+from benchmarks.harness import compare, environment, load_results, save_results
+
+
+def _registry_contention(quick: bool) -> dict:
+    results = {}
+    for row in registry_contention.run([1, 4] if quick else [1, 4, 16], 2000 if quick else 20000):
+        results[f"registry_striped_{row['threads']}_threads"] = {"ops_per_sec": row["striped_ops_per_sec"]}
+        results[f"registry_global_lock_{row['threads']}_threads"] = {"ops_per_sec": row["global_lock_ops_per_sec"]}
+    return results
+
+
+# name -> callable(quick) returning {benchmark name: result}
+SCENARIOS = {
+    "lifecycle": lambda quick: manager_scenarios.lifecycle(*((50, 3) if quick else (500, 20))),
+    "cleanup_scan": lambda quick: manager_scenarios.cleanup_scan((10, 1000) if quick else (10, 1000, 100000)),
+    "subprocess_backends": lambda quick: manager_scenarios.subprocess_backends(3 if quick else 20),
+    "registry_recovery": lambda quick: manager_scenarios.registry_recovery(1000 if quick else 100000),
+    "bulk_cleanup": lambda quick: manager_scenarios.bulk_cleanup(500 if quick else 20000),
+    "batch_run": lambda quick: manager_scenarios.batch_run(20 if quick else 200),
+    "registry_contention": _registry_contention,
+    "agent_messaging": lambda quick: agentstart_scenarios.agent_messaging(200 if quick else 2000),
+    "agent_fan_out": lambda quick: agentstart_scenarios.agent_fan_out(200 if quick else 2000),
+    "batched_agents": lambda quick: agentstart_scenarios.batched_agents(200 if quick else 2000),
+    "cpu_bound_agents": lambda quick: agentstart_scenarios.cpu_bound_agents(20 if quick else 200),
+    "file_agent": lambda quick: agentstart_scenarios.file_agent(50 if quick else 500),
+    "database_agent": lambda quick: agentstart_scenarios.database_agent(100 if quick else 1000),
+}
+
+
+def run(names, quick: bool = False) -> dict:
+    """
+    Run the selected scenarios.
+
+    Args:
+        names: Scenario names from SCENARIOS
+        quick: Use small sizes (for smoke runs)
+
+    Returns:
+        Results keyed by "<scenario>.<benchmark>"
+    """
+    results = {}
+    for name in names:
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario: {name}")
+        for benchmark, result in SCENARIOS[name](quick).items():
+            results[f"{name}.{benchmark}"] = result
+    return results
+
+
+def print_results(results: dict):
+    print(f"{'benchmark':<55} {'ops/s':>14} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, result in results.items():
+        p50 = f"{result['p50_ms']:.3f}" if "p50_ms" in result else "-"
+        p95 = f"{result['p95_ms']:.3f}" if "p95_ms" in result else "-"
+        print(f"{name:<55} {result['ops_per_sec']:>14,.1f} {p50:>9} {p95:>9}")
+
+
+def print_comparison(rows: list, threshold: float):
+    print(f"\n{'benchmark':<55} {'baseline':>14} {'current':>14} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<55} {row['baseline']:>14,.1f} {row['current']:>14,.1f} "
+              f"{row['change']:>+7.1%}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Agent benchmark suite")
+    parser.add_argument("--only", help="Comma-separated scenarios (default: all)")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    parser.add_argument("--quick", action="store_true", help="Use small sizes")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(SCENARIOS))
+        return 0
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    results = run(names, quick=args.quick)
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results, environment())
+
+    if args.compare:
+        rows = compare(results, load_results(args.compare), args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
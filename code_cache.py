@@ -0,0 +1,163 @@
+"""
+Compiled code-object cache for agent modules.
+
+Keeps the compiled code object of each agent so repeated runs can skip
+re-reading and re-compiling the agent source when nothing has changed.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CodeCache:
+    """
+    An LRU cache of compiled agent code objects.
+
+    Entries are keyed by agent id and validated against a fingerprint
+    (file mtime and size, or a content hash), so a stale entry is never
+    returned after the agent source changes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the code cache.
+
+        Args:
+            max_entries: Maximum number of code objects to keep
+            max_bytes: Approximate memory cap, measured in source bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable, fingerprint: Hashable) -> Optional[Any]:
+        """
+        Return the cached code object for key if its fingerprint still matches.
+
+        Args:
+            key: The cache key, normally the agent id
+            fingerprint: Fingerprint of the current agent source
+
+        Returns:
+            The cached code object, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def store(self, key: Hashable, fingerprint: Hashable, code: Any, size: int = 0):
+        """
+        Store a compiled code object, evicting least recently used entries.
+
+        Args:
+            key: The cache key, normally the agent id
+            fingerprint: Fingerprint of the source the code was compiled from
+            code: The compiled code object
+            size: Size of the source in bytes, used for the memory cap
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[2]
+            self._entries[key] = (fingerprint, code, size)
+            self._total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted[2]
+                self.evictions += 1
+
+    def load(self, key: Hashable, file_path: str) -> Any:
+        """
+        Return the code object for an agent file, compiling it on a miss.
+
+        The file is only read when its mtime or size differ from the cached
+        entry, so a hit costs a single stat call.
+
+        Args:
+            key: The cache key, normally the agent id
+            file_path: Path to the agent source file
+
+        Returns:
+            The compiled code object
+        """
+        stat = os.stat(file_path)
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        code = self.lookup(key, fingerprint)
+        if code is None:
+            with open(file_path, "rb") as f:
+                source = f.read()
+            code = compile(source, file_path, "exec", dont_inherit=True)
+            self.store(key, fingerprint, code, len(source))
+        return code
+
+    def load_source(self, key: Hashable, source: str, fingerprint: Hashable, filename: str) -> Any:
+        """
+        Return the code object for in-memory agent source, compiling it on a miss.
+
+        Args:
+            key: The cache key, normally the agent id
+            source: The agent source code
+            fingerprint: Fingerprint of the source, normally its content hash
+            filename: Filename recorded in the code object for tracebacks
+
+        Returns:
+            The compiled code object
+        """
+        code = self.lookup(key, fingerprint)
+        if code is None:
+            code = compile(source, filename, "exec", dont_inherit=True)
+            self.store(key, fingerprint, code, len(source))
+        return code
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Drop the cached entry for key.
+
+        Args:
+            key: The cache key, normally the agent id
+
+        Returns:
+            True if an entry was removed, False otherwise
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._total_bytes -= entry[2]
+            return True
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache hit/miss counters.
+
+        Returns:
+            A dictionary with hits, misses, evictions, entries and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
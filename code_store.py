@@ -0,0 +1,116 @@
+"""
+Content-addressed store for agent code.
+
+Identical agent source is stored once, as <sha256>.py, and shared by every
+agent that uses it. Objects are reference-counted across agents and deleted
+when the last referencing agent is cleaned up.
+"""
+import hashlib
+import os
+import threading
+import uuid
+from typing import Dict, Tuple
+
+
+def code_digest(source: str) -> str:
+    """Return the SHA-256 hex digest used to address agent source."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class CodeStore:
+    """A reference-counted, content-addressed directory of agent source files."""
+
+    def __init__(self, root: str, fanout: int = 0):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the code objects
+            fanout: Hex digits of the digest used as a subdirectory name (0 stores objects flat)
+        """
+        self.root = root
+        self.fanout = fanout
+        self._refcounts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        """Return the file path of a code object."""
+        if self.fanout:
+            return os.path.join(self.root, digest[:self.fanout], f"{digest}.py")
+        return os.path.join(self.root, f"{digest}.py")
+
+    def acquire(self, source: str, digest: str = None) -> Tuple[str, str]:
+        """
+        Add a reference to some source, writing it only if it is not stored yet.
+
+        Args:
+            source: The agent source code
+            digest: The source's digest, if already computed
+
+        Returns:
+            A (digest, file_path) tuple
+        """
+        digest = digest or code_digest(source)
+        path = self.path_for(digest)
+        with self._lock:
+            if self._refcounts.get(digest, 0) == 0 and not os.path.exists(path):
+                # Write then rename, so readers never see a partial object
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+                with open(temp_path, "w") as f:
+                    f.write(source)
+                os.replace(temp_path, path)
+            self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+        return digest, path
+
+    def release(self, digest: str) -> bool:
+        """
+        Drop a reference, deleting the object when it was the last one.
+
+        Args:
+            digest: The digest returned by acquire
+
+        Returns:
+            True if the object was deleted, False if it is still referenced
+        """
+        with self._lock:
+            count = self._refcounts.get(digest, 0) - 1
+            if count > 0:
+                self._refcounts[digest] = count
+                return False
+            self._refcounts.pop(digest, None)
+            try:
+                os.remove(self.path_for(digest))
+            except FileNotFoundError:
+                pass
+            return True
+
+    def restore(self, refcounts: Dict[str, int]):
+        """
+        Re-establish references to objects that are already on disk.
+
+        Args:
+            refcounts: Number of references per digest, e.g. rebuilt from a persisted registry
+        """
+        with self._lock:
+            for digest, count in refcounts.items():
+                self._refcounts[digest] = self._refcounts.get(digest, 0) + count
+
+    def refcount(self, digest: str) -> int:
+        """Return the number of agents referencing a code object."""
+        with self._lock:
+            return self._refcounts.get(digest, 0)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get store usage numbers.
+
+        Returns:
+            A dictionary with the number of stored objects and of references to them
+        """
+        with self._lock:
+            return {
+                "objects": len(self._refcounts),
+                "references": sum(self._refcounts.values()),
+            }
@@ -13,6 +13,45 @@ ENABLE_AUTO_CLEANUP = True
 DEFAULT_CONFIG = {
     # ... other settings ...
     'inactive_timeout': 5,  # Changed from 30 to 0 for immediate cleanup
+    'registry_stripes': 16,  # Number of independently locked shards in the agent registry
+    'registry_path': None,   # SQLite file mirroring the registry so agents survive restarts (None = memory only)
+    'metrics_enabled': True,  # Record counters and latency histograms (see AgentManager.get_metrics)
+    # Compiled code cache settings
+    'code_cache_size': 256,                   # Max compiled agents kept in memory
+    'code_cache_max_bytes': 64 * 1024 * 1024, # Approximate cap on cached source bytes
+    'generated_code_cache_size': 128,         # Generated agents memoized by generate_agent_code
+    # Result cache for agents created with pure=True (results keyed by code hash and arguments)
+    'result_cache_size': 1024,                    # Max cached results (0 disables the cache)
+    'result_cache_max_bytes': 16 * 1024 * 1024,   # Cap on the pickled size of cached results
+    'result_cache_ttl': 300,                      # Seconds a cached result stays valid (None = until evicted)
+    # Resident agents (created with resident=True) keep their module loaded between runs
+    # Estimated memory budget for resident modules; least recently used ones are unloaded (0 = no limit)
+    'resident_max_bytes': 256 * 1024 * 1024,
+    # Agent storage settings
+    'agent_storage': 'disk',  # 'disk' writes agents to TEMP_AGENTS_DIR, 'memory' keeps source in memory
+    'dedupe_agent_code': False,  # Store identical agent code once, shared and reference-counted across agents
+    'validate_agents': True,      # Reject agent code that does not parse, at create time
+    'require_agent_main': False,  # Also reject code with neither main() nor an if __name__ == "__main__" block
+    'sharded_agents_dir': False,  # Keep agent files in agents_dir/<manager_id>/<hash prefix>/ instead of flat
+    'manager_id': None,           # This manager's subdirectory name (None = derived from registry_path, else random)
+    'cleanup_workers': 8,         # Threads used to unlink files in bulk cleanups
+    # Where in-memory agents are spilled for subprocess runs (None = agents dir, or e.g. a tmpfs path);
+    # each manager spills into its own <manager_id> subdirectory
+    'spill_dir': None,
+    # Subprocess execution settings
+    'subprocess_backend': 'spawn',  # 'spawn' starts a fresh interpreter per run, 'pool' reuses warm workers,
+                                    # 'forkserver' forks each run from a server with modules preloaded
+    'subprocess_pool_size': 4,      # Number of warm worker interpreters for the 'pool' backend
+    'subprocess_pool_max_runs': 100, # Runs before a pool worker is recycled (0 disables recycling)
+    'forkserver_preload': [],       # Modules the fork server imports once, e.g. ['pandas', 'numpy']
+    'prewarm_imports': True,        # Import each new agent's modules in pool workers / the fork server ahead of its runs
+    'stream_tail_bytes': 64 * 1024, # Output kept in memory per stream by run_agent_subprocess_stream
+    # Execution limits (None means unlimited; can be overridden per agent in create_agent)
+    'agent_timeout': None,       # Wall-clock seconds per run. Subprocess runs are killed. In-process runs only get an
+                                 # exception injected, which never lands in C calls or time.sleep: a timed-out agent
+                                 # keeps running (status 'running') until it returns. Use subprocess runs to enforce it
+    'agent_cpu_seconds': None,   # CPU seconds per subprocess run (RLIMIT_CPU)
+    'agent_memory_bytes': None,  # Address space per subprocess run (RLIMIT_AS)
     # UI settings
     'ui_port': 8001,         # Default port for the web UI
     'ui_host': '0.0.0.0',    # Default host for the web UI
@@ -0,0 +1,164 @@
+"""
+Deadline scheduler used to expire inactive agents.
+
+A single long-lived reaper thread sleeps until the earliest deadline in a
+min-heap, so idle managers use no CPU and touching an agent costs O(log n)
+regardless of how many agents are registered.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+
+class ExpiryScheduler:
+    """
+    A min-heap of (deadline, key, kind) entries served by one reaper thread.
+
+    Each (key, kind) pair has at most one armed deadline. Re-scheduling a pair
+    pushes a new heap entry and leaves the old one behind as stale; stale
+    entries are skipped when they reach the top of the heap and the heap is
+    compacted when they outnumber the live ones.
+    """
+
+    def __init__(self, callback: Callable[[Hashable, str], None], name: str = "AgentReaper"):
+        """
+        Initialize the scheduler.
+
+        Args:
+            callback: Called as callback(key, kind) from the reaper thread when a deadline passes
+            name: Name of the reaper thread
+        """
+        self.callback = callback
+        self.name = name
+        self.logger = logging.getLogger("ExpiryScheduler")
+        self._heap = []
+        self._deadlines = {}
+        # Every kind ever scheduled, so unschedule(key) need not scan all deadlines
+        self._kinds = set()
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self) -> bool:
+        """
+        Start the reaper thread.
+
+        Returns:
+            True if the thread was started, False if it was already running
+        """
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return False
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name)
+            self._thread.daemon = True
+            self._thread.start()
+            return True
+
+    def is_alive(self) -> bool:
+        """Check whether the reaper thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancel(self):
+        """Stop the reaper thread (named after threading.Timer.cancel for existing callers)."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def schedule(self, key: Hashable, deadline: float, kind: str = "expire"):
+        """
+        Arm (or re-arm) the deadline for a key.
+
+        Args:
+            key: The scheduled key, normally an agent id
+            deadline: Wall-clock time (time.time()) at which the callback fires
+            kind: Independent deadline slot for the key, e.g. "expire" or "cleanup"
+        """
+        with self._cond:
+            self._kinds.add(kind)
+            self._deadlines[(key, kind)] = deadline
+            entry = (deadline, next(self._counter), key, kind)
+            heapq.heappush(self._heap, entry)
+            if len(self._heap) > 2 * len(self._deadlines) + 1024:
+                self._compact()
+            # Only wake the reaper if the earliest deadline moved forward
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def schedule_many(self, deadlines: Iterable[Tuple[Hashable, float]], kind: str = "expire"):
+        """
+        Arm many deadlines at once, rebuilding the heap a single time.
+
+        Args:
+            deadlines: (key, deadline) pairs
+            kind: Deadline slot used for all keys
+        """
+        with self._cond:
+            self._kinds.add(kind)
+            self._deadlines.update(((key, kind), deadline) for key, deadline in deadlines)
+            self._compact()
+            self._cond.notify()
+
+    def unschedule(self, key: Hashable, kind: Optional[str] = None):
+        """
+        Disarm the deadlines of a key.
+
+        Args:
+            key: The scheduled key
+            kind: The deadline slot to disarm (all slots if None)
+        """
+        with self._cond:
+            if kind is not None:
+                self._deadlines.pop((key, kind), None)
+                return
+            for slot_kind in self._kinds:
+                self._deadlines.pop((key, slot_kind), None)
+
+    def deadline(self, key: Hashable, kind: str = "expire") -> Optional[float]:
+        """Return the armed deadline for a key, or None."""
+        with self._cond:
+            return self._deadlines.get((key, kind))
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._deadlines)
+
+    def _compact(self):
+        """Rebuild the heap from the armed deadlines, dropping stale entries."""
+        self._heap = [(deadline, next(self._counter), key, kind)
+                      for (key, kind), deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def _run(self):
+        """Reaper loop: sleep until the next deadline, then fire it."""
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                deadline, _, key, kind = self._heap[0]
+                if self._deadlines.get((key, kind)) != deadline:
+                    heapq.heappop(self._heap)
+                    continue
+
+                delay = deadline - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._deadlines[(key, kind)]
+
+                # Run the callback without holding the lock so it may reschedule
+                self._cond.release()
+                try:
+                    self.callback(key, kind)
+                except Exception as e:
+                    self.logger.error("Error in expiry callback for %s: %s", key, e)
+                finally:
+                    self._cond.acquire()
@@ -0,0 +1,348 @@
+"""
+Fork-server backend for running agents as subprocesses.
+
+A long-lived server process imports a configurable list of modules once
+(e.g. pandas, numpy) and forks a child for every agent run, so each run
+starts with those modules already loaded and shares their memory
+copy-on-write. Results follow the run_agent_subprocess contract: a
+CompletedProcess with returncode, stdout and stderr.
+
+Run as a script, this module is the server: it reads one JSON job per line
+from stdin and writes {"id", "pid"} when a job's child starts and
+{"id", "returncode"} when it exits. A {"id", "warm": [...]} message imports
+more modules into the server, for all later forks.
+"""
+import argparse
+import importlib
+import itertools
+import json
+import logging
+import os
+import select
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import traceback
+from typing import Dict, Optional, Sequence
+
+from agent_worker import run_agent_file, warm_modules
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+SERVER_SCRIPT = os.path.abspath(__file__)
+
+
+def _returncode(status: int) -> int:
+    """Translate a waitpid status into a subprocess-style return code."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def _run_child(job: dict) -> int:
+    """Apply the job's limits and run its agent file; called in the forked child."""
+    if resource is not None:
+        cpu_seconds = job.get("cpu_seconds")
+        memory_bytes = job.get("memory_bytes")
+        if cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_seconds), int(cpu_seconds) + 1))
+        if memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (int(memory_bytes), int(memory_bytes)))
+    return run_agent_file(job["file_path"], job.get("args", []), job["stdout_path"], job["stderr_path"])
+
+
+def serve(preload: Sequence[str] = ()):
+    """
+    Preload modules, then fork a child per job read from stdin.
+
+    Args:
+        preload: Names of modules to import before serving
+    """
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"fork server: could not preload {name}: {e}", file=sys.stderr)
+
+    # Keep private handles on the protocol pipes and point fds 0/1 at /dev/null,
+    # so nothing an agent or a preloaded module prints can corrupt the replies
+    requests_fd = os.dup(0)
+    replies = os.fdopen(os.dup(1), "w")
+    null_fd = os.open(os.devnull, os.O_RDWR)
+    os.dup2(null_fd, 0)
+    os.dup2(null_fd, 1)
+    os.close(null_fd)
+
+    # Wake select() when a child exits
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+    signal.set_wakeup_fd(wake_w)
+
+    def reply(message: dict):
+        replies.write(json.dumps(message) + "\n")
+        replies.flush()
+
+    running: Dict[int, int] = {}
+    buffer = b""
+    accepting = True
+    while accepting or running:
+        ready, _, _ = select.select([requests_fd, wake_r] if accepting else [wake_r], [], [])
+
+        if wake_r in ready:
+            try:
+                while os.read(wake_r, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+        while running:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            reply({"id": running.pop(pid), "returncode": _returncode(status)})
+
+        if requests_fd not in ready:
+            continue
+        data = os.read(requests_fd, 65536)
+        if not data:
+            # The manager closed the pipe: stop accepting, let running agents finish
+            accepting = False
+            continue
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            job = json.loads(line)
+            if "warm" in job:
+                reply({"id": job["id"], "warmed": warm_modules(job["warm"])})
+                continue
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                returncode = 1
+                try:
+                    signal.set_wakeup_fd(-1)
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    for fd in (requests_fd, replies.fileno(), wake_r, wake_w):
+                        os.close(fd)
+                    returncode = _run_child(job)
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    os._exit(returncode)
+            running[pid] = job["id"]
+            reply({"id": job["id"], "pid": pid})
+
+
+class _Job:
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.returncode: Optional[int] = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+
+
+class ForkServer:
+    """Client for a fork server process, safe to use from many threads."""
+
+    def __init__(self, preload: Sequence[str] = (), python: str = "python",
+                 spool_dir: Optional[str] = None):
+        """
+        Start the fork server.
+
+        Args:
+            preload: Names of modules the server imports before forking agents
+            python: The Python executable to start
+            spool_dir: Directory for per-run stdout/stderr files (defaults to the system temp dir)
+        """
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The fork server backend requires os.fork")
+        self.preload = list(preload)
+        self.python = python
+        self.spool_dir = spool_dir
+        self.logger = logging.getLogger("ForkServer")
+        self.restarts = 0
+        self._ids = itertools.count()
+        self._jobs: Dict[int, _Job] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.process = None
+        self._start()
+
+    def _start(self):
+        command = [self.python, SERVER_SCRIPT]
+        if self.preload:
+            command += ["--preload", ",".join(self.preload)]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, bufsize=1)
+        reader = threading.Thread(target=self._read_replies, args=(self.process,), name="ForkServerReader")
+        reader.daemon = True
+        reader.start()
+
+    def _read_replies(self, process: subprocess.Popen):
+        for line in process.stdout:
+            message = json.loads(line)
+            with self._lock:
+                job = self._jobs.get(message["id"])
+            if job is None:
+                # Including replies to warm messages, which nobody waits for
+                continue
+            if "pid" in message:
+                job.pid = message["pid"]
+                job.started.set()
+            else:
+                job.returncode = message["returncode"]
+                job.done.set()
+        # The server is gone: fail whatever it still owed us
+        with self._lock:
+            orphans = [job for job in self._jobs.values() if not job.done.is_set()]
+        for job in orphans:
+            job.started.set()
+            job.done.set()
+
+    def is_alive(self) -> bool:
+        """Check whether the server process is still running."""
+        return self.process is not None and self.process.poll() is None
+
+    def _submit(self, job_id: int, message: dict):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Fork server is closed")
+            if not self.is_alive():
+                self.logger.warning("Fork server exited with code %s, restarting it",
+                                    self.process.returncode if self.process else None)
+                self.restarts += 1
+                self._start()
+            self._jobs[job_id] = _Job()
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+            return self._jobs[job_id]
+
+    def warm(self, modules: Sequence[str]):
+        """
+        Import more modules into the server, so later runs start with them loaded.
+
+        Does not wait for the imports to finish.
+
+        Args:
+            modules: Module names to import
+        """
+        with self._lock:
+            modules = [name for name in modules if name not in self.preload]
+            if not modules or self._closed:
+                return
+            # Remembered so a restarted server preloads them too
+            self.preload.extend(modules)
+            if self.is_alive():
+                message = {"id": next(self._ids), "warm": modules}
+                self.process.stdin.write(json.dumps(message) + "\n")
+                self.process.stdin.flush()
+
+    def run(self, file_path: str, args: Sequence[str] = (), timeout: Optional[float] = None,
+            limits: Optional[dict] = None) -> subprocess.CompletedProcess:
+        """
+        Run an agent file in a child forked from the server.
+
+        Args:
+            file_path: Path to the agent file
+            args: Command-line arguments to pass to the agent
+            timeout: Wall-clock seconds after which the child is killed
+            limits: Optional cpu_seconds and memory_bytes limits applied in the child
+
+        Returns:
+            A CompletedProcess with the agent's returncode, stdout and stderr
+
+        Raises:
+            subprocess.TimeoutExpired: If the run exceeded its timeout
+            RuntimeError: If the server died before the run finished
+        """
+        args = [str(arg) for arg in args]
+        command = [self.python, file_path] + args
+        fd, stdout_path = tempfile.mkstemp(prefix="agent_fork_", suffix=".out", dir=self.spool_dir)
+        os.close(fd)
+        fd, stderr_path = tempfile.mkstemp(prefix="agent_fork_", suffix=".err", dir=self.spool_dir)
+        os.close(fd)
+        job_id = next(self._ids)
+        message = {
+            "id": job_id,
+            "file_path": os.path.abspath(file_path),
+            "args": args,
+            "stdout_path": stdout_path,
+            "stderr_path": stderr_path,
+        }
+        for key in ("cpu_seconds", "memory_bytes"):
+            if limits and limits.get(key):
+                message[key] = limits[key]
+
+        try:
+            job = self._submit(job_id, message)
+            timed_out = not job.done.wait(timeout)
+            if timed_out:
+                job.started.wait()
+                if job.pid is not None:
+                    try:
+                        os.kill(job.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                job.done.wait()
+            stdout = self._read_spool(stdout_path)
+            stderr = self._read_spool(stderr_path)
+        finally:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            for path in (stdout_path, stderr_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        if timed_out:
+            raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr)
+        if job.returncode is None:
+            raise RuntimeError("Fork server exited before the agent finished")
+        return subprocess.CompletedProcess(args=command, returncode=job.returncode,
+                                           stdout=stdout, stderr=stderr)
+
+    @staticmethod
+    def _read_spool(path: str) -> str:
+        try:
+            with open(path, "r", errors="replace") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def close(self, timeout: float = 5.0):
+        """Stop the server after its running agents finish (killing it after timeout)."""
+        with self._lock:
+            self._closed = True
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent fork server")
+    parser.add_argument("--preload", default="", help="Comma-separated modules to import before serving")
+    options = parser.parse_args()
+    serve([name for name in options.preload.split(",") if name])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Lightweight metrics for the agent manager.
+
+Counters and latency histograms are plain dictionaries updated under a lock;
+nothing is formatted until the metrics are read, so recording is cheap
+enough for hot paths. Readers get a snapshot dictionary or Prometheus text.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames: Sequence[str], labels: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str,
+                 labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_key(self, labels: Tuple[str, ...]) -> str:
+        return ",".join(f"{name}={value}" for name, value in zip(self.labelnames, labels))
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        """
+        Increase the counter.
+
+        Args:
+            *labels: One value per label name, in order
+            amount: How much to add
+        """
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Return the current count for a label combination."""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {self._label_key(labels): value for labels, value in self._values.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in items]
+
+
+class Histogram(_Metric):
+    """A distribution of observed values (normally durations in seconds)."""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """
+        Record one observation.
+
+        Args:
+            value: The observed value
+            *labels: One value per label name, in order
+        """
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        """Return the number of observations for a label combination."""
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {self._label_key(labels): {"count": sum(counts), "sum": total}
+                    for labels, (counts, total) in self._series.items()}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value read from a callback whenever the metrics are collected."""
+    kind = "gauge"
+
+    def __init__(self, *args, func: Callable[[], float], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.func = func
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"": self.func()}
+
+    def render(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.func())}"]
+
+
+class MetricsRegistry:
+    """A named collection of metrics that can be switched off as a whole."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled: Whether metrics are recorded (disabled metrics cost one attribute check)
+        """
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(self, name, help_text, labelnames,
+                                        buckets=buckets or DEFAULT_BUCKETS))
+
+    def gauge(self, name: str, help_text: str, func: Callable[[], float]) -> Gauge:
+        """Create and register a callback gauge."""
+        return self._register(Gauge(self, name, help_text, func=func))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Get the current metric values.
+
+        Returns:
+            A dictionary mapping metric names to {label string: value}; histogram
+            values are {"count": ..., "sum": ...}
+        """
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics as text
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,208 @@
+"""
+Streaming capture of agent subprocess output.
+
+Output is read in fixed-size chunks and handed to the caller as it arrives.
+Only the last N bytes of each stream are kept in memory, and everything can
+optionally be teed to a spool file, so memory use stays constant no matter
+how much an agent prints.
+"""
+import codecs
+import queue
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+_EOF = object()
+
+
+class RingBuffer:
+    """Keeps the last max_bytes bytes written to it."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the ring buffer.
+
+        Args:
+            max_bytes: Number of trailing bytes to keep
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._chunks = deque()
+        self._size = 0
+
+    def write(self, data: bytes):
+        """Append data, discarding the oldest bytes beyond max_bytes."""
+        self.total_bytes += len(data)
+        if self.max_bytes <= 0:
+            return
+        if len(data) >= self.max_bytes:
+            self._chunks.clear()
+            self._chunks.append(data[-self.max_bytes:])
+            self._size = self.max_bytes
+            return
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            excess = self._size - self.max_bytes
+            head = self._chunks[0]
+            if len(head) <= excess:
+                self._chunks.popleft()
+                self._size -= len(head)
+            else:
+                self._chunks[0] = head[excess:]
+                self._size -= excess
+
+    def getvalue(self) -> bytes:
+        """Return the buffered tail."""
+        return b"".join(self._chunks)
+
+
+class StreamingRun:
+    """
+    A running agent subprocess whose output is consumed incrementally.
+
+    Iterating yields ("stdout" | "stderr", text) chunks as they arrive. Once
+    iteration finishes, returncode, stdout_tail and stderr_tail are set; if
+    the caller stops iterating early, the process is killed first.
+    """
+
+    def __init__(self, command: List[str], tail_bytes: int = 64 * 1024,
+                 spool_path: Optional[str] = None, chunk_size: int = 64 * 1024,
+                 timeout: Optional[float] = None, preexec_fn: Optional[Callable[[], None]] = None,
+                 on_exit: Optional[Callable[["StreamingRun"], None]] = None):
+        """
+        Start the process.
+
+        Args:
+            command: The command to run
+            tail_bytes: Trailing bytes of each stream kept in memory
+            spool_path: Optional file that receives all output, in arrival order
+            chunk_size: Maximum bytes read from a pipe at once
+            timeout: Wall-clock seconds after which the process is killed
+            preexec_fn: Called in the child before the command starts (e.g. to set rlimits)
+            on_exit: Called with this object once the process has exited
+        """
+        self.command = command
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+        self.on_exit = on_exit
+        self._tails = {"stdout": RingBuffer(tail_bytes), "stderr": RingBuffer(tail_bytes)}
+        self._decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace")
+                          for name in self._tails}
+        self._spool = open(spool_path, "wb") if spool_path else None
+        # Bounded, so a slow consumer applies back-pressure instead of growing memory
+        self._chunks = queue.Queue(maxsize=64)
+        self._open_streams = 2
+        self._finished = False
+
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        preexec_fn=preexec_fn)
+        self._watchdog = None
+        if timeout:
+            self._watchdog = threading.Timer(timeout, self._on_timeout)
+            self._watchdog.daemon = True
+            self._watchdog.start()
+        self._readers = [
+            threading.Thread(target=self._pump, args=("stdout", self.process.stdout, chunk_size), daemon=True),
+            threading.Thread(target=self._pump, args=("stderr", self.process.stderr, chunk_size), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _on_timeout(self):
+        if self.process.poll() is None:
+            self.timed_out = True
+            self.process.kill()
+
+    def _pump(self, name: str, pipe, chunk_size: int):
+        try:
+            while True:
+                data = pipe.read1(chunk_size)
+                if not data:
+                    break
+                self._chunks.put((name, data))
+        finally:
+            self._chunks.put((name, _EOF))
+
+    @property
+    def stdout_tail(self) -> str:
+        return self._tails["stdout"].getvalue().decode(errors="replace")
+
+    @property
+    def stderr_tail(self) -> str:
+        return self._tails["stderr"].getvalue().decode(errors="replace")
+
+    @property
+    def total_bytes(self) -> int:
+        """Total bytes produced on stdout and stderr so far."""
+        return sum(tail.total_bytes for tail in self._tails.values())
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        try:
+            while self._open_streams:
+                name, text = self._next_chunk()
+                if text:
+                    yield name, text
+        finally:
+            if self._open_streams:
+                # The caller stopped early: nothing reads the pipes any more, so stop
+                # the process and drain what the readers still hold before finishing
+                if self.process.poll() is None:
+                    self.process.kill()
+                while self._open_streams:
+                    self._next_chunk()
+            self._finish()
+
+    def _next_chunk(self) -> Tuple[str, str]:
+        name, data = self._chunks.get()
+        if data is _EOF:
+            self._open_streams -= 1
+            return name, self._decoders[name].decode(b"", final=True)
+        self._tails[name].write(data)
+        if self._spool:
+            self._spool.write(data)
+        return name, self._decoders[name].decode(data)
+
+    def wait(self) -> int:
+        """
+        Consume the remaining output without yielding it and wait for the process.
+
+        Returns:
+            The process return code
+        """
+        for _ in self:
+            pass
+        return self.returncode
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        self.returncode = self.process.wait()
+        if self._watchdog:
+            self._watchdog.cancel()
+        for reader in self._readers:
+            reader.join()
+        self.process.stdout.close()
+        self.process.stderr.close()
+        if self._spool:
+            self._spool.close()
+        if self.on_exit:
+            self.on_exit(self)
+
+    def kill(self):
+        """Kill the process and release its resources."""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.wait()
+
+    def to_completed_process(self) -> subprocess.CompletedProcess:
+        """Return a CompletedProcess holding the captured output tails."""
+        return subprocess.CompletedProcess(self.command, self.returncode, self.stdout_tail, self.stderr_tail)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.kill()
@@ -0,0 +1,234 @@
+"""
+Opt-in profiling of agent runs.
+
+A ProfileCapture wraps one run in cProfile and/or tracemalloc and reduces
+the result to a small JSON-friendly report: the top functions by
+cumulative time and the top allocation sites. Run as a script, this module
+profiles an agent file in a subprocess and writes the report to a file.
+
+This module only uses the standard library so it can bootstrap subprocess runs.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import random
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+PROFILE_MODES = ("cpu", "memory")
+PROFILER_SCRIPT = os.path.abspath(__file__)
+
+# tracemalloc is process-wide: keep it running while any capture needs it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def validate_modes(modes: Sequence[str]) -> tuple:
+    """
+    Check profiling mode names.
+
+    Args:
+        modes: Modes to enable ("cpu", "memory")
+
+    Returns:
+        The modes as a tuple
+
+    Raises:
+        ValueError: If a mode is unknown
+    """
+    for mode in modes:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+    return tuple(modes)
+
+
+def should_profile(enabled: Optional[bool], sample_rate: float) -> bool:
+    """
+    Decide whether to profile a run.
+
+    Args:
+        enabled: The agent's own setting (None defers to sampling)
+        sample_rate: Fraction of runs to profile when the agent has no setting
+
+    Returns:
+        True if the run should be profiled
+    """
+    if enabled is not None:
+        return enabled
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+def summarize_stats(stats: pstats.Stats, top_n: int) -> List[Dict[str, Any]]:
+    """
+    Reduce cProfile statistics to the top functions by cumulative time.
+
+    Args:
+        stats: The collected statistics
+        top_n: Number of functions to keep
+
+    Returns:
+        A list of {function, file, line, calls, total_time, cumulative_time}
+    """
+    rows = []
+    for (file_name, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items():
+        if file_name == __file__:
+            continue
+        rows.append({
+            "function": function,
+            "file": file_name,
+            "line": line,
+            "calls": calls,
+            "total_time": total_time,
+            "cumulative_time": cumulative_time,
+        })
+    rows.sort(key=lambda row: row["cumulative_time"], reverse=True)
+    return rows[:top_n]
+
+
+def summarize_allocations(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                          top_n: int) -> List[Dict[str, Any]]:
+    """
+    Reduce two tracemalloc snapshots to the top allocation sites of the run.
+
+    Args:
+        before: Snapshot taken when the run started
+        after: Snapshot taken when the run finished
+        top_n: Number of sites to keep
+
+    Returns:
+        A list of {file, line, size_bytes, count} sorted by bytes allocated
+    """
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diffs = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    rows = []
+    for diff in diffs:
+        if diff.size_diff <= 0:
+            continue
+        frame = diff.traceback[0]
+        rows.append({
+            "file": frame.filename,
+            "line": frame.lineno,
+            "size_bytes": diff.size_diff,
+            "count": diff.count_diff,
+        })
+        if len(rows) == top_n:
+            break
+    return rows
+
+
+class ProfileCapture:
+    """
+    Context manager that profiles the code run inside it.
+
+    cProfile only sees the thread that enters the context, so enter it on
+    the thread that runs the agent. The report is set on exit, also when the
+    run raised.
+    """
+
+    def __init__(self, modes: Sequence[str] = ("cpu",), top_n: int = 20):
+        """
+        Initialize the capture.
+
+        Args:
+            modes: "cpu" for cProfile, "memory" for tracemalloc
+            top_n: Number of functions and allocation sites to report
+        """
+        self.modes = validate_modes(modes)
+        self.top_n = top_n
+        self.report: Optional[Dict[str, Any]] = None
+        self._profiler = None
+        self._before = None
+
+    def __enter__(self):
+        if "memory" in self.modes:
+            _start_tracemalloc()
+            self._before = tracemalloc.take_snapshot()
+        if "cpu" in self.modes:
+            self._profiler = cProfile.Profile()
+        self._started = time.time()
+        self._clock = time.perf_counter()
+        if self._profiler:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._profiler:
+            self._profiler.disable()
+        report = {
+            "modes": list(self.modes),
+            "started": self._started,
+            "duration": time.perf_counter() - self._clock,
+        }
+        if self._profiler:
+            report["functions"] = summarize_stats(pstats.Stats(self._profiler), self.top_n)
+        if self._before is not None:
+            try:
+                after = tracemalloc.take_snapshot()
+                report["allocations"] = summarize_allocations(self._before, after, self.top_n)
+                report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                _stop_tracemalloc()
+        self.report = report
+        return False
+
+
+def _exit_code(code) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Profile an agent file run as __main__ and write the report as JSON."""
+    parser = argparse.ArgumentParser(description="Run an agent file under the profiler")
+    parser.add_argument("--report", required=True, help="File that receives the JSON report")
+    parser.add_argument("--modes", default="cpu", help="Comma-separated profiling modes")
+    parser.add_argument("--top", type=int, default=20, help="Functions and allocation sites to report")
+    parser.add_argument("file_path")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args(argv)
+
+    # Mirror `python file.py`: argv and the script directory on sys.path
+    sys.argv = [options.file_path] + options.args
+    sys.path[0] = os.path.dirname(os.path.abspath(options.file_path))
+
+    returncode = 0
+    capture = ProfileCapture(options.modes.split(","), options.top)
+    try:
+        with capture:
+            runpy.run_path(options.file_path, run_name="__main__")
+    except SystemExit as e:
+        returncode = _exit_code(e.code)
+    finally:
+        with open(options.report, "w") as f:
+            json.dump(capture.report, f)
+    return returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Persistent storage for the agent registry.
+
+Agent records are mirrored to a SQLite database in WAL mode so a restarted
+manager can resume where it left off. Changes are coalesced per agent and
+written by a background thread in one transaction per batch, so hot paths
+only pay for a dictionary update. Source of in-memory agents is stored once
+per content hash.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+# Record fields that are persisted; everything else (profiles, errors of old runs) is transient
+PERSISTED_FIELDS = ("file_path", "storage", "code_hash", "code_ref",
+                    "limits", "profile", "pure", "resident", "status", "last_active")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    agent_id TEXT PRIMARY KEY,
+    file_path TEXT,
+    storage TEXT,
+    code_hash TEXT,
+    code_ref TEXT,
+    limits TEXT,
+    profile INTEGER,
+    pure INTEGER,
+    resident INTEGER,
+    status TEXT NOT NULL,
+    last_active REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    code_hash TEXT PRIMARY KEY,
+    source TEXT NOT NULL
+);
+"""
+
+_UPSERT = (f"INSERT OR REPLACE INTO agents (agent_id, {', '.join(PERSISTED_FIELDS)}) "
+           f"VALUES ({', '.join('?' * (len(PERSISTED_FIELDS) + 1))})")
+
+
+class RegistryStore:
+    """A write-behind SQLite mirror of agent records."""
+
+    def __init__(self, path: str, flush_interval: float = 0.05):
+        """
+        Open (or create) the database and start the writer thread.
+
+        Args:
+            path: Database file
+            flush_interval: Seconds the writer waits to batch further changes
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger("RegistryStore")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._db_lock = threading.Lock()
+        # agent_id -> (row tuple, source), or None for a deletion; latest change wins
+        self._pending: Dict[str, Optional[tuple]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="RegistryStoreWriter")
+        self._writer.daemon = True
+        self._writer.start()
+
+    def record_changed(self, agent_id: str, record: Optional[dict]):
+        """
+        Queue a change for writing (an AgentRegistry listener).
+
+        Args:
+            agent_id: The ID of the agent
+            record: The agent's current record, or None if it was removed
+        """
+        row = None
+        if record is not None:
+            row = ((agent_id,) + tuple(record.get(field) for field in PERSISTED_FIELDS),
+                   record.get("source"))
+        with self._cond:
+            if not self._pending:
+                self._cond.notify()
+            self._pending[agent_id] = row
+
+    def load(self) -> Dict[str, dict]:
+        """
+        Read every stored record.
+
+        Returns:
+            A dictionary of agent_id -> record
+        """
+        with self._db_lock:
+            # Drop sources no agent refers to any more
+            self._conn.execute("DELETE FROM sources WHERE code_hash NOT IN "
+                               "(SELECT code_hash FROM agents WHERE storage = 'memory')")
+            sources = dict(self._conn.execute("SELECT code_hash, source FROM sources"))
+            rows = self._conn.execute(
+                f"SELECT agent_id, {', '.join(PERSISTED_FIELDS)} FROM agents").fetchall()
+        records = {}
+        # Unpacked by hand: this loop dominates recovery time for large registries
+        for (agent_id, file_path, storage, code_hash, code_ref, limits, profile, pure, resident,
+                status, last_active) in rows:
+            record = {
+                "file_path": file_path,
+                "storage": storage,
+                "code_hash": code_hash,
+                "code_ref": code_ref,
+                "limits": json.loads(limits) if limits is not None else None,
+                "profile": bool(profile) if profile is not None else None,
+                "pure": bool(pure),
+                "resident": bool(resident),
+                "status": status,
+                "last_active": last_active,
+            }
+            if storage == "memory":
+                record["source"] = sources.get(code_hash)
+            records[agent_id] = record
+        return records
+
+    def _write(self, batch: Dict[str, Optional[tuple]]):
+        upserts = []
+        deletes = []
+        sources = {}
+        limits_index = 1 + PERSISTED_FIELDS.index("limits")
+        code_hash_index = 1 + PERSISTED_FIELDS.index("code_hash")
+        for agent_id, change in batch.items():
+            if change is None:
+                deletes.append((agent_id,))
+                continue
+            row, source = change
+            if row[limits_index] is not None:
+                row = row[:limits_index] + (json.dumps(row[limits_index]),) + row[limits_index + 1:]
+            if source is not None:
+                sources[row[code_hash_index]] = source
+            upserts.append(row)
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                if sources:
+                    self._conn.executemany("INSERT OR IGNORE INTO sources (code_hash, source) VALUES (?, ?)",
+                                           sources.items())
+                if upserts:
+                    self._conn.executemany(_UPSERT, upserts)
+                if deletes:
+                    self._conn.executemany("DELETE FROM agents WHERE agent_id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _take_pending(self) -> Dict[str, Optional[tuple]]:
+        with self._cond:
+            batch, self._pending = self._pending, {}
+        return batch
+
+    def flush(self):
+        """Write all queued changes now."""
+        batch = self._take_pending()
+        if batch:
+            self._write(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Give further changes a moment to coalesce into the same transaction
+                self._cond.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error("Error writing agent registry: %s", e)
+
+    def close(self):
+        """Write outstanding changes, stop the writer and close the database."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
@@ -0,0 +1,164 @@
+"""
+Resident agent modules.
+
+A resident agent's module is executed once and kept, so later runs only
+call main and module-level state (loaded models, open connections, parsed
+config) survives between runs. Each slot's memory is estimated when it is
+loaded and the least recently used slots are unloaded once the total goes
+over budget; the agents themselves stay registered and reload on their
+next run.
+"""
+import gc
+import sys
+import threading
+import types
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+def estimate_size(module: types.ModuleType, max_objects: int = 100000) -> int:
+    """
+    Estimate the memory held by a module's namespace.
+
+    Follows references from the module's globals, without descending into
+    other modules or classes, which are shared with the rest of the process.
+
+    Args:
+        module: The executed agent module
+        max_objects: Stop after visiting this many objects
+
+    Returns:
+        The approximate size in bytes
+    """
+    shared = {id(m.__dict__) for m in list(sys.modules.values()) if m is not None and hasattr(m, "__dict__")}
+    seen = set(shared)
+    seen.add(id(module.__dict__))
+    total = sys.getsizeof(module.__dict__)
+    pending = list(module.__dict__.values())
+    while pending and len(seen) < max_objects:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, (types.ModuleType, type)):
+            continue
+        seen.add(id(obj))
+        try:
+            total += sys.getsizeof(obj)
+        except TypeError:
+            continue
+        pending.extend(gc.get_referents(obj))
+    return total
+
+
+class ResidentModules:
+    """LRU slots of loaded agent modules, bounded by their estimated memory."""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024,
+                 on_evict: Optional[Callable[[Hashable], None]] = None):
+        """
+        Initialize the slots.
+
+        Args:
+            max_bytes: Memory budget for all resident modules (0 for no limit)
+            on_evict: Called with the key of every slot unloaded to stay under budget
+        """
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        # key -> (module, size)
+        self._slots = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], types.ModuleType]) -> types.ModuleType:
+        """
+        Return the resident module for key, loading it on first use.
+
+        Concurrent first runs of the same agent load the module once.
+
+        Args:
+            key: The slot key, normally the agent id
+            loader: Executes the agent code and returns the module
+
+        Returns:
+            The resident module
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._slots.move_to_end(key)
+                return slot[0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            with self._lock:
+                slot = self._slots.get(key)
+                if slot is not None:
+                    return slot[0]
+            module = loader()
+            self._store(key, module)
+            return module
+
+    def _store(self, key: Hashable, module: types.ModuleType):
+        size = estimate_size(module)
+        with self._lock:
+            old = self._slots.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._slots[key] = (module, size)
+            self._total_bytes += size
+            self.loads += 1
+            evicted = []
+            # The module just loaded is kept even if it alone is over budget
+            while self.max_bytes and self._total_bytes > self.max_bytes and len(self._slots) > 1:
+                evicted_key, (_, evicted_size) = self._slots.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self._load_locks.pop(evicted_key, None)
+                self.evictions += 1
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            if self.on_evict is not None:
+                self.on_evict(evicted_key)
+
+    def unload(self, key: Hashable) -> bool:
+        """
+        Drop a resident module, so the next run executes the agent code again.
+
+        Args:
+            key: The slot key
+
+        Returns:
+            True if a module was loaded, False otherwise
+        """
+        with self._lock:
+            self._load_locks.pop(key, None)
+            slot = self._slots.pop(key, None)
+            if slot is None:
+                return False
+            self._total_bytes -= slot[1]
+            return True
+
+    def size_of(self, key: Hashable) -> Optional[int]:
+        """Return the estimated size of a resident module, or None if it is not loaded."""
+        with self._lock:
+            slot = self._slots.get(key)
+            return slot[1] if slot is not None else None
+
+    def keys(self) -> List[Hashable]:
+        """Return the keys of the loaded modules, least recently used first."""
+        with self._lock:
+            return list(self._slots)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get slot usage numbers.
+
+        Returns:
+            A dictionary with the number of loaded modules, their bytes, loads and evictions
+        """
+        with self._lock:
+            return {
+                "modules": len(self._slots),
+                "bytes": self._total_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,165 @@
+"""
+Resource limits for agent execution.
+
+Subprocess runs are capped with resource.setrlimit in the child before the
+agent starts; in-process runs get a watchdog that interrupts main() once its
+wall-clock timeout passes.
+"""
+import ctypes
+import signal
+import threading
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+LIMIT_KEYS = ("timeout", "cpu_seconds", "memory_bytes")
+
+
+class AgentTimeoutError(TimeoutError):
+    """Raised when an agent run exceeds its wall-clock timeout."""
+
+
+def resolve_limits(config: dict, overrides: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Merge per-agent limit overrides with the configured defaults.
+
+    Args:
+        config: The manager config ('agent_timeout', 'agent_cpu_seconds', 'agent_memory_bytes')
+        overrides: Per-agent limits keyed by timeout, cpu_seconds and memory_bytes
+
+    Returns:
+        A dictionary with all three limit keys (None means unlimited)
+    """
+    limits = {key: config.get(f"agent_{key}") for key in LIMIT_KEYS}
+    for key, value in (overrides or {}).items():
+        if key not in LIMIT_KEYS:
+            raise ValueError(f"Unknown agent limit: {key}")
+        limits[key] = value
+    return limits
+
+
+def make_preexec_fn(limits: Dict[str, Any]) -> Optional[Callable[[], None]]:
+    """
+    Build a preexec_fn that applies CPU and address-space limits in the child.
+
+    Args:
+        limits: Resolved limits
+
+    Returns:
+        A callable for subprocess.Popen(preexec_fn=...), or None if nothing to apply
+    """
+    cpu_seconds = limits.get("cpu_seconds")
+    memory_bytes = limits.get("memory_bytes")
+    if resource is None or (not cpu_seconds and not memory_bytes):
+        return None
+
+    def apply_limits():
+        if cpu_seconds:
+            # SIGXCPU at the soft limit, SIGKILL one second later
+            seconds = int(cpu_seconds)
+            resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+        if memory_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (int(memory_bytes), int(memory_bytes)))
+
+    return apply_limits
+
+
+def classify_failure(returncode: int, stderr: str, limits: Dict[str, Any]) -> str:
+    """
+    Work out why a subprocess run failed.
+
+    Args:
+        returncode: The process return code
+        stderr: The captured stderr (or its tail)
+        limits: The limits the run was started with
+
+    Returns:
+        "timeout" if it ran out of CPU time, "oom" if it ran out of memory, "error" otherwise
+    """
+    sigxcpu = getattr(signal, "SIGXCPU", None)
+    sigkill = getattr(signal, "SIGKILL", None)
+    if sigxcpu is not None and returncode == -sigxcpu:
+        return "timeout"
+    if "MemoryError" in (stderr or ""):
+        return "oom"
+    if sigkill is not None and returncode == -sigkill:
+        if limits.get("cpu_seconds"):
+            return "timeout"
+        if limits.get("memory_bytes"):
+            return "oom"
+    return "error"
+
+
+def call_with_timeout(func: Callable, timeout: Optional[float], *args,
+                      on_late_exit: Optional[Callable[[], None]] = None, **kwargs) -> Any:
+    """
+    Call func with a wall-clock watchdog.
+
+    The call runs on a helper thread. If it is still running when the timeout
+    passes, AgentTimeoutError is raised in the caller and, as a best effort,
+    injected into the helper thread so pure-Python code stops at its next
+    bytecode boundary.
+
+    This does not enforce the timeout: Python cannot kill a thread, and the
+    injected exception never lands while the thread is blocked in a C call
+    (time.sleep, I/O, extension code). A timed-out call may keep running, and
+    mutating process state, for as long as it likes. Runs that must be stopped
+    have to run in a subprocess.
+
+    Args:
+        func: The function to call
+        timeout: Seconds to wait (None or 0 calls func directly)
+        *args, **kwargs: Arguments for func
+        on_late_exit: Called from the helper thread once a timed-out call has
+            actually returned or raised
+
+    Returns:
+        The return value of func
+    """
+    if not timeout:
+        return func(*args, **kwargs)
+
+    outcome = {}
+    lock = threading.Lock()
+
+    def target():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        while True:
+            try:
+                with lock:
+                    outcome["done"] = True
+                    late = outcome.get("timed_out", False)
+                    if late:
+                        # Drop the watchdog's exception if it is still pending
+                        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(threading.get_ident()), None)
+                break
+            except AgentTimeoutError:
+                # It landed after func had already returned
+                continue
+        if late and on_late_exit is not None:
+            on_late_exit()
+
+    worker = threading.Thread(target=target, name="AgentWatchdogRun")
+    worker.daemon = True
+    worker.start()
+    worker.join(timeout)
+
+    with lock:
+        timed_out = not outcome.get("done")
+        if timed_out:
+            outcome["timed_out"] = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(worker.ident), ctypes.py_object(AgentTimeoutError)
+            )
+    if timed_out:
+        raise AgentTimeoutError(f"Timed out after {timeout} seconds")
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
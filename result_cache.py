@@ -0,0 +1,186 @@
+"""
+Result cache for pure agents.
+
+Agents marked pure at creation are deterministic functions of their
+arguments, so run_agent can return a stored result instead of executing
+them again. Results are keyed by (code hash, args, kwargs), expire after a
+TTL and are evicted least recently used first under an entry and a byte
+budget. Results are stored pickled, so callers get a fresh copy on every
+hit and cannot mutate the cached value.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Returned by lookup on a miss, since None is a valid cached result
+MISSING = object()
+
+
+def result_key(args: tuple, kwargs: dict) -> Optional[bytes]:
+    """
+    Build the cache key of a call's arguments.
+
+    Args:
+        args: Positional arguments of the run
+        kwargs: Keyword arguments of the run
+
+    Returns:
+        The key, or None if the arguments cannot be pickled (the run is then not cached)
+    """
+    try:
+        return pickle.dumps((args, sorted(kwargs.items())), pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+class ResultCache:
+    """An LRU + TTL cache of pickled agent results, with per-agent hit counters."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 ttl: Optional[float] = 300.0):
+        """
+        Initialize the result cache.
+
+        Args:
+            max_entries: Maximum number of results to keep
+            max_bytes: Cap on the pickled size of all results and their keys
+            ttl: Seconds a result stays valid (None keeps results until evicted)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # (code_hash, key) -> (expires, pickled result, size)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        # agent_id -> [hits, misses]
+        self._agent_counts: Dict[Hashable, list] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, agent_id: Hashable, code_hash: str, key: bytes) -> Any:
+        """
+        Return the cached result of a call, counting the hit or miss for the agent.
+
+        Args:
+            agent_id: The agent being run
+            code_hash: Hash of the agent's code
+            key: The arguments' key from result_key
+
+        Returns:
+            A copy of the cached result, or MISSING on a miss
+        """
+        with self._lock:
+            counts = self._agent_counts.setdefault(agent_id, [0, 0])
+            entry = self._entries.get((code_hash, key))
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                self._drop((code_hash, key))
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                counts[1] += 1
+                return MISSING
+            self._entries.move_to_end((code_hash, key))
+            self.hits += 1
+            counts[0] += 1
+            data = entry[1]
+        return pickle.loads(data)
+
+    def store(self, code_hash: str, key: bytes, result: Any) -> bool:
+        """
+        Cache the result of a call, evicting least recently used results.
+
+        Args:
+            code_hash: Hash of the agent's code
+            key: The arguments' key from result_key
+            result: The value main returned
+
+        Returns:
+            True if the result was cached, False if it cannot be pickled or is over budget
+        """
+        if self.max_entries <= 0:
+            return False
+        try:
+            data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        size = len(data) + len(key)
+        if size > self.max_bytes:
+            return False
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._drop((code_hash, key))
+            self._entries[(code_hash, key)] = (expires, data, size)
+            self._total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted[2]
+                self.evictions += 1
+        return True
+
+    def _drop(self, cache_key: Tuple[str, bytes]):
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def invalidate_code(self, code_hash: str) -> int:
+        """
+        Drop every result computed by some code.
+
+        Args:
+            code_hash: Hash of the agent's code
+
+        Returns:
+            Number of results dropped
+        """
+        with self._lock:
+            stale = [cache_key for cache_key in self._entries if cache_key[0] == code_hash]
+            for cache_key in stale:
+                self._drop(cache_key)
+            return len(stale)
+
+    def forget_agent(self, agent_id: Hashable):
+        """Drop an agent's hit counters (its results stay shared by code hash)."""
+        with self._lock:
+            self._agent_counts.pop(agent_id, None)
+
+    def agent_stats(self, agent_id: Hashable) -> Dict[str, Any]:
+        """
+        Get the hit counters of one agent.
+
+        Returns:
+            A dictionary with hits, misses and hit_rate (None before the first lookup)
+        """
+        with self._lock:
+            hits, misses = self._agent_counts.get(agent_id, (0, 0))
+        total = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else None}
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+            A dictionary with hits, misses, evictions, expirations, entries and bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
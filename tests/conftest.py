@@ -2,22 +2,55 @@
 Pytest configuration for agent manager tests.
 """
 import os
+import shutil
 import sys
+import uuid
 import pytest
 
 # Add the parent directory to the path to import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_manager import AgentManager
+from config import DEFAULT_CONFIG, TEMP_AGENTS_DIR
 
 # Define global fixtures here if needed
 @pytest.fixture(scope="session", autouse=True)
 def setup_tests():
     """Set up any global test requirements."""
     # Create any necessary directories or resources
-    from config import TEMP_AGENTS_DIR
     os.makedirs(TEMP_AGENTS_DIR, exist_ok=True)
     
     yield
     
     # Clean up after all tests
     # This runs after all tests have completed
-    pass 
\ No newline at end of file
+    pass
+
+
+@pytest.fixture
+def agents_dir():
+    """Create a test-specific agents directory, removed with its contents afterwards."""
+    test_dir = os.path.join(TEMP_AGENTS_DIR, f"test_{uuid.uuid4().hex[:8]}")
+    os.makedirs(test_dir, exist_ok=True)
+    yield test_dir
+    shutil.rmtree(test_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def agent_config(request):
+    """
+    Config for the agent_manager fixture.
+    
+    Test modules override this fixture for settings shared by all their tests,
+    and single tests parametrize it indirectly with a dict of overrides.
+    """
+    config = DEFAULT_CONFIG.copy()
+    config['inactive_timeout'] = 60  # Extend timeout for testing
+    config.update(getattr(request, "param", {}))
+    return config
+
+
+@pytest.fixture
+def agent_manager(agents_dir, agent_config):
+    """Create an agent manager, shutting it down and cleaning up its agents afterwards."""
+    with AgentManager(agents_dir=agents_dir, config=agent_config) as manager:
+        yield manager
@@ -0,0 +1,128 @@
+"""
+Test cases for create-time agent analysis and import pre-warming.
+"""
+import os
+import pytest
+import sys
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_analysis import analyze_agent_source, prewarmable_modules
+
+AGENT_CODE = """
+import sys
+import os.path
+from decimal import Decimal
+from . import sibling
+
+async def main(name, *args, verbose=False, **kwargs):
+    return Decimal(1)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
+"""
+
+# Checks for the module before its own import of it
+WARM_CHECK_AGENT = """
+import sys
+print("fractions" in sys.modules)
+import fractions
+"""
+
+
+def test_analysis_fields():
+    """Test that main, its signature, the guard and the imports are reported."""
+    analysis = analyze_agent_source(AGENT_CODE)
+    assert analysis["valid"] is True
+    assert analysis["has_main"] is True
+    assert analysis["main_is_async"] is True
+    assert analysis["main_signature"] == "(name, *args, verbose=..., **kwargs)"
+    assert analysis["has_main_guard"] is True
+    # Relative imports are the agent's own files and are not listed
+    assert analysis["imports"] == ["decimal", "os", "sys"]
+
+
+def test_analysis_reports_syntax_errors():
+    """Test that unparsable code is flagged without raising."""
+    analysis = analyze_agent_source("def main(:\n    pass\n")
+    assert analysis["valid"] is False
+    assert "SyntaxError" in analysis["syntax_error"]
+    assert analysis["imports"] == []
+
+
+def test_prewarmable_modules():
+    """Test that builtins, excluded and unknown modules are skipped."""
+    modules = ["sys", "decimal", "json", "no_such_module_xyz", "__future__"]
+    assert prewarmable_modules(modules, exclude=["json"]) == ["decimal"]
+
+
+def test_create_rejects_invalid_code(agent_manager):
+    """Test that code with a syntax error is rejected before anything is written."""
+    with pytest.raises(ValueError, match="invalid code"):
+        agent_manager.create_agent("print('unterminated)\n", agent_name="broken")
+    assert agent_manager.get_agent_status("broken") is None
+    assert not os.path.exists(os.path.join(agent_manager.agents_dir, "broken.py"))
+
+
+def test_create_records_analysis(agent_manager):
+    """Test that the analysis is kept in the agent record."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+    analysis = agent_manager.get_agent_status(agent_id)["analysis"]
+    assert analysis["has_main"] is True
+    assert analysis["imports"] == ["decimal", "os", "sys"]
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("agent_config", [{"validate_agents": False}], indirect=True)
+def test_validation_can_be_disabled(agent_manager):
+    """Test that validate_agents=False accepts broken code, which then fails when run."""
+    agent_id = agent_manager.create_agent("def main(:\n")
+    assert agent_manager.get_agent_status(agent_id)["analysis"]["valid"] is False
+    with pytest.raises(SyntaxError):
+        agent_manager.run_agent(agent_id)
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("agent_config", [{"require_agent_main": True}], indirect=True)
+def test_require_agent_main(agent_manager):
+    """Test that require_agent_main rejects code with no entry point."""
+    with pytest.raises(ValueError, match="main"):
+        agent_manager.create_agent("x = 1\n")
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    assert agent_manager.run_agent(agent_id) == 1
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.parametrize("agent_config", [{"subprocess_backend": "forkserver"}], indirect=True)
+def test_fork_server_prewarms_imports(agent_manager):
+    """Test that an agent's imports are loaded in the fork server before its run."""
+    agent_id = agent_manager.create_agent(WARM_CHECK_AGENT)
+    assert "fractions" in agent_manager.fork_server.preload
+    # The warm message is queued ahead of the run, so the fork already has it
+    result = agent_manager.run_agent_subprocess(agent_id)
+    assert result.stdout.strip() == "True"
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("agent_config", [{"subprocess_backend": "pool", "subprocess_pool_size": 1}], indirect=True)
+def test_pool_prewarms_imports(agent_manager):
+    """Test that an agent's imports are loaded in idle pool workers."""
+    agent_id = agent_manager.create_agent(WARM_CHECK_AGENT)
+    pool = agent_manager.subprocess_pool
+    deadline = time.time() + 10
+    while not all("fractions" in worker.warmed for worker in pool._workers) and time.time() < deadline:
+        time.sleep(0.05)
+    result = agent_manager.run_agent_subprocess(agent_id)
+    assert result.stdout.strip() == "True"
+    assert "fractions" in pool.preload
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_spawn_backend_does_not_prewarm(agent_manager):
+    """Test that the spawn backend starts no pool or server for pre-warming."""
+    agent_id = agent_manager.create_agent(WARM_CHECK_AGENT)
+    assert agent_manager.subprocess_pool is None
+    assert agent_manager.fork_server is None
+    agent_manager.cleanup_agent(agent_id)
@@ -9,33 +9,6 @@ import time
 
 # Add parent directory to path to import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agent_manager import AgentManager
-from config import DEFAULT_CONFIG, TEMP_AGENTS_DIR
-
-# Test configuration
-TEST_CONFIG = DEFAULT_CONFIG.copy()
-TEST_CONFIG['inactive_timeout'] = 60  # Extend timeout for testing
-
-
-@pytest.fixture
-def agent_manager():
-    """Create an agent manager instance for testing."""
-    # Use a test-specific directory to avoid conflicts
-    test_dir = os.path.join(TEMP_AGENTS_DIR, f"test_{uuid.uuid4().hex[:8]}")
-    os.makedirs(test_dir, exist_ok=True)
-    
-    # Create manager with test config
-    manager = AgentManager(agents_dir=test_dir, config=TEST_CONFIG)
-    
-    # Yield the manager for test use
-    yield manager
-    
-    # Cleanup after tests
-    manager.cleanup_all_agents()
-    try:
-        os.rmdir(test_dir)  # Remove test directory if empty
-    except:
-        pass  # Ignore errors during cleanup
 
 
 def test_basic_agent_creation(agent_manager):
@@ -310,4 +283,24 @@ def main(*args, **kwargs):
     
     # Verify file no longer exists after timeout and cleanup
     assert not os.path.exists(file_path)
-    assert agent_id not in agent_manager.active_agents 
\ No newline at end of file
+    assert agent_id not in agent_manager.active_agents 
+
+def test_subprocess_launch_error_marks_agent(agent_manager, monkeypatch):
+    """Test that an agent whose subprocess fails to start is not left running."""
+    import subprocess
+
+    def fail(*args, **kwargs):
+        raise FileNotFoundError("python")
+
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    monkeypatch.setattr(subprocess, "run", fail)
+    monkeypatch.setattr(subprocess, "Popen", fail)
+
+    with pytest.raises(FileNotFoundError):
+        agent_manager.run_agent_subprocess(agent_id)
+    assert agent_manager.active_agents[agent_id]["status"] == "error"
+
+    with pytest.raises(FileNotFoundError):
+        agent_manager.run_agent_subprocess_stream(agent_id)
+    assert agent_manager.active_agents[agent_id]["status"] == "error"
+    assert agent_manager.active_agents[agent_id]["error"] == "python"
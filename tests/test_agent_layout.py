@@ -0,0 +1,134 @@
+"""
+Test cases for the sharded agents_dir layout and bulk cleanup.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_layout import AgentLayout, remove_files, scan_files
+from agent_manager import AgentManager
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Use the sharded agents_dir layout."""
+    agent_config['sharded_agents_dir'] = True
+    return agent_config
+
+
+AGENT_CODE = """
+def main(*args, **kwargs):
+    return "sharded"
+"""
+
+
+def test_sharded_paths(agents_dir, agent_config):
+    """Test that agent files land in hash-prefix shards under the manager directory."""
+    with AgentManager(agents_dir=agents_dir, config=agent_config.copy()) as manager:
+        agent_id = manager.create_agent(AGENT_CODE, agent_name="sharded_agent")
+        file_path = manager.active_agents[agent_id]["file_path"]
+        shard = os.path.dirname(file_path)
+        assert os.path.dirname(shard) == os.path.join(agents_dir, manager.manager_id)
+        assert len(os.path.basename(shard)) == 2
+        assert os.path.basename(file_path) == "sharded_agent.py"
+        assert manager.run_agent(agent_id) == "sharded"
+        assert manager.run_agent_subprocess(agent_id).returncode == 0
+
+
+def test_managers_sharing_a_directory_keep_their_files(agents_dir, agent_config):
+    """Test that one manager's bulk cleanup leaves another manager's agents alone."""
+    first = AgentManager(agents_dir=agents_dir, config=agent_config.copy())
+    second = AgentManager(agents_dir=agents_dir, config=agent_config.copy())
+    try:
+        assert first.manager_id != second.manager_id
+        kept = second.create_agent(AGENT_CODE)
+        for _ in range(5):
+            first.create_agent(AGENT_CODE)
+
+        assert first.ensure_cleanup() == 5
+        assert not os.path.exists(first.layout.root)
+        assert os.path.exists(second.active_agents[kept]["file_path"])
+        assert second.run_agent(kept) == "sharded"
+    finally:
+        first.__exit__(None, None, None)
+        second.__exit__(None, None, None)
+
+
+def test_ensure_cleanup_removes_leftover_files(agents_dir, agent_config):
+    """Test that files without a registered agent are dropped with the manager directory."""
+    with AgentManager(agents_dir=agents_dir, config=agent_config.copy()) as manager:
+        stray = manager.layout.path_for("stray")
+        with open(stray, "w") as f:
+            f.write(AGENT_CODE)
+        manager.create_agent(AGENT_CODE)
+        assert manager.ensure_cleanup() == 2
+        assert not os.path.exists(stray)
+        # The manager keeps working after its directory was dropped
+        agent_id = manager.create_agent(AGENT_CODE)
+        assert manager.run_agent(agent_id) == "sharded"
+
+
+def test_sharded_shared_code_objects(agents_dir, agent_config):
+    """Test that deduplicated code objects fan out under the manager directory."""
+    config = agent_config.copy()
+    config['dedupe_agent_code'] = True
+    with AgentManager(agents_dir=agents_dir, config=config) as manager:
+        first = manager.create_agent(AGENT_CODE)
+        second = manager.create_agent(AGENT_CODE)
+        file_path = manager.active_agents[first]["file_path"]
+        assert file_path == manager.active_agents[second]["file_path"]
+        assert os.path.dirname(os.path.dirname(file_path)) == manager.layout.objects_dir
+        assert list(manager.layout.agent_files()) == []
+        assert manager.ensure_cleanup() == 2
+
+
+def test_manager_id_is_stable_with_a_registry(agents_dir, agent_config):
+    """Test that a restarted manager with the same registry reuses its directory."""
+    config = agent_config.copy()
+    config['registry_path'] = os.path.join(agents_dir, "registry.db")
+    manager = AgentManager(agents_dir=agents_dir, config=config.copy())
+    agent_id = manager.create_agent(AGENT_CODE)
+    manager.close()
+
+    restarted = AgentManager(agents_dir=agents_dir, config=config.copy())
+    try:
+        assert restarted.manager_id == manager.manager_id
+        assert restarted.run_agent(agent_id) == "sharded"
+    finally:
+        restarted.__exit__(None, None, None)
+
+
+def test_flat_layout_is_the_default(agents_dir):
+    """Test that without sharding, agent files stay directly in agents_dir."""
+    layout = AgentLayout(agents_dir)
+    assert layout.path_for("flat") == os.path.join(agents_dir, "flat.py")
+    assert layout.objects_dir == os.path.join(agents_dir, "objects")
+
+
+def test_parallel_remove_files(tmp_path):
+    """Test scanning and parallel unlinking of many files."""
+    layout = AgentLayout(str(tmp_path), sharded=True, manager_id="m")
+    paths = [layout.path_for(f"agent_{n}") for n in range(300)]
+    for path in paths:
+        open(path, "w").close()
+    assert sorted(scan_files(layout.root)) == sorted(paths)
+    assert sorted(layout.agent_files()) == sorted(paths)
+    assert remove_files(paths[:200], workers=4) == 200
+    assert remove_files(paths[:200], workers=4) == 0
+    assert layout.drop(workers=4) == 100
+    assert not os.path.exists(layout.root)
+
+
+def test_flat_drop_keeps_shared_objects(agents_dir):
+    """Test that dropping the flat layout leaves the code objects other managers share."""
+    layout = AgentLayout(agents_dir)
+    open(layout.path_for("flat"), "w").close()
+    os.makedirs(layout.objects_dir)
+    shared = os.path.join(layout.objects_dir, "shared.py")
+    open(shared, "w").close()
+
+    assert layout.drop() == 1
+    assert os.path.exists(shared)
+    assert not os.path.exists(layout.path_for("flat"))
@@ -0,0 +1,161 @@
+"""
+Test cases for the thread-safe agent registry.
+"""
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_registry import AgentRegistry
+
+
+def test_registry_behaves_like_a_dict():
+    """Test the dict-compatible surface used by existing callers."""
+    registry = AgentRegistry(stripes=4)
+    registry["a"] = {"status": "created"}
+    registry["b"] = {"status": "created"}
+
+    assert "a" in registry
+    assert len(registry) == 2
+    assert sorted(registry.keys()) == ["a", "b"]
+    assert registry["a"]["status"] == "created"
+
+    del registry["a"]
+    assert registry.get("a") is None
+    assert registry.pop("b")["status"] == "created"
+    assert len(registry) == 0
+
+
+def test_transition_checks_expected_status():
+    """Test that transitions only happen from the expected statuses."""
+    registry = AgentRegistry()
+    registry["a"] = {"status": "created"}
+
+    assert registry.transition("a", "running", expected=("created",)) is True
+    assert registry.transition("a", "running", expected=("created",)) is False
+    assert registry.transition("a", "error", error="boom") is True
+    assert registry["a"] == {"status": "error", "error": "boom"}
+    assert registry.transition("missing", "running") is False
+
+
+def test_overlapping_runs_keep_agent_running():
+    """Test that an agent stays running until its last in-flight run finishes."""
+    registry = AgentRegistry()
+    registry["a"] = {"status": "created"}
+
+    assert registry.start_run("a") is True
+    assert registry.start_run("a") is True
+    assert registry.finish_run("a", "completed") is False
+    assert registry["a"]["status"] == "running"
+    assert registry.finish_run("a", "error", error="boom") is True
+    assert registry["a"] == {"status": "error", "error": "boom", "active_runs": 0}
+    assert registry.start_run("missing") is False
+    assert registry.finish_run("missing", "completed") is False
+
+
+def test_remove_if_is_conditional():
+    """Test that remove_if only removes records matching the predicate."""
+    registry = AgentRegistry()
+    registry["a"] = {"status": "running"}
+
+    assert registry.remove_if("a", lambda record: record["status"] != "running") is None
+    assert "a" in registry
+    assert registry.remove_if("a", lambda record: True) == {"status": "running"}
+    assert "a" not in registry
+
+
+def test_iteration_while_mutating():
+    """Test that iterating never fails while other threads add and remove agents."""
+    registry = AgentRegistry()
+    stop = threading.Event()
+    errors = []
+
+    def mutate():
+        i = 0
+        while not stop.is_set():
+            registry[f"agent_{i}"] = {"status": "created", "last_active": 0}
+            registry.pop(f"agent_{i - 50}", None)
+            i += 1
+
+    writer = threading.Thread(target=mutate)
+    writer.start()
+    try:
+        for _ in range(2000):
+            for agent_id, record in registry.items():
+                record["status"]
+    except RuntimeError as e:
+        errors.append(e)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert errors == []
+
+
+def test_concurrent_create_run_cleanup(agent_manager):
+    """Test creating, running and cleaning up agents from many threads."""
+    errors = []
+
+    def worker(index):
+        try:
+            for i in range(20):
+                agent_id = agent_manager.create_agent(
+                    f"def main():\n    return {index * 100 + i}\n", storage="memory"
+                )
+                assert agent_manager.run_agent(agent_id) == index * 100 + i
+                agent_manager._cleanup_inactive_agents()
+                assert agent_manager.cleanup_agent(agent_id) is True
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(agent_manager.active_agents) == 0
+
+
+def test_concurrent_cleanup_succeeds_once(agent_manager):
+    """Test that racing cleanups of the same agent only succeed once."""
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    results = []
+    barrier = threading.Barrier(8)
+
+    def cleanup():
+        barrier.wait()
+        results.append(agent_manager.cleanup_agent(agent_id))
+
+    threads = [threading.Thread(target=cleanup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 1
+
+
+def test_overlapping_runs_of_one_agent(agent_manager):
+    """Test that a run finishing while another is in flight leaves the agent running."""
+    import builtins
+    builtins.overlap_test_release = threading.Event()
+    agent_id = agent_manager.create_agent(
+        "import builtins\n\ndef main(wait=False):\n"
+        "    if wait:\n        builtins.overlap_test_release.wait(10)\n    return wait\n"
+    )
+    slow = threading.Thread(target=agent_manager.run_agent, args=(agent_id, True))
+    slow.start()
+    try:
+        while agent_manager.active_agents[agent_id].get("active_runs") != 1:
+            time.sleep(0.01)
+        assert agent_manager.run_agent(agent_id) is False
+        assert agent_manager.active_agents[agent_id]["status"] == "running"
+    finally:
+        builtins.overlap_test_release.set()
+        slow.join()
+        del builtins.overlap_test_release
+    assert agent_manager.active_agents[agent_id]["status"] == "completed"
@@ -0,0 +1,81 @@
+"""
+Test cases for memoized, template-compiled agent code generation.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_templates import AgentCodeGenerator, AgentTemplate
+
+
+def test_template_render():
+    """Test that templates fill fields and unescape braces."""
+    template = AgentTemplate("{name} = {{}}\n")
+    assert template.fields == {"name"}
+    assert template.render(name="x") == "x = {}\n"
+
+
+def test_generation_is_memoized():
+    """Test that the same task and dependencies return the cached result."""
+    generator = AgentCodeGenerator()
+    first = generator.generate("Sort a list", ["math"])
+    second = generator.generate("Sort a list", ("math",))
+    assert second is first
+    assert generator.stats() == {"hits": 1, "misses": 1, "entries": 1}
+    assert generator.compiled(first.code_hash) is first.code
+    assert generator.generate("Sort a list", ["os"]) is not first
+
+
+def test_generation_cache_is_bounded():
+    """Test that the least recently used entries are evicted."""
+    generator = AgentCodeGenerator(cache_size=2)
+    first = generator.generate("one")
+    generator.generate("two")
+    generator.generate("three")
+    assert generator.stats()["entries"] == 2
+    assert generator.compiled(first.code_hash) is None
+
+
+@pytest.mark.parametrize("dependency", ["os; import shutil", "", "1math", "os..path"])
+def test_invalid_dependencies_rejected(agent_manager, dependency):
+    """Test that bad dependencies fail at generation time."""
+    with pytest.raises(ValueError):
+        agent_manager.generate_agent_code("Do something", [dependency])
+
+
+def test_invalid_generated_code_rejected(agent_manager):
+    """Test that a task that breaks the template fails at generation time."""
+    with pytest.raises(ValueError):
+        agent_manager.generate_agent_code('Say "hi')
+
+
+def test_generated_agent_reuses_compiled_code(agent_manager):
+    """Test that creating an agent from generated code skips compilation."""
+    agent_code = agent_manager.generate_agent_code("Send a greeting", ["os.path"])
+    agent_id = agent_manager.create_agent(agent_code)
+
+    assert agent_manager.run_agent(agent_id) == "Hello! I am your greeting agent. Nice to meet you!"
+    stats = agent_manager.get_code_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 0
+
+    memory_id = agent_manager.create_agent(agent_code, storage="memory")
+    assert agent_manager.run_agent(memory_id) == "Hello! I am your greeting agent. Nice to meet you!"
+    assert agent_manager.get_code_cache_stats()["hits"] == 2
+
+
+def test_compiled_code_uses_agent_filename(agent_manager):
+    """Test that memoized code primed for an agent is named after the agent's file."""
+    generator = AgentCodeGenerator()
+    generated = generator.generate("Send a greeting")
+    code = generator.compiled(generated.code_hash, "/agents/greeting.py")
+    main = next(const for const in code.co_consts if getattr(const, "co_name", None) == "main")
+    assert code.co_filename == main.co_filename == "/agents/greeting.py"
+    assert generated.code.co_filename == "<generated agent>"
+
+    agent_id = agent_manager.create_agent(agent_manager.generate_agent_code("Send a greeting"))
+    file_path = agent_manager.active_agents[agent_id]["file_path"]
+    stat = os.stat(file_path)
+    assert agent_manager.code_cache.lookup(agent_id, (stat.st_mtime_ns, stat.st_size)).co_filename == file_path
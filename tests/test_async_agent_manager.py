@@ -0,0 +1,154 @@
+"""
+Test cases for the asyncio front end of the Agent Manager.
+"""
+import asyncio
+import os
+import pytest
+import subprocess
+import sys
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_agent_manager import AsyncAgentManager
+
+SLEEP_AGENT = """
+import sys
+import time
+
+if __name__ == "__main__":
+    time.sleep(float(sys.argv[1]))
+    print("slept")
+"""
+
+
+@pytest.fixture
+def async_manager(agent_manager):
+    """Create an async agent manager instance for testing."""
+    return AsyncAgentManager(agent_manager, max_concurrency=20)
+
+
+def test_async_create_and_run(async_manager):
+    """Test creating and running an agent in-process from a coroutine."""
+    async def scenario():
+        agent_id = await async_manager.acreate_agent("def main(x):\n    return x * 2\n")
+        return agent_id, await async_manager.arun_agent(agent_id, 21)
+
+    agent_id, result = asyncio.run(scenario())
+    assert result == 42
+    assert async_manager.get_agent_status(agent_id)["status"] == "completed"
+
+
+def test_concurrent_subprocess_runs(async_manager):
+    """Test that subprocess runs overlap instead of running serially."""
+    agent_id = async_manager.manager.create_agent(SLEEP_AGENT)
+
+    async def scenario():
+        return await asyncio.gather(*[
+            async_manager.arun_agent_subprocess(agent_id, 0.5) for _ in range(10)
+        ])
+
+    start = time.time()
+    results = asyncio.run(scenario())
+    elapsed = time.time() - start
+
+    assert all(r.returncode == 0 and r.stdout.strip() == "slept" for r in results)
+    assert elapsed < 4.0
+    assert async_manager.get_agent_status(agent_id)["status"] == "completed"
+
+
+def test_subprocess_timeout_kills_child(async_manager):
+    """Test that a run exceeding its timeout is killed and reported."""
+    agent_id = async_manager.manager.create_agent(SLEEP_AGENT)
+
+    async def scenario():
+        await async_manager.arun_agent_subprocess(agent_id, 30, timeout=0.5)
+
+    start = time.time()
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(scenario())
+
+    assert time.time() - start < 5
+    status = async_manager.get_agent_status(agent_id)
+    assert status["status"] == "timeout"
+    assert "Timed out" in status["error"]
+
+
+def test_cancellation_kills_child(async_manager, tmp_path):
+    """Test that cancelling a run kills its child process."""
+    pid_file = tmp_path / "pid"
+    agent_id = async_manager.manager.create_agent(
+        "import os, sys, time\n"
+        "open(sys.argv[1], 'w').write(str(os.getpid()))\n"
+        "time.sleep(30)\n"
+    )
+
+    async def scenario():
+        task = asyncio.ensure_future(async_manager.arun_agent_subprocess(agent_id, pid_file))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+    assert async_manager.get_agent_status(agent_id)["status"] == "error"
+
+
+def test_cancelled_while_waiting_is_not_left_running(async_manager):
+    """Test that a run cancelled before it gets a concurrency slot never becomes running."""
+    manager = AsyncAgentManager(async_manager.manager, max_concurrency=1)
+    busy = manager.manager.create_agent(SLEEP_AGENT)
+    waiting = manager.manager.create_agent(SLEEP_AGENT)
+
+    async def scenario():
+        holder = asyncio.ensure_future(manager.arun_agent_subprocess(busy, 0.5))
+        await asyncio.sleep(0.1)
+        task = asyncio.ensure_future(manager.arun_agent_subprocess(waiting, 0.5))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await holder
+
+    asyncio.run(scenario())
+    assert manager.get_agent_status(waiting)["status"] != "running"
+    assert manager.get_agent_status(busy)["status"] == "completed"
+
+
+def test_launch_failure_marks_agent(async_manager, monkeypatch):
+    """Test that an agent whose child cannot be started is marked as failed."""
+    agent_id = async_manager.manager.create_agent(SLEEP_AGENT)
+
+    async def fail(*args, **kwargs):
+        raise FileNotFoundError("python")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fail)
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(async_manager.arun_agent_subprocess(agent_id, 0))
+    assert async_manager.get_agent_status(agent_id)["status"] == "error"
+
+
+@pytest.mark.parametrize("agent_config", [{"subprocess_backend": "pool", "subprocess_pool_size": 2}],
+                         indirect=True)
+def test_subprocess_runs_use_pool_backend(async_manager):
+    """Test that async subprocess runs go through the configured worker pool and are counted."""
+    agent_id = async_manager.manager.create_agent(SLEEP_AGENT)
+
+    result = asyncio.run(async_manager.arun_agent_subprocess(agent_id, 0))
+
+    assert result.stdout == "slept\n"
+    assert sum(worker.runs for worker in async_manager.manager.subprocess_pool._workers) == 1
+    assert async_manager.get_agent_status(agent_id)["status"] == "completed"
+    assert async_manager.manager.get_metrics()["agent_runs_total"]["mode=subprocess,status=completed"] == 1
+
+
+def test_manager_usable_from_several_loops(async_manager):
+    """Test that the concurrency limit is not bound to the first event loop."""
+    agent_id = async_manager.manager.create_agent(SLEEP_AGENT)
+
+    for _ in range(2):
+        assert asyncio.run(async_manager.arun_agent_subprocess(agent_id, 0)).stdout == "slept\n"
@@ -0,0 +1,43 @@
+"""
+Test cases for the benchmark harness.
+"""
+import os
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks import suite
+from benchmarks.harness import compare, load_results, measure, save_results
+
+
+def test_measure_reports_latency():
+    """Test that measure summarizes every timed call."""
+    calls = []
+    result = measure(calls.append, 10, warmup=2)
+    assert len(calls) == 12
+    assert result["iterations"] == 10
+    assert result["ops_per_sec"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["max_ms"]
+
+
+def test_compare_flags_regressions():
+    """Test that only slowdowns beyond the threshold are regressions."""
+    baseline = {"a": {"ops_per_sec": 100.0}, "b": {"ops_per_sec": 100.0}, "gone": {"ops_per_sec": 1.0}}
+    current = {"a": {"ops_per_sec": 85.0}, "b": {"ops_per_sec": 70.0}, "new": {"ops_per_sec": 1.0}}
+    rows = {row["name"]: row for row in compare(current, baseline, threshold=0.2)}
+    assert set(rows) == {"a", "b"}
+    assert not rows["a"]["regression"]
+    assert rows["b"]["regression"]
+
+
+def test_suite_round_trip(tmp_path):
+    """Test a quick run, saving it and comparing against it."""
+    output = str(tmp_path / "results.json")
+    assert suite.main(["--quick", "--only", "agent_messaging,database_agent", "--output", output]) == 0
+    results = load_results(output)
+    assert "agent_messaging.tell_wait_round_trip" in results
+
+    slow = {name: dict(result, ops_per_sec=result["ops_per_sec"] * 100) for name, result in results.items()}
+    baseline = str(tmp_path / "baseline.json")
+    save_results(baseline, slow)
+    assert suite.main(["--quick", "--only", "database_agent", "--compare", baseline]) == 1
@@ -0,0 +1,71 @@
+"""
+Test cases for the compiled code cache used by the Agent Manager.
+"""
+import os
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from code_cache import CodeCache
+
+
+def test_repeated_runs_hit_cache(agent_manager):
+    """Test that repeated runs reuse the compiled code object."""
+    agent_code = """
+def main(*args, **kwargs):
+    return "cached"
+"""
+    agent_id = agent_manager.create_agent(agent_code)
+
+    for _ in range(3):
+        assert agent_manager.run_agent(agent_id) == "cached"
+
+    stats = agent_manager.get_code_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_changed_source_is_recompiled(agent_manager):
+    """Test that a modified agent file is not served from the cache."""
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    assert agent_manager.run_agent(agent_id) == 1
+
+    file_path = agent_manager.active_agents[agent_id]["file_path"]
+    with open(file_path, "w") as f:
+        f.write("def main():\n    return 22\n")
+
+    assert agent_manager.run_agent(agent_id) == 22
+    assert agent_manager.get_code_cache_stats()["misses"] == 2
+
+
+def test_cleanup_drops_cache_entry(agent_manager):
+    """Test that cleaning up an agent drops its cached code."""
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    agent_manager.run_agent(agent_id)
+    assert agent_manager.get_code_cache_stats()["entries"] == 1
+
+    agent_manager.cleanup_agent(agent_id)
+    assert agent_manager.get_code_cache_stats()["entries"] == 0
+
+
+def test_lru_eviction():
+    """Test that the cache evicts least recently used entries."""
+    cache = CodeCache(max_entries=2)
+    cache.store("a", 1, "code_a")
+    cache.store("b", 1, "code_b")
+    cache.lookup("a", 1)
+    cache.store("c", 1, "code_c")
+
+    assert cache.lookup("b", 1) is None
+    assert cache.lookup("a", 1) == "code_a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cap_eviction():
+    """Test that the byte cap evicts entries."""
+    cache = CodeCache(max_entries=10, max_bytes=100)
+    cache.store("a", 1, "code_a", size=60)
+    cache.store("b", 1, "code_b", size=60)
+
+    assert cache.lookup("a", 1) is None
+    assert cache.stats()["bytes"] == 60
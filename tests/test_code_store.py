@@ -0,0 +1,110 @@
+"""
+Test cases for the content-addressed agent code store.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from code_store import CodeStore, code_digest
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Deduplicate agent code."""
+    agent_config['dedupe_agent_code'] = True
+    return agent_config
+
+
+AGENT_CODE = """
+import sys
+
+def main(*args, **kwargs):
+    return "Hello from shared code"
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+
+def test_store_refcounts(tmp_path):
+    """Test that an object lives until its last reference is released."""
+    store = CodeStore(str(tmp_path))
+    digest, path = store.acquire(AGENT_CODE)
+    assert digest == code_digest(AGENT_CODE)
+    assert store.acquire(AGENT_CODE) == (digest, path)
+    assert store.refcount(digest) == 2
+    assert store.stats() == {"objects": 1, "references": 2}
+
+    assert store.release(digest) is False
+    assert os.path.exists(path)
+    assert store.release(digest) is True
+    assert not os.path.exists(path)
+    assert store.refcount(digest) == 0
+
+
+def test_identical_agents_share_one_file(agent_manager):
+    """Test that agents with identical code share a single file."""
+    first = agent_manager.create_agent(AGENT_CODE)
+    second = agent_manager.create_agent(AGENT_CODE)
+    other = agent_manager.create_agent(AGENT_CODE.replace("shared", "other"))
+
+    first_path = agent_manager.active_agents[first]["file_path"]
+    assert agent_manager.active_agents[second]["file_path"] == first_path
+    assert agent_manager.active_agents[other]["file_path"] != first_path
+    assert len(os.listdir(agent_manager.code_store.root)) == 2
+    assert agent_manager.get_agent_status(first)["code_refs"] == 2
+
+    assert agent_manager.run_agent(first) == "Hello from shared code"
+    assert agent_manager.run_agent(second) == "Hello from shared code"
+    # The compiled object is shared too
+    assert agent_manager.get_code_cache_stats()["entries"] == 1
+
+    result = agent_manager.run_agent_subprocess(second)
+    assert result.stdout.strip() == "Hello from shared code"
+
+
+def test_shared_file_removed_with_last_agent(agent_manager):
+    """Test that the shared file outlives all but the last referencing agent."""
+    first = agent_manager.create_agent(AGENT_CODE)
+    second = agent_manager.create_agent(AGENT_CODE)
+    file_path = agent_manager.active_agents[first]["file_path"]
+
+    assert agent_manager.cleanup_agent(first)
+    assert os.path.exists(file_path)
+    assert agent_manager.run_agent(second) == "Hello from shared code"
+
+    assert agent_manager.cleanup_agent(second)
+    assert not os.path.exists(file_path)
+
+
+def test_memory_agents_spill_to_shared_object(agent_manager):
+    """Test that in-memory agents spill into the shared store."""
+    first = agent_manager.create_agent(AGENT_CODE, storage="memory")
+    second = agent_manager.create_agent(AGENT_CODE, storage="memory")
+
+    agent_manager.run_agent_subprocess(first)
+    agent_manager.run_agent_subprocess(first)
+    agent_manager.run_agent_subprocess(second)
+    file_path = agent_manager.active_agents[first]["file_path"]
+    assert agent_manager.active_agents[second]["file_path"] == file_path
+    assert agent_manager.get_agent_status(first)["code_refs"] == 2
+
+    agent_manager.cleanup_agent(first)
+    agent_manager.cleanup_agent(second)
+    assert not os.path.exists(file_path)
+
+
+def test_recreated_agent_releases_old_object(agent_manager):
+    """Test that replacing an agent by name releases its old code reference."""
+    agent_manager.create_agent(AGENT_CODE, agent_name="named")
+    old_path = agent_manager.active_agents["named"]["file_path"]
+
+    agent_manager.create_agent("def main():\n    return 'v2'\n", agent_name="named")
+    assert not os.path.exists(old_path)
+    assert agent_manager.code_store.stats() == {"objects": 1, "references": 1}
+    assert agent_manager.run_agent("named") == "v2"
+
+    agent_manager.cleanup_agent("named")
+    assert agent_manager.code_store.stats() == {"objects": 0, "references": 0}
@@ -0,0 +1,143 @@
+"""
+Test cases for the heap-based expiry scheduler and automatic agent expiry.
+"""
+import os
+import pytest
+import sys
+import threading
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from expiry_scheduler import ExpiryScheduler
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Use a short inactivity timeout."""
+    agent_config['inactive_timeout'] = 1
+    return agent_config
+
+
+def _collecting_scheduler():
+    fired = []
+    event = threading.Event()
+
+    def callback(key, kind):
+        fired.append((key, kind, time.time()))
+        event.set()
+
+    scheduler = ExpiryScheduler(callback)
+    scheduler.start()
+    return scheduler, fired, event
+
+
+def test_deadlines_fire_in_order():
+    """Test that deadlines fire in deadline order, not insertion order."""
+    scheduler, fired, _ = _collecting_scheduler()
+    now = time.time()
+    scheduler.schedule("late", now + 0.3)
+    scheduler.schedule("early", now + 0.1)
+
+    time.sleep(0.6)
+    scheduler.cancel()
+    assert [key for key, _, _ in fired] == ["early", "late"]
+
+
+def test_reschedule_replaces_deadline():
+    """Test that re-arming a key supersedes its previous deadline."""
+    scheduler, fired, _ = _collecting_scheduler()
+    scheduler.schedule("agent", time.time() + 0.1)
+    scheduler.schedule("agent", time.time() + 0.4)
+
+    time.sleep(0.25)
+    assert fired == []
+    time.sleep(0.4)
+    scheduler.cancel()
+    assert len(fired) == 1
+
+
+def test_unschedule_disarms_key():
+    """Test that an unscheduled key never fires."""
+    scheduler, fired, _ = _collecting_scheduler()
+    scheduler.schedule("agent", time.time() + 0.1)
+    scheduler.schedule("agent", time.time() + 0.1, kind="cleanup")
+    scheduler.unschedule("agent")
+
+    time.sleep(0.3)
+    scheduler.cancel()
+    assert fired == []
+    assert len(scheduler) == 0
+
+
+def test_heap_is_compacted():
+    """Test that stale entries do not accumulate without bound."""
+    scheduler = ExpiryScheduler(lambda key, kind: None)
+    deadline = time.time() + 60
+    for i in range(5000):
+        scheduler.schedule("agent", deadline + i)
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 1025
+
+
+def test_inactive_agent_expires_automatically(agent_manager):
+    """Test that the reaper removes an idle agent without an explicit sweep."""
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    file_path = agent_manager.active_agents[agent_id]["file_path"]
+
+    time.sleep(1.5)
+
+    assert agent_id not in agent_manager.active_agents
+    assert not os.path.exists(file_path)
+
+
+def test_running_agent_extends_deadline(agent_manager):
+    """Test that running an agent pushes its expiry back."""
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+
+    for _ in range(4):
+        time.sleep(0.4)
+        agent_manager.run_agent(agent_id)
+        assert agent_id in agent_manager.active_agents
+
+    time.sleep(1.5)
+    assert agent_id not in agent_manager.active_agents
+
+
+def test_delayed_cleanup_uses_scheduler(agent_manager):
+    """Test that delayed cleanup goes through the reaper instead of a Timer thread."""
+    agent_manager.config['inactive_timeout'] = 60
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+    threads_before = threading.active_count()
+
+    assert agent_manager.cleanup_agent(agent_id, delay_seconds=0.3) is True
+    assert threading.active_count() == threads_before
+    assert agent_id in agent_manager.active_agents
+
+    time.sleep(0.6)
+    assert agent_id not in agent_manager.active_agents
+
+
+def test_lowered_timeout_rearms_deadlines(agent_manager):
+    """Test that lowering the inactive timeout moves existing deadlines earlier."""
+    agent_manager.set_inactive_timeout(60)
+    agent_id = agent_manager.create_agent("def main():\n    return 1\n")
+
+    agent_manager.set_inactive_timeout(0.3)
+
+    time.sleep(1)
+    assert agent_id not in agent_manager.active_agents
+
+
+def test_direct_timeout_edit_rearms_deadlines(agent_manager):
+    """Test that a timeout edited in the config is applied to agents armed before the edit."""
+    agent_manager.config['inactive_timeout'] = 60
+    first_id = agent_manager.create_agent("def main():\n    return 1\n")
+
+    agent_manager.config['inactive_timeout'] = 0.3
+    second_id = agent_manager.create_agent("def main():\n    return 1\n")
+
+    time.sleep(1)
+    assert first_id not in agent_manager.active_agents
+    assert second_id not in agent_manager.active_agents
@@ -0,0 +1,109 @@
+"""
+Test cases for the fork-server subprocess backend.
+"""
+import os
+import pytest
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Fork subprocess runs from a fork server."""
+    agent_config['subprocess_backend'] = 'forkserver'
+    agent_config['forkserver_preload'] = ['json', 'decimal']
+    return agent_config
+
+
+ECHO_AGENT = """
+import sys
+
+def main(*args):
+    print(f"Arguments received: {args}")
+    print("to stderr", file=sys.stderr)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
+"""
+
+PRELOAD_AGENT = """
+import sys
+print("decimal" in sys.modules)
+"""
+
+
+def test_fork_server_execution(agent_manager):
+    """Test that forked runs capture output like a fresh subprocess."""
+    agent_id = agent_manager.create_agent(ECHO_AGENT)
+
+    result = agent_manager.run_agent_subprocess(agent_id, "arg1", 2)
+
+    assert result.returncode == 0
+    assert "Arguments received: ('arg1', '2')" in result.stdout
+    assert result.stderr.strip() == "to stderr"
+    assert result.args[1:] == [agent_manager.active_agents[agent_id]["file_path"], "arg1", "2"]
+    assert agent_manager.active_agents[agent_id]["status"] == "completed"
+
+
+def test_preloaded_modules_are_resident(agent_manager):
+    """Test that forked agents start with the preloaded modules imported."""
+    agent_id = agent_manager.create_agent(PRELOAD_AGENT)
+    assert agent_manager.run_agent_subprocess(agent_id).stdout.strip() == "True"
+
+
+def test_fork_server_exit_codes(agent_manager):
+    """Test exit codes, uncaught exceptions and signals."""
+    exit_id = agent_manager.create_agent("import sys\nsys.exit(3)\n")
+    raise_id = agent_manager.create_agent("raise RuntimeError('boom')\n")
+    crash_id = agent_manager.create_agent("import os\nos._exit(7)\n")
+
+    assert agent_manager.run_agent_subprocess(exit_id).returncode == 3
+    assert agent_manager.run_agent_subprocess(crash_id).returncode == 7
+    result = agent_manager.run_agent_subprocess(raise_id)
+    assert result.returncode == 1
+    assert "RuntimeError: boom" in result.stderr
+    assert agent_manager.active_agents[raise_id]["status"] == "error"
+
+
+def test_fork_server_concurrent_runs(agent_manager):
+    """Test that runs from several threads are served concurrently."""
+    agent_ids = [agent_manager.create_agent("import time\ntime.sleep(0.3)\nprint('done')\n") for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(agent_manager.run_agent_subprocess, agent_ids))
+    assert [result.stdout.strip() for result in results] == ["done"] * 4
+
+
+def test_fork_server_timeout(agent_manager):
+    """Test that a run past its timeout is killed and the server keeps serving."""
+    slow_id = agent_manager.create_agent("import time\ntime.sleep(30)\n", limits={"timeout": 0.5})
+    with pytest.raises(subprocess.TimeoutExpired):
+        agent_manager.run_agent_subprocess(slow_id)
+    assert agent_manager.active_agents[slow_id]["status"] == "timeout"
+
+    echo_id = agent_manager.create_agent(ECHO_AGENT)
+    assert agent_manager.run_agent_subprocess(echo_id).returncode == 0
+
+
+def test_fork_server_restarts(agent_manager):
+    """Test that a dead fork server is restarted on the next run."""
+    echo_id = agent_manager.create_agent(ECHO_AGENT)
+    agent_manager.fork_server.process.kill()
+    agent_manager.fork_server.process.wait()
+
+    assert agent_manager.run_agent_subprocess(echo_id).returncode == 0
+    assert agent_manager.fork_server.restarts == 1
+
+
+def test_fork_server_applies_memory_limit(agent_manager):
+    """Test that rlimits are applied in the forked child."""
+    hog_id = agent_manager.create_agent("data = bytearray(1024 * 1024 * 1024)\n",
+                                        limits={"memory_bytes": 512 * 1024 * 1024})
+    result = agent_manager.run_agent_subprocess(hog_id)
+    assert result.returncode != 0
+    assert agent_manager.active_agents[hog_id]["status"] == "oom"
@@ -0,0 +1,90 @@
+"""
+Test cases for diskless in-memory agents.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Keep agent code in memory."""
+    agent_config['agent_storage'] = 'memory'
+    return agent_config
+
+
+AGENT_CODE = """
+import sys
+
+def main(*args, **kwargs):
+    return "Hello from memory"
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+
+def test_memory_agent_writes_no_file(agent_manager):
+    """Test that in-memory agents run without touching agents_dir."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+
+    assert agent_manager.run_agent(agent_id) == "Hello from memory"
+    assert os.listdir(agent_manager.agents_dir) == []
+
+    status = agent_manager.get_agent_status(agent_id)
+    assert status["storage"] == "memory"
+    assert status["exists"] is True
+    assert status["spilled"] is False
+    assert "source" not in status
+
+
+def test_memory_agent_spills_for_subprocess(agent_manager):
+    """Test that a subprocess run spills the agent and cleanup removes the spill file."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+
+    result = agent_manager.run_agent_subprocess(agent_id)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "Hello from memory"
+
+    status = agent_manager.get_agent_status(agent_id)
+    assert status["spilled"] is True
+    assert os.path.exists(status["file_path"])
+
+    agent_manager.cleanup_agent(agent_id)
+    assert not os.path.exists(status["file_path"])
+
+
+def test_storage_can_be_chosen_per_agent(agent_manager):
+    """Test overriding the configured storage backend for one agent."""
+    agent_id = agent_manager.create_agent(AGENT_CODE, storage="disk")
+
+    status = agent_manager.get_agent_status(agent_id)
+    assert status["storage"] == "disk"
+    assert os.path.exists(status["file_path"])
+
+    with pytest.raises(ValueError):
+        agent_manager.create_agent(AGENT_CODE, storage="tape")
+
+
+def test_memory_agent_in_process_pool(agent_manager):
+    """Test that in-memory agents work with run_many's process executor."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+
+    results = list(agent_manager.run_many([agent_id, agent_id], executor="process"))
+
+    assert [r["result"] for r in results] == ["Hello from memory"] * 2
+    assert os.listdir(agent_manager.agents_dir) == []
+
+
+def test_spill_dir_is_per_manager(agent_manager, tmp_path):
+    """Test that a configured spill_dir gets a subdirectory per manager."""
+    agent_manager.config['spill_dir'] = str(tmp_path)
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+
+    assert agent_manager.run_agent_subprocess(agent_id).returncode == 0
+
+    file_path = agent_manager.get_agent_status(agent_id)["file_path"]
+    assert os.path.dirname(file_path) == os.path.join(str(tmp_path), agent_manager.manager_id)
@@ -0,0 +1,89 @@
+"""
+Test cases for the agent manager metrics.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from metrics import MetricsRegistry
+
+
+AGENT_CODE = """
+import sys
+
+def main(*args, **kwargs):
+    return "ok"
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+FAILING_CODE = """
+def main(*args, **kwargs):
+    raise RuntimeError("boom")
+"""
+
+
+def test_counter_and_histogram():
+    """Test basic recording and Prometheus rendering."""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ("kind",))
+    histogram = registry.histogram("job_seconds", "Job latency", buckets=(0.1, 1.0))
+    counter.inc("a")
+    counter.inc("a", amount=2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert counter.value("a") == 3
+    assert histogram.count() == 3
+    text = registry.render_prometheus()
+    assert '# TYPE jobs_total counter' in text
+    assert 'jobs_total{kind="a"} 3' in text
+    assert 'job_seconds_bucket{le="0.1"} 1' in text
+    assert 'job_seconds_bucket{le="1.0"} 2' in text
+    assert 'job_seconds_bucket{le="+Inf"} 3' in text
+    assert 'job_seconds_count 3' in text
+
+
+def test_disabled_registry_records_nothing():
+    """Test that a disabled registry ignores updates."""
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter("jobs_total", "Jobs")
+    counter.inc()
+    assert counter.value() == 0
+
+
+def test_duplicate_metric_rejected():
+    """Test that metric names are unique."""
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs")
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Jobs")
+
+
+def test_manager_records_metrics(agent_manager):
+    """Test that create, run, status and cleanup are counted."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+    failing_id = agent_manager.create_agent(FAILING_CODE, storage="memory")
+    agent_manager.run_agent(agent_id)
+    agent_manager.run_agent_subprocess(agent_id)
+    with pytest.raises(RuntimeError):
+        agent_manager.run_agent(failing_id)
+    agent_manager.get_agent_status(agent_id)
+    agent_manager.cleanup_agent(agent_id)
+
+    metrics = agent_manager.get_metrics()
+    assert metrics["agent_creates_total"] == {"storage=disk": 1, "storage=memory": 1}
+    assert metrics["agent_runs_total"]["mode=inprocess,status=completed"] == 1
+    assert metrics["agent_runs_total"]["mode=inprocess,status=error"] == 1
+    assert metrics["agent_runs_total"]["mode=subprocess,status=completed"] == 1
+    assert metrics["agent_run_seconds"]["mode=inprocess"]["count"] == 2
+    assert metrics["agent_status_lookups_total"] == {"": 1}
+    assert metrics["agent_cleanups_total"] == {"reason=explicit": 1}
+    assert metrics["agents_active"] == {"": 1}
+
+    text = agent_manager.metrics.render_prometheus()
+    assert 'agent_runs_total{mode="subprocess",status="completed"} 1' in text
@@ -0,0 +1,90 @@
+"""
+Test cases for streaming agent subprocess output.
+"""
+import os
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from output_stream import RingBuffer
+
+
+CHATTY_AGENT = """
+import sys
+
+if __name__ == "__main__":
+    lines = int(sys.argv[1])
+    for i in range(lines):
+        print(f"line {i:08d} " + "x" * 100)
+    print("last words", file=sys.stderr)
+    sys.exit(int(sys.argv[2]))
+"""
+
+
+def test_ring_buffer_keeps_tail():
+    """Test that the ring buffer keeps only the last max_bytes."""
+    buffer = RingBuffer(10)
+    buffer.write(b"0123456")
+    buffer.write(b"789abc")
+    assert buffer.getvalue() == b"3456789abc"
+
+    buffer.write(b"ABCDEFGHIJKLMNOP")
+    assert buffer.getvalue() == b"GHIJKLMNOP"
+    assert buffer.total_bytes == 29
+
+
+def test_stream_yields_output(agent_manager):
+    """Test that output is streamed and the run is recorded on exit."""
+    agent_id = agent_manager.create_agent(CHATTY_AGENT)
+
+    run = agent_manager.run_agent_subprocess_stream(agent_id, 100, 0)
+    chunks = list(run)
+
+    stdout = "".join(text for name, text in chunks if name == "stdout")
+    assert stdout.count("\n") == 100
+    assert run.returncode == 0
+    assert agent_manager.active_agents[agent_id]["status"] == "completed"
+
+
+def test_stream_bounds_memory_and_spools(agent_manager, tmp_path):
+    """Test that only the tail is kept in memory while the spool gets everything."""
+    agent_id = agent_manager.create_agent(CHATTY_AGENT)
+    spool_path = str(tmp_path / "agent.log")
+
+    run = agent_manager.run_agent_subprocess_stream(agent_id, 20000, 3, tail_bytes=1024,
+                                                    spool_path=spool_path)
+    assert run.wait() == 3
+
+    assert run.total_bytes > 2 * 1024 * 1024
+    assert len(run.stdout_tail) == 1024
+    assert run.stdout_tail.endswith("x\n")
+    assert os.path.getsize(spool_path) == run.total_bytes
+
+    status = agent_manager.get_agent_status(agent_id)
+    assert status["status"] == "error"
+    assert status["error"].strip() == "last words"
+
+
+def test_stream_kill(agent_manager):
+    """Test that leaving the context kills a still-running agent."""
+    agent_id = agent_manager.create_agent("import time\ntime.sleep(30)\n")
+
+    with agent_manager.run_agent_subprocess_stream(agent_id) as run:
+        pass
+
+    assert run.returncode != 0
+    assert agent_manager.active_agents[agent_id]["status"] == "error"
+
+
+def test_stream_stopped_early(agent_manager):
+    """Test that breaking out of the stream kills the agent and records the run."""
+    agent_id = agent_manager.create_agent(CHATTY_AGENT)
+
+    run = agent_manager.run_agent_subprocess_stream(agent_id, 10 ** 6, 0)
+    for name, text in run:
+        break
+
+    assert run.process.poll() is not None
+    assert run.returncode != 0
+    assert agent_manager.active_agents[agent_id]["status"] == "error"
+    assert agent_manager.get_metrics()["agent_runs_total"]["mode=stream,status=error"] == 1
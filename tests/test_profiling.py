@@ -0,0 +1,92 @@
+"""
+Test cases for opt-in agent profiling.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from profiling import ProfileCapture, should_profile
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Profile CPU time and memory."""
+    agent_config['profile_modes'] = ['cpu', 'memory']
+    return agent_config
+
+
+AGENT_CODE = """
+import sys
+
+def build_table(n):
+    return [str(i) * 10 for i in range(n)]
+
+def main(*args, **kwargs):
+    table = build_table(20000)
+    return len(table)
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+
+def test_should_profile():
+    """Test that the agent setting wins over sampling."""
+    assert should_profile(True, 0.0)
+    assert not should_profile(False, 1.0)
+    assert should_profile(None, 1.0)
+    assert not should_profile(None, 0.0)
+
+
+def test_unknown_mode_rejected():
+    """Test that profiling modes are validated."""
+    with pytest.raises(ValueError):
+        ProfileCapture(["disk"])
+
+
+def test_capture_reports_on_error():
+    """Test that a report is produced even when the profiled code raises."""
+    capture = ProfileCapture(["cpu"])
+    with pytest.raises(RuntimeError):
+        with capture:
+            raise RuntimeError("boom")
+    assert capture.report is not None
+    assert "functions" in capture.report
+
+
+def test_unprofiled_agent_has_no_profile(agent_manager):
+    """Test that profiling is off by default."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+    agent_manager.run_agent(agent_id)
+    assert agent_manager.get_agent_profile(agent_id) is None
+    assert agent_manager.get_agent_status(agent_id)["profiled"] is False
+
+
+def test_in_process_profile(agent_manager):
+    """Test that an opted-in agent gets CPU and allocation profiles."""
+    agent_id = agent_manager.create_agent(AGENT_CODE, profile=True)
+    assert agent_manager.run_agent(agent_id) == 20000
+
+    profile = agent_manager.get_agent_profile(agent_id)
+    assert profile["mode"] == "inprocess"
+    assert "build_table" in [row["function"] for row in profile["functions"]]
+    assert profile["allocations"]
+    assert profile["allocations"][0]["size_bytes"] > 0
+    assert agent_manager.get_agent_status(agent_id)["profiled"] is True
+
+
+def test_subprocess_profile(agent_manager):
+    """Test that subprocess runs are profiled by the bootstrap script."""
+    agent_id = agent_manager.create_agent(AGENT_CODE)
+    assert agent_manager.set_agent_profiling(agent_id, True)
+
+    result = agent_manager.run_agent_subprocess(agent_id)
+    assert result.returncode == 0
+    assert result.stdout.strip() == "20000"
+
+    profile = agent_manager.get_agent_profile(agent_id)
+    assert profile["mode"] == "subprocess"
+    assert "build_table" in [row["function"] for row in profile["functions"]]
+    assert "allocations" in profile
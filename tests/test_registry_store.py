@@ -0,0 +1,122 @@
+"""
+Test cases for the persistent agent registry.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_manager import AgentManager
+from config import DEFAULT_CONFIG
+from registry_store import RegistryStore
+
+AGENT_CODE = """
+import sys
+
+def main(*args, **kwargs):
+    return "Hello again"
+
+if __name__ == "__main__":
+    print(main(*sys.argv[1:]))
+"""
+
+
+def load_records(path):
+    """Read the records of a registry database, closing it afterwards."""
+    store = RegistryStore(path)
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+
+@pytest.fixture
+def test_config(tmp_path):
+    """Create a config with a registry database in a fresh agents directory."""
+    test_dir = str(tmp_path)
+    config = DEFAULT_CONFIG.copy()
+    config['inactive_timeout'] = 60  # Extend timeout for testing
+    config['registry_path'] = os.path.join(test_dir, "registry.db")
+    return test_dir, config
+
+
+def test_store_round_trip(tmp_path):
+    """Test that records are written, coalesced and deleted."""
+    store = RegistryStore(str(tmp_path / "registry.db"))
+    store.record_changed("a", {"file_path": "/tmp/a.py", "status": "created", "last_active": 1.0,
+                               "limits": {"timeout": 5}, "profile": True})
+    store.record_changed("a", {"file_path": "/tmp/a.py", "status": "completed", "last_active": 2.0})
+    store.record_changed("b", {"status": "created", "last_active": 1.0})
+    store.record_changed("b", None)
+    store.close()
+
+    records = load_records(str(tmp_path / "registry.db"))
+    assert list(records) == ["a"]
+    assert records["a"]["status"] == "completed"
+    assert records["a"]["last_active"] == 2.0
+    assert records["a"]["limits"] is None
+
+
+def test_manager_resumes_agents(test_config):
+    """Test that a restarted manager keeps agents, status and deadlines."""
+    test_dir, config = test_config
+    manager = AgentManager(agents_dir=test_dir, config=config.copy())
+    disk_id = manager.create_agent(AGENT_CODE, limits={"timeout": 30})
+    memory_id = manager.create_agent(AGENT_CODE, storage="memory")
+    manager.run_agent(disk_id)
+    manager.close()
+
+    restarted = AgentManager(agents_dir=test_dir, config=config.copy())
+    try:
+        assert set(restarted.active_agents.keys()) == {disk_id, memory_id}
+        status = restarted.get_agent_status(disk_id)
+        assert status["status"] == "completed"
+        assert status["exists"]
+        assert status["limits"] == {"timeout": 30}
+        assert restarted.expiry_scheduler.deadline(disk_id) == pytest.approx(status["last_active"] + 60)
+
+        assert restarted.run_agent(disk_id) == "Hello again"
+        assert restarted.run_agent(memory_id) == "Hello again"
+    finally:
+        restarted.__exit__(None, None, None)
+
+    # Cleaned-up agents are gone from the persistent registry too
+    assert load_records(config['registry_path']) == {}
+
+
+def test_interrupted_run_marked_as_error(test_config):
+    """Test that agents running when the manager died come back as errors."""
+    test_dir, config = test_config
+    manager = AgentManager(agents_dir=test_dir, config=config.copy())
+    agent_id = manager.create_agent(AGENT_CODE)
+    manager.active_agents.transition(agent_id, "running")
+    manager.close()
+
+    restarted = AgentManager(agents_dir=test_dir, config=config.copy())
+    try:
+        status = restarted.get_agent_status(agent_id)
+        assert status["status"] == "error"
+        assert "restart" in status["error"]
+    finally:
+        restarted.__exit__(None, None, None)
+
+
+def test_shared_code_refcounts_recovered(test_config):
+    """Test that deduplicated code objects stay reference-counted after a restart."""
+    test_dir, config = test_config
+    config['dedupe_agent_code'] = True
+    manager = AgentManager(agents_dir=test_dir, config=config.copy())
+    first = manager.create_agent(AGENT_CODE)
+    second = manager.create_agent(AGENT_CODE)
+    file_path = manager.active_agents[first]["file_path"]
+    manager.close()
+
+    restarted = AgentManager(agents_dir=test_dir, config=config.copy())
+    try:
+        restarted.cleanup_agent(first)
+        assert os.path.exists(file_path)
+        restarted.cleanup_agent(second)
+        assert not os.path.exists(file_path)
+    finally:
+        restarted.__exit__(None, None, None)
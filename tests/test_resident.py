@@ -0,0 +1,133 @@
+"""
+Test cases for resident agents (module loaded once, main called many times).
+"""
+import os
+import pytest
+import sys
+import types
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resident import ResidentModules, estimate_size
+
+# Module-level state survives between runs only if the module is kept
+STATEFUL_AGENT = """
+loads = 0
+calls = 0
+loads += 1
+
+def main(*args):
+    global calls
+    calls += 1
+    return (loads, calls)
+"""
+
+
+@pytest.mark.parametrize("storage", ["disk", "memory"])
+def test_resident_agent_keeps_state(agent_manager, storage):
+    """Test that a resident agent's module is executed once across runs."""
+    agent_id = agent_manager.create_agent(STATEFUL_AGENT, storage=storage, resident=True)
+    assert agent_manager.run_agent(agent_id) == (1, 1)
+    assert agent_manager.run_agent(agent_id) == (1, 2)
+    assert agent_manager.run_agent(agent_id) == (1, 3)
+
+    status = agent_manager.get_agent_status(agent_id)
+    assert status["resident"] is True
+    assert status["resident_bytes"] > 0
+    agent_manager.cleanup_agent(agent_id)
+    assert agent_manager.get_resident_stats()["modules"] == 0
+
+
+def test_non_resident_agent_reexecutes(agent_manager):
+    """Test that agents are still executed from scratch by default."""
+    agent_id = agent_manager.create_agent(STATEFUL_AGENT)
+    assert agent_manager.run_agent(agent_id) == (1, 1)
+    assert agent_manager.run_agent(agent_id) == (1, 1)
+    assert "resident_bytes" not in agent_manager.get_agent_status(agent_id)
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("storage", ["disk", "memory"])
+def test_reload_agent_with_new_code(agent_manager, storage):
+    """Test that reload_agent swaps the code and resets the module state."""
+    agent_id = agent_manager.create_agent(STATEFUL_AGENT, storage=storage, resident=True)
+    agent_manager.run_agent(agent_id)
+    agent_manager.run_agent(agent_id)
+
+    assert agent_manager.reload_agent(agent_id) is True
+    assert agent_manager.run_agent(agent_id) == (1, 1)
+
+    agent_manager.reload_agent(agent_id, "def main():\n    return 'v2'\n")
+    assert agent_manager.run_agent(agent_id) == "v2"
+    # Subprocess runs see the new code too
+    agent_manager.reload_agent(agent_id, "print('v3')\n")
+    assert agent_manager.run_agent_subprocess(agent_id).stdout.strip() == "v3"
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("storage", ["disk", "memory"])
+def test_recreating_agent_replaces_resident_module(agent_manager, storage):
+    """Test that creating an agent under an existing name drops the old resident module."""
+    agent_id = agent_manager.create_agent("def main():\n    return 'v1'\n", agent_name="named",
+                                          storage=storage, resident=True)
+    assert agent_manager.run_agent(agent_id) == "v1"
+
+    assert agent_manager.create_agent("def main():\n    return 'v2'\n", agent_name="named",
+                                      storage=storage, resident=True) == agent_id
+    assert agent_manager.run_agent(agent_id) == "v2"
+    assert agent_manager.get_resident_stats()["modules"] == 1
+    agent_manager.cleanup_agent(agent_id)
+
+
+@pytest.mark.parametrize("agent_config", [{"dedupe_agent_code": True}], indirect=True)
+def test_reload_agent_with_shared_code(agent_manager):
+    """Test that reloading a deduplicated agent moves its code reference."""
+    first = agent_manager.create_agent(STATEFUL_AGENT)
+    second = agent_manager.create_agent(STATEFUL_AGENT)
+    agent_manager.reload_agent(second, "def main():\n    return 'v2'\n")
+    assert agent_manager.get_agent_status(first)["code_refs"] == 1
+    assert agent_manager.get_agent_status(second)["code_refs"] == 1
+    assert agent_manager.run_agent(first) == (1, 1)
+    assert agent_manager.run_agent(second) == "v2"
+
+
+def test_reload_rejects_invalid_code(agent_manager):
+    """Test that invalid replacement code leaves the agent untouched."""
+    agent_id = agent_manager.create_agent(STATEFUL_AGENT, resident=True)
+    agent_manager.run_agent(agent_id)
+    with pytest.raises(ValueError):
+        agent_manager.reload_agent(agent_id, "def main(:\n")
+    assert agent_manager.run_agent(agent_id) == (1, 2)
+    with pytest.raises(ValueError):
+        agent_manager.reload_agent("missing")
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_resident_budget_unloads_least_recently_used():
+    """Test that modules over the memory budget are unloaded, oldest first."""
+    evicted = []
+    slots = ResidentModules(max_bytes=1, on_evict=evicted.append)
+
+    def make(name):
+        module = types.ModuleType(name)
+        module.data = list(range(1000))
+        return module
+
+    first = slots.get_or_load("a", lambda: make("a"))
+    assert slots.get_or_load("a", lambda: make("other")) is first
+    slots.get_or_load("b", lambda: make("b"))
+    assert evicted == ["a"]
+    assert slots.keys() == ["b"]
+    assert slots.stats()["evictions"] == 1
+    assert slots.unload("b") is True
+    assert slots.stats()["bytes"] == 0
+
+
+def test_estimate_size_skips_shared_modules():
+    """Test that imported modules are not counted as the agent's memory."""
+    small = types.ModuleType("small")
+    exec("import json\nvalue = 1", small.__dict__)
+    big = types.ModuleType("big")
+    exec("import json\nvalue = 'x' * 100000", big.__dict__)
+    assert estimate_size(small) < 20000
+    assert estimate_size(big) > 100000
@@ -0,0 +1,131 @@
+"""
+Test cases for agent execution limits and timeouts.
+"""
+import os
+import pytest
+import subprocess
+import sys
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from resource_limits import AgentTimeoutError, resolve_limits
+
+
+SPIN_AGENT = """
+def main(*args, **kwargs):
+    while True:
+        pass
+
+if __name__ == "__main__":
+    main()
+"""
+
+HOG_AGENT = """
+def main(*args, **kwargs):
+    blocks = []
+    while True:
+        blocks.append(bytearray(50 * 1024 * 1024))
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+def test_resolve_limits_merges_overrides():
+    """Test that per-agent limits override the configured defaults."""
+    config = {'agent_timeout': 10, 'agent_cpu_seconds': None, 'agent_memory_bytes': 1024}
+    limits = resolve_limits(config, {'timeout': 2})
+
+    assert limits == {'timeout': 2, 'cpu_seconds': None, 'memory_bytes': 1024}
+    with pytest.raises(ValueError):
+        resolve_limits(config, {'gpu_seconds': 1})
+
+
+def test_subprocess_wall_clock_timeout(agent_manager):
+    """Test that a runaway subprocess is killed and marked as timed out."""
+    agent_id = agent_manager.create_agent(SPIN_AGENT, limits={'timeout': 0.5})
+
+    start = time.time()
+    with pytest.raises(subprocess.TimeoutExpired):
+        agent_manager.run_agent_subprocess(agent_id)
+
+    assert time.time() - start < 5
+    assert agent_manager.active_agents[agent_id]["status"] == "timeout"
+
+
+def test_subprocess_cpu_limit(agent_manager):
+    """Test that the CPU limit stops a spinning subprocess."""
+    agent_id = agent_manager.create_agent(SPIN_AGENT, limits={'cpu_seconds': 1})
+
+    result = agent_manager.run_agent_subprocess(agent_id)
+
+    assert result.returncode != 0
+    assert agent_manager.active_agents[agent_id]["status"] == "timeout"
+
+
+def test_subprocess_memory_limit(agent_manager):
+    """Test that the address-space limit turns runaway allocation into an oom status."""
+    agent_id = agent_manager.create_agent(HOG_AGENT, limits={'memory_bytes': 512 * 1024 * 1024})
+
+    result = agent_manager.run_agent_subprocess(agent_id)
+
+    assert result.returncode != 0
+    assert agent_manager.active_agents[agent_id]["status"] == "oom"
+
+
+def test_in_process_watchdog(agent_manager):
+    """Test that the watchdog interrupts a runaway in-process agent."""
+    agent_manager.config['agent_timeout'] = 0.5
+    agent_id = agent_manager.create_agent(SPIN_AGENT)
+
+    start = time.time()
+    with pytest.raises(AgentTimeoutError):
+        agent_manager.run_agent(agent_id)
+
+    assert time.time() - start < 5
+    # The status is set once the interrupted thread has actually returned
+    deadline = time.time() + 5
+    while agent_manager.active_agents[agent_id]["status"] == "running" and time.time() < deadline:
+        time.sleep(0.01)
+    assert agent_manager.active_agents[agent_id]["status"] == "timeout"
+
+
+def test_in_process_timeout_waits_for_blocked_thread(agent_manager):
+    """Test that an agent blocked in a C call stays running until it returns."""
+    agent_manager.config['agent_timeout'] = 0.2
+    agent_id = agent_manager.create_agent("import time\n\ndef main():\n    time.sleep(1)\n")
+
+    with pytest.raises(AgentTimeoutError):
+        agent_manager.run_agent(agent_id)
+    assert agent_manager.active_agents[agent_id]["status"] == "running"
+
+    time.sleep(1.5)
+    assert agent_manager.active_agents[agent_id]["status"] == "timeout"
+
+
+def test_pool_timeout(agent_manager):
+    """Test that pooled runs honour the timeout and the pool recovers."""
+    agent_manager.config['subprocess_backend'] = 'pool'
+    agent_manager.config['subprocess_pool_size'] = 1
+    spin_id = agent_manager.create_agent(SPIN_AGENT, limits={'timeout': 0.5})
+    ok_id = agent_manager.create_agent("print('ok')\n")
+
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            agent_manager.run_agent_subprocess(spin_id)
+        assert agent_manager.active_agents[spin_id]["status"] == "timeout"
+        assert agent_manager.run_agent_subprocess(ok_id).stdout == "ok\n"
+    finally:
+        agent_manager.subprocess_pool.close()
+
+
+def test_stream_timeout(agent_manager):
+    """Test that streaming runs honour the timeout."""
+    agent_id = agent_manager.create_agent(SPIN_AGENT, limits={'timeout': 0.5})
+
+    run = agent_manager.run_agent_subprocess_stream(agent_id)
+    run.wait()
+
+    assert run.timed_out
+    assert agent_manager.active_agents[agent_id]["status"] == "timeout"
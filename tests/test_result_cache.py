@@ -0,0 +1,124 @@
+"""
+Test cases for the pure agent result cache.
+"""
+import os
+import pytest
+import sys
+import time
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from result_cache import MISSING, ResultCache, result_key
+
+
+# Counts its executions in a module-level global shared across runs
+COUNTING_AGENT = """
+import builtins
+
+def main(x, scale=1):
+    builtins.result_cache_test_calls = getattr(builtins, "result_cache_test_calls", 0) + 1
+    return {"value": x * scale}
+"""
+
+
+@pytest.fixture
+def call_counter():
+    """Reset the execution counter the counting agent increments."""
+    import builtins
+    builtins.result_cache_test_calls = 0
+    yield lambda: builtins.result_cache_test_calls
+    del builtins.result_cache_test_calls
+
+
+def test_pure_agent_results_are_cached(agent_manager, call_counter):
+    """Test that repeated calls with the same arguments run main once."""
+    agent_id = agent_manager.create_agent(COUNTING_AGENT, pure=True)
+
+    assert agent_manager.run_agent(agent_id, 2, scale=3) == {"value": 6}
+    assert agent_manager.run_agent(agent_id, 2, scale=3) == {"value": 6}
+    assert agent_manager.run_agent(agent_id, 2, scale=4) == {"value": 8}
+    assert call_counter() == 2
+
+    stats = agent_manager.get_agent_status(agent_id)["result_cache"]
+    assert stats == {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_cached_results_are_copies(agent_manager, call_counter):
+    """Test that mutating a returned result does not change the cached one."""
+    agent_id = agent_manager.create_agent(COUNTING_AGENT, pure=True)
+    first = agent_manager.run_agent(agent_id, 1)
+    first["value"] = "mutated"
+    assert agent_manager.run_agent(agent_id, 1) == {"value": 1}
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_agents_are_not_cached_by_default(agent_manager, call_counter):
+    """Test that agents not marked pure run every time."""
+    agent_id = agent_manager.create_agent(COUNTING_AGENT)
+    agent_manager.run_agent(agent_id, 1)
+    agent_manager.run_agent(agent_id, 1)
+    assert call_counter() == 2
+    assert "result_cache" not in agent_manager.get_agent_status(agent_id)
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_unpicklable_arguments_bypass_the_cache(agent_manager, call_counter):
+    """Test that runs whose arguments cannot be keyed are executed normally."""
+    agent_id = agent_manager.create_agent(COUNTING_AGENT, pure=True)
+
+    class Local:  # Classes defined in a function cannot be pickled
+        def __mul__(self, other):
+            return other
+
+    assert result_key((Local(),), {}) is None
+    agent_manager.run_agent(agent_id, Local(), scale=2)
+    agent_manager.run_agent(agent_id, Local(), scale=2)
+    assert call_counter() == 2
+    assert agent_manager.get_agent_status(agent_id)["result_cache"]["misses"] == 0
+    agent_manager.cleanup_agent(agent_id)
+
+
+def test_cache_ttl_and_eviction():
+    """Test TTL expiry and LRU eviction under the entry and byte budgets."""
+    cache = ResultCache(max_entries=2, max_bytes=10_000, ttl=0.05)
+    key_a, key_b, key_c = (result_key((n,), {}) for n in "abc")
+    cache.store("code", key_a, 1)
+    cache.store("code", key_b, 2)
+    assert cache.lookup("agent", "code", key_a) == 1
+    cache.store("code", key_c, 3)  # evicts b, the least recently used
+    assert cache.lookup("agent", "code", key_b) is MISSING
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.lookup("agent", "code", key_a) is MISSING
+    assert cache.stats()["expirations"] == 1
+
+    small = ResultCache(max_bytes=200, ttl=None)
+    assert small.store("code", key_a, "x" * 1000) is False
+    assert small.stats()["entries"] == 0
+
+
+def test_results_are_shared_by_code_hash():
+    """Test that results are keyed by code, and can be invalidated per code hash."""
+    cache = ResultCache()
+    key = result_key((1,), {"a": 2})
+    assert key == result_key((1,), {"a": 2})
+    cache.store("code", key, "result")
+    assert cache.lookup("agent_1", "code", key) == "result"
+    assert cache.lookup("agent_2", "other_code", key) is MISSING
+    assert cache.invalidate_code("code") == 1
+    assert cache.lookup("agent_1", "code", key) is MISSING
+    assert cache.agent_stats("agent_1") == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_reloading_new_code_drops_old_results(agent_manager, call_counter):
+    """Test that replacing an agent's code drops the results of the old code."""
+    agent_id = agent_manager.create_agent(COUNTING_AGENT, pure=True)
+    agent_manager.run_agent(agent_id, 2)
+    assert agent_manager.get_result_cache_stats()["entries"] == 1
+
+    agent_manager.reload_agent(agent_id, COUNTING_AGENT.replace("x * scale", "x * scale + 1"))
+    assert agent_manager.get_result_cache_stats()["entries"] == 0
+    assert agent_manager.run_agent(agent_id, 2) == {"value": 3}
+    assert call_counter() == 2
@@ -0,0 +1,115 @@
+"""
+Test cases for batch execution with AgentManager.run_many.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+SQUARE_AGENT = """
+import sys
+
+def main(x):
+    if int(x) < 0:
+        raise ValueError("negative input")
+    return int(x) ** 2
+
+if __name__ == "__main__":
+    print(main(sys.argv[1]))
+"""
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_many_in_process(agent_manager, executor):
+    """Test fanning one agent out over many argument sets."""
+    agent_id = agent_manager.create_agent(SQUARE_AGENT)
+
+    results = list(agent_manager.run_many(
+        [(agent_id, (i,)) for i in range(8)], executor=executor, max_workers=4
+    ))
+
+    assert len(results) == 8
+    assert sorted(r["result"] for r in results) == [i ** 2 for i in range(8)]
+    assert all(r["status"] == "completed" for r in results)
+    assert agent_manager.active_agents[agent_id]["status"] == "completed"
+
+
+def test_run_many_subprocess(agent_manager):
+    """Test batch execution through run_agent_subprocess."""
+    agent_id = agent_manager.create_agent(SQUARE_AGENT)
+
+    results = sorted(
+        agent_manager.run_many([{"agent_id": agent_id, "args": [i]} for i in range(3)],
+                               executor="subprocess"),
+        key=lambda r: r["index"]
+    )
+
+    assert [r["result"].stdout.strip() for r in results] == ["0", "1", "4"]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_many_reports_errors_per_job(agent_manager, executor):
+    """Test that a failing job does not abort the batch."""
+    agent_id = agent_manager.create_agent(SQUARE_AGENT)
+
+    results = sorted(
+        agent_manager.run_many([(agent_id, (2,)), (agent_id, (-1,)), "missing_agent"],
+                               executor=executor),
+        key=lambda r: r["index"]
+    )
+
+    assert [r["status"] for r in results] == ["completed", "error", "error"]
+    assert results[0]["result"] == 4
+    assert "negative input" in results[1]["error"]
+    assert "not found" in results[2]["error"]
+
+
+def test_run_many_rejects_unknown_executor(agent_manager):
+    """Test that an unknown executor name is rejected."""
+    with pytest.raises(ValueError):
+        list(agent_manager.run_many([], executor="gpu"))
+
+
+def test_run_many_early_stop_records_all_agents(agent_manager):
+    """Test that process runs the caller never received still get a final status."""
+    agent_ids = [agent_manager.create_agent(SQUARE_AGENT) for _ in range(4)]
+
+    results = agent_manager.run_many([(agent_id, (2,)) for agent_id in agent_ids],
+                                     executor="process", max_workers=2)
+    assert next(results)["status"] == "completed"
+    results.close()
+
+    assert [agent_manager.active_agents[agent_id]["status"] for agent_id in agent_ids] == ["completed"] * 4
+
+
+def test_run_many_process_uses_result_cache_and_metrics(agent_manager):
+    """Test that process runs of pure agents are cached and counted like run_agent's."""
+    agent_id = agent_manager.create_agent(SQUARE_AGENT, pure=True)
+
+    first = list(agent_manager.run_many([(agent_id, (3,))], executor="process"))
+    second = list(agent_manager.run_many([(agent_id, (3,))], executor="process"))
+
+    assert first[0]["result"] == second[0]["result"] == 9
+    assert agent_manager.run_agent(agent_id, 3) == 9
+    runs = agent_manager.get_metrics()["agent_runs_total"]
+    assert runs["mode=process,status=completed"] == 1
+    assert runs["mode=process,status=cached"] == 1
+    assert runs["mode=inprocess,status=cached"] == 1
+
+
+def test_run_many_process_rejects_unenforceable_limits(agent_manager):
+    """Test that the process executor refuses agents whose limits it cannot enforce."""
+    limited_id = agent_manager.create_agent(SQUARE_AGENT, limits={"timeout": 5})
+    profiled_id = agent_manager.create_agent(SQUARE_AGENT, profile=True)
+
+    results = sorted(agent_manager.run_many([(limited_id, (2,)), (profiled_id, (2,))], executor="process"),
+                     key=lambda r: r["index"])
+
+    assert [r["status"] for r in results] == ["error", "error"]
+    assert "timeout" in results[0]["error"] and "subprocess executor" in results[0]["error"]
+    assert "profiled" in results[1]["error"]
+    assert agent_manager.active_agents[limited_id]["status"] == "created"
+    assert agent_manager.run_agent(limited_id, 2) == 4
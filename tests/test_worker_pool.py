@@ -0,0 +1,84 @@
+"""
+Test cases for the warm interpreter pool used by run_agent_subprocess.
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worker_pool import InterpreterPool
+
+
+@pytest.fixture
+def agent_config(agent_config):
+    """Run subprocesses on a small, recycling worker pool."""
+    agent_config['subprocess_backend'] = 'pool'
+    agent_config['subprocess_pool_size'] = 2
+    agent_config['subprocess_pool_max_runs'] = 3
+    return agent_config
+
+
+ECHO_AGENT = """
+import sys
+
+def main(*args):
+    print(f"Arguments received: {args}")
+    print("to stderr", file=sys.stderr)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
+"""
+
+
+def test_pool_subprocess_execution(agent_manager):
+    """Test that pooled runs capture output like a fresh subprocess."""
+    agent_id = agent_manager.create_agent(ECHO_AGENT)
+
+    result = agent_manager.run_agent_subprocess(agent_id, "arg1", 2)
+
+    assert result.returncode == 0
+    assert "Arguments received: ('arg1', '2')" in result.stdout
+    assert result.stderr.strip() == "to stderr"
+    assert agent_manager.active_agents[agent_id]["status"] == "completed"
+
+
+def test_pool_reports_exit_codes(agent_manager):
+    """Test that sys.exit and uncaught exceptions produce return codes."""
+    exit_id = agent_manager.create_agent("import sys\nsys.exit(3)\n")
+    raise_id = agent_manager.create_agent("raise RuntimeError('boom')\n")
+
+    assert agent_manager.run_agent_subprocess(exit_id).returncode == 3
+
+    result = agent_manager.run_agent_subprocess(raise_id)
+    assert result.returncode == 1
+    assert "RuntimeError: boom" in result.stderr
+    assert agent_manager.active_agents[raise_id]["status"] == "error"
+
+
+def test_pool_replaces_crashed_worker(agent_manager):
+    """Test that a worker killed by its agent is replaced."""
+    crash_id = agent_manager.create_agent("import os\nprint('bye', flush=True)\nos._exit(7)\n")
+    echo_id = agent_manager.create_agent(ECHO_AGENT)
+
+    result = agent_manager.run_agent_subprocess(crash_id)
+    assert result.returncode == 7
+    assert result.stdout == "bye\n"
+
+    for _ in range(3):
+        assert agent_manager.run_agent_subprocess(echo_id).returncode == 0
+    assert agent_manager.subprocess_pool.replaced >= 1
+
+
+def test_pool_recycles_workers(agents_dir):
+    """Test that workers are replaced after max_runs_per_worker runs."""
+    agent_file = os.path.join(agents_dir, "recycle.py")
+    with open(agent_file, "w") as f:
+        f.write("import os\nprint(os.getpid())\n")
+
+    with InterpreterPool(size=1, max_runs_per_worker=2) as pool:
+        pids = [pool.run(agent_file).stdout.strip() for _ in range(4)]
+
+    assert pids[0] == pids[1]
+    assert pids[2] == pids[3]
+    assert pids[0] != pids[2]
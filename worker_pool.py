@@ -0,0 +1,299 @@
+"""
+A pool of pre-started interpreters for running agents as subprocesses.
+
+Each worker is a separate Python process running agent_worker.py. Jobs are
+sent over a pipe, so the cost of interpreter startup and site imports is
+paid once per worker instead of once per agent run.
+"""
+import json
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional, Sequence
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_worker.py")
+
+
+class PoolWorker:
+    """A single pre-started interpreter process."""
+
+    def __init__(self, python: str = "python", spool_dir: Optional[str] = None):
+        """
+        Start a worker interpreter.
+
+        Args:
+            python: The Python executable to start
+            spool_dir: Directory for the worker's stdout/stderr spool files
+        """
+        self.python = python
+        self.runs = 0
+        self.warmed = set()
+        fd, self.stdout_path = tempfile.mkstemp(prefix="agent_worker_", suffix=".out", dir=spool_dir)
+        os.close(fd)
+        fd, self.stderr_path = tempfile.mkstemp(prefix="agent_worker_", suffix=".err", dir=spool_dir)
+        os.close(fd)
+        self.process = subprocess.Popen(
+            [python, WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+    def is_alive(self) -> bool:
+        """Check whether the worker process is still running."""
+        return self.process.poll() is None
+
+    def warm(self, modules: Sequence[str]) -> List[str]:
+        """
+        Import modules in the worker ahead of the agents that need them.
+
+        Args:
+            modules: Module names to import
+
+        Returns:
+            The names that imported successfully
+        """
+        modules = [name for name in modules if name not in self.warmed]
+        if not modules:
+            return []
+        self.process.stdin.write(json.dumps({"warm": modules}) + "\n")
+        self.process.stdin.flush()
+        reply = self.process.stdout.readline()
+        # Failed imports are not retried on this worker either
+        self.warmed.update(modules)
+        return json.loads(reply)["warmed"] if reply else []
+
+    def run(self, file_path: str, args: Sequence[str] = (),
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run an agent file in this worker.
+
+        Args:
+            file_path: Path to the agent file
+            args: Command-line arguments to pass to the agent
+            timeout: Wall-clock seconds after which the worker is killed
+
+        Returns:
+            A CompletedProcess with the agent's returncode, stdout and stderr
+
+        Raises:
+            BrokenPipeError: If the worker died before accepting the job
+            subprocess.TimeoutExpired: If the run exceeded its timeout
+        """
+        args = [str(arg) for arg in args]
+        job = {
+            "file_path": os.path.abspath(file_path),
+            "args": args,
+            "stdout_path": self.stdout_path,
+            "stderr_path": self.stderr_path,
+        }
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        self.runs += 1
+
+        # The only way to stop a runaway agent is to kill its worker; the pool replaces it
+        watchdog = None
+        timed_out = threading.Event()
+        if timeout:
+            def kill():
+                timed_out.set()
+                self.process.kill()
+            watchdog = threading.Timer(timeout, kill)
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            reply = self.process.stdout.readline()
+        finally:
+            if watchdog:
+                watchdog.cancel()
+
+        command = [self.python, file_path] + args
+        stdout = self._read_spool(self.stdout_path)
+        stderr = self._read_spool(self.stderr_path)
+        if reply:
+            returncode = json.loads(reply)["returncode"]
+        else:
+            # The agent took the whole worker down (os._exit, a crash, a signal) or timed out
+            returncode = self.process.wait()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr)
+
+        return subprocess.CompletedProcess(
+            args=command,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr
+        )
+
+    @staticmethod
+    def _read_spool(path: str) -> str:
+        try:
+            with open(path, "r", errors="replace") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def close(self, timeout: float = 1.0):
+        """Stop the worker process and remove its spool files."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        if self.process.stdout:
+            self.process.stdout.close()
+        for path in (self.stdout_path, self.stderr_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class InterpreterPool:
+    """
+    A fixed-size pool of warm worker interpreters.
+
+    Workers are recycled after max_runs_per_worker runs so state leaked by
+    agents (imported modules, globals, open handles) cannot accumulate, and
+    workers that crash are replaced transparently.
+    """
+
+    def __init__(self, size: int = 4, max_runs_per_worker: int = 100,
+                 python: str = "python", spool_dir: Optional[str] = None,
+                 preload: Sequence[str] = ()):
+        """
+        Start the pool.
+
+        Args:
+            size: Number of worker interpreters
+            max_runs_per_worker: Runs after which a worker is replaced (0 disables recycling)
+            python: The Python executable to start
+            spool_dir: Directory for worker spool files (defaults to the system temp dir)
+            preload: Modules every worker imports before its first run
+        """
+        self.size = size
+        self.max_runs_per_worker = max_runs_per_worker
+        self.python = python
+        self.spool_dir = spool_dir
+        self.preload = list(preload)
+        self.logger = logging.getLogger("InterpreterPool")
+        self._idle = queue.Queue()
+        self._workers: List[PoolWorker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.replaced = 0
+
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> PoolWorker:
+        worker = PoolWorker(self.python, self.spool_dir)
+        if self.preload:
+            self._warm_worker(worker)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _warm_worker(self, worker: PoolWorker):
+        try:
+            worker.warm(self.preload)
+        except (BrokenPipeError, OSError, ValueError):
+            # A dead worker is replaced by run() like any other
+            pass
+
+    def warm(self, modules: Sequence[str]):
+        """
+        Import modules in every worker ahead of the agents that need them.
+
+        Idle workers are warmed now, busy ones when they finish their run, and
+        workers started later (replacements, recycles) on startup.
+
+        Args:
+            modules: Module names to import
+        """
+        with self._lock:
+            self.preload.extend(name for name in modules if name not in self.preload)
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for worker in idle:
+                self._warm_worker(worker)
+        finally:
+            for worker in idle:
+                self._idle.put(worker)
+
+    def _retire(self, worker: PoolWorker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.close()
+
+    def _replace(self, worker: PoolWorker) -> PoolWorker:
+        self._retire(worker)
+        self.replaced += 1
+        return self._spawn()
+
+    def run(self, file_path: str, args: Sequence[str] = (),
+            timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run an agent file on the next free worker, blocking until one is available.
+
+        Args:
+            file_path: Path to the agent file
+            args: Command-line arguments to pass to the agent
+            timeout: Wall-clock seconds after which the run is killed
+
+        Returns:
+            A CompletedProcess with the agent's returncode, stdout and stderr
+        """
+        if self._closed:
+            raise RuntimeError("Interpreter pool is closed")
+
+        worker = self._idle.get()
+        try:
+            if not worker.is_alive():
+                worker = self._replace(worker)
+            try:
+                return worker.run(file_path, args, timeout)
+            except (BrokenPipeError, OSError):
+                # The worker died while idle; retry once on a fresh one
+                self.logger.warning("Pool worker died before accepting a job, replacing it")
+                worker = self._replace(worker)
+                return worker.run(file_path, args, timeout)
+        finally:
+            if self._closed:
+                self._retire(worker)
+            else:
+                if not worker.is_alive():
+                    self.logger.warning("Pool worker exited with code %s, replacing it", worker.process.returncode)
+                    worker = self._replace(worker)
+                elif self.max_runs_per_worker and worker.runs >= self.max_runs_per_worker:
+                    worker = self._replace(worker)
+                elif not worker.warmed.issuperset(self.preload):
+                    self._warm_worker(worker)
+                self._idle.put(worker)
+
+    def close(self):
+        """Stop all workers in the pool."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()